@@ -1,26 +1,108 @@
-from flask import Flask, render_template, request, jsonify, Response
+import time
+_INICIO_IMPORTACION = time.perf_counter()
+
+from flask import Flask, render_template, request, jsonify, Response, send_file, g
 import uuid
 from datetime import datetime
 from config.database import NeonDatabase
-import pandas as pd
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib import colors
-import io
+from config.exports import (escribir_excel, iterar_archivo, iterar_ndjson, COLUMNAS_ESTUDIANTES,
+                            XLSX_MIMETYPE, NDJSON_MIMETYPE)
+from config.reports import TIPOS_REPORTE
+from config import metrics
+from config import busqueda
+from config import logs
+import os
 import json
-import sys
-sys.stdout.reconfigure(encoding='utf-8')
+import logging
+import tempfile
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Logging en cola (JSON por defecto, ver config/logs.py): las peticiones no esperan a stdout
+logs.configurar_logging()
+logger = logging.getLogger(__name__)
 
 
 app = Flask(__name__)
 db = NeonDatabase()
 
+# Segundos que /descargar/*?esperar=1 espera a un reporte antes de responder 202 con su id
+# (sin ?esperar un reporte que no está listo responde 202 al instante)
+REPORT_WAIT = float(os.getenv('REPORT_WAIT', 60))
+
+# Tamaño máximo de página del listado de estudiantes
+PAGINA_MAX = int(os.getenv('PAGINA_MAX', 1000))
+# Resultados por página y desplazamiento máximo de la búsqueda de estudiantes
+BUSQUEDA_MAX = int(os.getenv('BUSQUEDA_MAX', 50))
+BUSQUEDA_MAX_OFFSET = int(os.getenv('BUSQUEDA_MAX_OFFSET', 500))
+VALORES_BOOLEANOS = {'true': True, '1': True, 'si': True, 'sí': True,
+                     'false': False, '0': False, 'no': False}
+
+@app.before_request
+def iniciar_escucha_cambios():
+    # El hilo de LISTEN se arranca en cada worker (después del fork), no en el proceso maestro
+    db.escuchar_cambios()
+    g.inicio_peticion = time.perf_counter()
+    # Id de la petición en todos sus logs (se respeta el del proxy si viene)
+    g.request_id = logs.iniciar_peticion(request.headers.get('X-Request-ID'))
+
+@app.after_request
+def registrar_metricas(response):
+    # Ruta como plantilla (/reportes/<job_id>) para no crear una serie por URL
+    ruta = request.url_rule.rule if request.url_rule else 'sin_ruta'
+    inicio = g.get('inicio_peticion')
+    if inicio is not None:
+        duracion = time.perf_counter() - inicio
+        metrics.registrar_peticion(request.method, ruta, response.status_code, duracion)
+        logger.info("%s %s %s", request.method, request.path, response.status_code, extra={
+            'ruta': ruta, 'estado': response.status_code, 'duracion_ms': round(duracion * 1000, 2)
+        })
+        response.headers['X-Request-ID'] = g.request_id
+    metrics.refrescar_estado(db)
+    return response
+
 @app.route('/')
 def index():
     return render_template('index.html')
 
+def armar_respuesta_chat(bot_response, intent, confidence, datos):
+    """Cuerpo JSON de /chat (compartido con el modo asíncrono de asgi.py)"""
+    response_data = {
+        'success': True,
+        'bot_response': bot_response,
+        'intent': intent,
+        'confidence': confidence
+    }
+    
+    # 🔥 AGREGAR DATOS ESTRUCTURADOS SEGÚN EL TIPO DE CONSULTA
+    # (estadisticas, estudiantes, carreras o reporte; sin volver a consultar la BD)
+    response_data.update(datos)
+    metrics.registrar_intencion(intent)
+    if datos:
+        logger.debug("✅ Datos estructurados incluidos: %s", ', '.join(datos))
+    return response_data
+
+def formatear_historial(chat_history):
+    """Mensajes de get_chat_history en el formato que espera el frontend"""
+    formatted_history = []
+    for msg in chat_history:
+        formatted_history.append({
+            'type': msg['message_type'],
+            'message': msg['user_message'] if msg['message_type'] == 'user' else msg['bot_response'],
+            'timestamp': msg['created_at'].isoformat() if msg['created_at'] else datetime.now().isoformat()
+        })
+    return formatted_history
+
+def leer_pagado(valor):
+    """Filtro ?pagado como booleano (None si no viene); ValueError si no es válido"""
+    if valor is None:
+        return None
+    if valor.lower() not in VALORES_BOOLEANOS:
+        raise ValueError('pagado debe ser true o false')
+    return VALORES_BOOLEANOS[valor.lower()]
+
 @app.route('/chat', methods=['POST'])
 def chat():
     try:
@@ -31,51 +113,11 @@ def chat():
         if not user_message:
             return jsonify({'success': False, 'error': 'Mensaje vacío'})
         
-        print(f"💬 Mensaje: '{user_message}' - Sesión: {session_id}")
-        
-        # Obtener respuesta del bot
-        bot_response, intent, confidence = db.get_bot_response(user_message)
+        logger.debug("💬 Mensaje: '%s' - Sesión: %s", user_message, session_id)
         
-        # Preparar respuesta base
-        response_data = {
-            'success': True,
-            'bot_response': bot_response,
-            'intent': intent,
-            'confidence': confidence
-        }
-        
-        # 🔥 AGREGAR DATOS ESTRUCTURADOS SEGÚN EL TIPO DE CONSULTA
-        user_lower = user_message.lower()
-        
-        # Consulta de estadísticas
-        if any(palabra in user_lower for palabra in ['estadística', 'estadisticas', 'estadistica', 'total', 'cuántos', 'cuantos']):
-            print("📊 Obteniendo estadísticas universitarias...")
-            estadisticas = db.get_estadisticas_estudiantes()
-            response_data['estadisticas'] = estadisticas
-            print(f"✅ Estadísticas obtenidas: {estadisticas}")
-        
-        # Consulta de estudiantes pendientes
-        elif any(palabra in user_lower for palabra in ['pendiente', 'pendientes', 'debe', 'inscripción', 'inscripcion', 'pago']):
-            print("📋 Obteniendo estudiantes pendientes...")
-            estudiantes = db.get_estudiantes_pendientes_inscripcion()
-            response_data['estudiantes'] = estudiantes
-            print(f"✅ Estudiantes pendientes obtenidos: {len(estudiantes)}")
-        
-        # Consulta de carreras
-        elif any(palabra in user_lower for palabra in ['carrera', 'carreras', 'ingeniería', 'sistemas', 'industrial']):
-            print("🎓 Obteniendo carreras...")
-            carreras = db.get_carreras()
-            response_data['carreras'] = carreras
-            print(f"✅ Carreras obtenidas: {len(carreras)}")
-        
-        # Consulta de reportes
-        elif any(palabra in user_lower for palabra in ['reporte', 'archivo', 'descargar', 'generar']):
-            print("📄 Generando reporte COMPLETO de estudiantes...")
-            
-            # ✅ Usar el NUEVO método que obtiene TODOS los estudiantes
-            reporte = db.generar_reporte_completo_estudiantes()
-            response_data['reporte'] = reporte
-            print(f"✅ Reporte COMPLETO generado: {reporte.get('total_estudiantes', 0)} estudiantes")
+        # Obtener respuesta del bot junto con los datos que ya consultó el manejador
+        bot_response, intent, confidence, datos = db.procesar_mensaje(user_message)
+        response_data = armar_respuesta_chat(bot_response, intent, confidence, datos)
         
         # Guardar conversación
         if session_id:
@@ -90,9 +132,7 @@ def chat():
         return jsonify(response_data)
         
     except Exception as e:
-        print(f"❌ Error en /chat: {e}")
-        import traceback
-        print(f"🔍 Traceback: {traceback.format_exc()}")
+        logger.exception("❌ Error en /chat: %s", e)
         return jsonify({
             'success': False,
             'error': 'Error interno',
@@ -109,24 +149,38 @@ def get_history():
         
         chat_history = db.get_chat_history(session_id, limit=20)
         
-        formatted_history = []
-        for msg in chat_history:
-            formatted_history.append({
-                'type': msg['message_type'],
-                'message': msg['user_message'] if msg['message_type'] == 'user' else msg['bot_response'],
-                'timestamp': msg['created_at'].isoformat() if msg['created_at'] else datetime.now().isoformat()
-            })
-        
         return jsonify({
             'success': True,
-            'history': formatted_history
+            'history': formatear_historial(chat_history)
         })
         
     except Exception as e:
-        print(f"❌ Error en /history: {e}")
+        logger.error("❌ Error en /history: %s", e)
         return jsonify({'success': False, 'error': 'Error obteniendo historial'})
 
 # 🔥 NUEVAS RUTAS PARA DATOS UNIVERSITARIOS
+def _quiere_ndjson():
+    """¿El cliente pidió el modo streaming (?format=ndjson)?"""
+    return request.args.get('format', '').lower() == 'ndjson'
+
+def _respuesta_ndjson(filas, ruta):
+    """Respuesta NDJSON por bloques desde un cursor del servidor (memoria constante)"""
+    def generar():
+        enviados = 0
+        try:
+            for bloque in iterar_ndjson(filas):
+                enviados += bloque.count(b'\n')
+                yield bloque
+        except Exception as e:
+            # Las cabeceras ya se enviaron: sólo queda registrar y cortar el stream
+            logger.error("❌ Error en streaming de %s: %s", ruta, e)
+        finally:
+            # Devolver la conexión al pool aunque el cliente corte la descarga
+            filas.close()
+        logger.info("📤 %s: %s filas enviadas por streaming", ruta, enviados, extra={'filas': enviados})
+
+    return Response(generar(), mimetype=NDJSON_MIMETYPE, headers={'X-Accel-Buffering': 'no'})
+
 @app.route('/api/universidad/estadisticas')
 def get_estadisticas_universidad():
     """Endpoint directo para obtener estadísticas"""
@@ -137,13 +191,16 @@ def get_estadisticas_universidad():
             'estadisticas': estadisticas
         })
     except Exception as e:
-        print(f"❌ Error en /api/universidad/estadisticas: {e}")
+        logger.error("❌ Error en /api/universidad/estadisticas: %s", e)
         return jsonify({'success': False, 'error': str(e)})
 
 @app.route('/api/universidad/estudiantes/pendientes')
 def get_estudiantes_pendientes():
-    """Endpoint directo para obtener estudiantes pendientes"""
+    """Endpoint directo para obtener estudiantes pendientes (?format=ndjson para streaming)"""
     try:
+        if _quiere_ndjson():
+            return _respuesta_ndjson(db.iterar_estudiantes_pendientes(), request.path)
+        
         estudiantes = db.get_estudiantes_pendientes_inscripcion()
         return jsonify({
             'success': True,
@@ -151,7 +208,7 @@ def get_estudiantes_pendientes():
             'total': len(estudiantes)
         })
     except Exception as e:
-        print(f"❌ Error en /api/universidad/estudiantes/pendientes: {e}")
+        logger.error("❌ Error en /api/universidad/estudiantes/pendientes: %s", e)
         return jsonify({'success': False, 'error': str(e)})
 
 @app.route('/api/universidad/carreras')
@@ -164,231 +221,266 @@ def get_carreras_universidad():
             'carreras': carreras
         })
     except Exception as e:
-        print(f"❌ Error en /api/universidad/carreras: {e}")
+        logger.error("❌ Error en /api/universidad/carreras: %s", e)
         return jsonify({'success': False, 'error': str(e)})
 
 @app.route('/api/universidad/estudiantes/todos')
 def get_todos_estudiantes():
-    """Endpoint directo para obtener TODOS los estudiantes"""
+    """Estudiantes paginados por cursor: ?limit, ?cursor, ?carrera, ?pagado=true|false
+
+    Con ?format=ndjson se envían todos (o hasta ?limit) por streaming, sin paginar.
+    """
     try:
-        limit = request.args.get('limit', 200, type=int)
-        estudiantes = db.get_todos_estudiantes(limit)
+        carrera = request.args.get('carrera') or None
+        try:
+            pagado = leer_pagado(request.args.get('pagado'))
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        if _quiere_ndjson():
+            filas = db.iterar_estudiantes(request.args.get('limit', type=int), carrera, pagado)
+            return _respuesta_ndjson(filas, request.path)
         
-        print(f"📊 Obtenidos {len(estudiantes)} estudiantes (todos)")
+        limit = min(max(request.args.get('limit', 200, type=int), 1), PAGINA_MAX)
+        
+        try:
+            pagina = db.get_estudiantes_pagina(carrera, pagado, request.args.get('cursor'), limit)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        estudiantes = pagina['estudiantes']
+        logger.debug("📊 Obtenidos %s estudiantes (todos)", len(estudiantes))
         
         return jsonify({
             'success': True,
             'estudiantes': estudiantes,
             'total': len(estudiantes),
-            'limit': limit
+            'limit': limit,
+            'siguiente': pagina['siguiente'],
+            'hay_mas': pagina['siguiente'] is not None
+        })
+    except Exception as e:
+        logger.error("❌ Error en /api/universidad/estudiantes/todos: %s", e)
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/universidad/estudiantes/carrera')
+def get_estudiantes_carrera():
+    """Estudiantes de una carrera (?carrera) o de todas; ?format=ndjson para streaming"""
+    try:
+        carrera = request.args.get('carrera') or None
+        if _quiere_ndjson():
+            return _respuesta_ndjson(db.iterar_estudiantes_por_carrera(carrera), request.path)
+        
+        estudiantes = db.get_estudiantes_por_carrera(carrera)
+        return jsonify({
+            'success': True,
+            'carrera': carrera,
+            'estudiantes': estudiantes,
+            'total': len(estudiantes)
         })
     except Exception as e:
-        print(f"❌ Error en /api/universidad/estudiantes/todos: {e}")
+        logger.error("❌ Error en /api/universidad/estudiantes/carrera: %s", e)
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/universidad/estudiantes/buscar')
+def buscar_estudiantes():
+    """Búsqueda por nombre (ignora acentos, tolera errores de tipeo) o matrícula: ?q, ?limit, ?offset"""
+    try:
+        q = request.args.get('q', '')
+        if not busqueda.termino(q):
+            return jsonify({'success': False, 'error': f'q debe tener al menos {busqueda.MIN_CARACTERES} caracteres'}), 400
+        
+        limit = min(max(request.args.get('limit', 20, type=int), 1), BUSQUEDA_MAX)
+        offset = min(max(request.args.get('offset', 0, type=int), 0), BUSQUEDA_MAX_OFFSET)
+        resultado = db.buscar_estudiantes(q, limit, offset)
+        
+        # Más allá de BUSQUEDA_MAX_OFFSET los resultados ya casi no se parecen: no se ofrecen más páginas
+        siguiente = resultado['siguiente']
+        if siguiente is not None and siguiente > BUSQUEDA_MAX_OFFSET:
+            siguiente = None
+        
+        return jsonify({
+            'success': True,
+            'q': q,
+            'estudiantes': resultado['estudiantes'],
+            'total': len(resultado['estudiantes']),
+            'limit': limit,
+            'siguiente': siguiente,
+            'hay_mas': siguiente is not None
+        })
+    except Exception as e:
+        logger.error("❌ Error en /api/universidad/estudiantes/buscar: %s", e)
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/api/universidad/estudiantes/autocompletar')
+def autocompletar_estudiantes():
+    """Sugerencias por prefijo del nombre completo o del apellido: ?q, ?limit (10 por defecto)"""
+    try:
+        q = request.args.get('q', '')
+        limit = min(max(request.args.get('limit', 10, type=int), 1), BUSQUEDA_MAX)
+        estudiantes = db.autocompletar_estudiantes(q, limit)
+        return jsonify({'success': True, 'q': q, 'estudiantes': estudiantes, 'total': len(estudiantes)})
+    except Exception as e:
+        logger.error("❌ Error en /api/universidad/estudiantes/autocompletar: %s", e)
         return jsonify({'success': False, 'error': str(e)})
 
 # 📊 NUEVAS RUTAS PARA DESCARGAS
+def _enviar_reporte(tipo, mensaje_vacio):
+    """Enviar un reporte cacheado; si no existe se genera una sola vez para todas las solicitudes
+
+    Mientras se genera se responde 202 con el id y la URL de estado sin
+    ocupar el hilo del worker; ?esperar=1 espera hasta REPORT_WAIT segundos.
+    """
+    job = db.reportes.enviar(tipo)
+    if VALORES_BOOLEANOS.get(request.args.get('esperar', '').lower(), False):
+        job.esperar(timeout=REPORT_WAIT)
+    
+    if job.estado == 'error':
+        return jsonify({'success': False, 'error': job.error})
+    
+    if job.estado != 'listo':
+        # El cliente consulta /reportes/<id> y descarga desde /reportes/<id>/descargar
+        reporte = job.to_dict()
+        return jsonify({
+            'success': False,
+            'error': 'El reporte se está generando',
+            'reporte': reporte
+        }), 202, {'Location': reporte['url_estado'], 'Retry-After': '2'}
+    
+    if job.total == 0:
+        return jsonify({'success': False, 'error': mensaje_vacio})
+    
+    config = TIPOS_REPORTE[tipo]
+    return send_file(job.ruta, mimetype=config['mimetype'], as_attachment=True, download_name=config['nombre'])
+
 @app.route('/descargar/excel')
 def descargar_excel():
     """Descargar reporte de estudiantes en Excel"""
     try:
-        # Obtener todos los estudiantes
-        estudiantes = db.get_todos_estudiantes(limit=1000)
+        limit = request.args.get('limit', type=int)
         
-        if not estudiantes:
-            return jsonify({'success': False, 'error': 'No hay estudiantes para exportar'})
-        
-        # Crear DataFrame
-        data = []
-        for est in estudiantes:
-            data.append({
-                'Matrícula': est['matricula'],
-                'Nombre': f"{est['nombre']} {est['apellido']}",
-                'Carrera': est['carrera'],
-                'Semestre': est['semestre'],
-                'Fecha Inscripción': est['fecha_inscripcion'].strftime('%Y-%m-%d') if est['fecha_inscripcion'] else 'N/A',
-                'Estado Pago': '✅ PAGADO' if est['inscripcion_pagada'] else '❌ PENDIENTE',
-                'Email': est.get('email', 'No especificado'),
-                'Teléfono': est.get('telefono', 'No especificado')
-            })
-        
-        df = pd.DataFrame(data)
+        if limit is None:
+            return _enviar_reporte('excel', 'No hay estudiantes para exportar')
         
-        # Crear archivo Excel en memoria
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='Estudiantes', index=False)
-            
-            # Formato de columnas
-            worksheet = writer.sheets['Estudiantes']
-            for column in worksheet.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = (max_length + 2)
-                worksheet.column_dimensions[column_letter].width = adjusted_width
+        # Con límite explícito: generar al vuelo por streaming (no se cachea)
+        archivo = tempfile.TemporaryFile()
+        total = escribir_excel(db.iterar_estudiantes(limit), COLUMNAS_ESTUDIANTES, 'Estudiantes', archivo)
         
-        output.seek(0)
+        if not total:
+            archivo.close()
+            return jsonify({'success': False, 'error': 'No hay estudiantes para exportar'})
         
-        # Enviar archivo
+        # Enviar archivo por bloques
         return Response(
-            output.getvalue(),
-            mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            iterar_archivo(archivo),
+            mimetype=XLSX_MIMETYPE,
             headers={
                 "Content-Disposition": "attachment; filename=reporte_estudiantes.xlsx",
-                "Content-type": "application/vnd.ms-excel"
+                "Content-Length": str(archivo.tell())
             }
         )
         
     except Exception as e:
-        print(f"❌ Error generando Excel: {e}")
+        logger.error("❌ Error generando Excel: %s", e)
         return jsonify({'success': False, 'error': str(e)})
 
 @app.route('/descargar/pdf')
 def descargar_pdf():
     """Descargar reporte de estudiantes en PDF"""
     try:
-        # Obtener todos los estudiantes
-        estudiantes = db.get_todos_estudiantes(limit=1000)
-        
-        if not estudiantes:
-            return jsonify({'success': False, 'error': 'No hay estudiantes para exportar'})
-        
-        # Crear PDF en memoria
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter)
-        elements = []
-        styles = getSampleStyleSheet()
-        
-        # Título
-        title = Paragraph("REPORTE DE ESTUDIANTES - UNIVERSIDAD", styles['Title'])
-        elements.append(title)
-        
-        # Estadísticas
-        total = len(estudiantes)
-        pagados = sum(1 for e in estudiantes if e['inscripcion_pagada'])
-        pendientes = total - pagados
-        
-        stats_text = f"""
-        <b>Estadísticas:</b><br/>
-        • Total de estudiantes: {total}<br/>
-        • Inscripción pagada: {pagados}<br/>
-        • Pendientes de pago: {pendientes}<br/>
-        • Fecha de generación: {datetime.now().strftime('%d/%m/%Y %H:%M')}
-        """
-        stats = Paragraph(stats_text, styles['Normal'])
-        elements.append(stats)
-        elements.append(Paragraph("<br/>", styles['Normal']))
-        
-        # Preparar datos para la tabla
-        data = [['Matrícula', 'Nombre', 'Carrera', 'Semestre', 'Estado']]
-        
-        for est in estudiantes:
-            estado = 'PAGADO' if est['inscripcion_pagada'] else 'PENDIENTE'
-            fecha = est['fecha_inscripcion'].strftime('%d/%m/%Y') if est['fecha_inscripcion'] else 'N/A'
-            data.append([
-                est['matricula'],
-                f"{est['nombre']} {est['apellido']}",
-                est['carrera'],
-                str(est['semestre']),
-                estado
-            ])
-        
-        # Crear tabla
-        table = Table(data)
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 8),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        
-        elements.append(table)
-        
-        # Generar PDF
-        doc.build(elements)
-        buffer.seek(0)
-        
-        # Enviar archivo
-        return Response(
-            buffer.getvalue(),
-            mimetype="application/pdf",
-            headers={
-                "Content-Disposition": "attachment; filename=reporte_estudiantes.pdf"
-            }
-        )
+        return _enviar_reporte('pdf', 'No hay estudiantes para exportar')
         
     except Exception as e:
-        print(f"❌ Error generando PDF: {e}")
+        logger.error("❌ Error generando PDF: %s", e)
         return jsonify({'success': False, 'error': str(e)})
 
 @app.route('/descargar/reporte/pendientes')
 def descargar_reporte_pendientes():
     """Descargar reporte específico de estudiantes pendientes"""
     try:
-        estudiantes = db.get_estudiantes_pendientes_inscripcion()
-        
-        if not estudiantes:
-            return jsonify({'success': False, 'error': 'No hay estudiantes pendientes'})
-        
-        # Crear DataFrame
-        data = []
-        for est in estudiantes:
-            data.append({
-                'Matrícula': est['matricula'],
-                'Nombre': f"{est['nombre']} {est['apellido']}",
-                'Carrera': est['carrera'],
-                'Semestre': est['semestre'],
-                'Fecha Inscripción': est['fecha_inscripcion'].strftime('%Y-%m-%d') if est['fecha_inscripcion'] else 'N/A',
-                'Email': est.get('email', 'No especificado'),
-                'Teléfono': est.get('telefono', 'No especificado')
-            })
-        
-        df = pd.DataFrame(data)
+        return _enviar_reporte('pendientes', 'No hay estudiantes pendientes')
         
-        # Crear archivo Excel en memoria
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='Estudiantes Pendientes', index=False)
-            
-            # Formato de columnas
-            worksheet = writer.sheets['Estudiantes Pendientes']
-            for column in worksheet.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = (max_length + 2)
-                worksheet.column_dimensions[column_letter].width = adjusted_width
+    except Exception as e:
+        logger.error("❌ Error generando reporte pendientes: %s", e)
+        return jsonify({'success': False, 'error': str(e)})
+
+# 📄 REPORTES EN SEGUNDO PLANO
+@app.route('/reportes', methods=['POST'])
+def crear_reporte():
+    """Encolar la generación de un reporte (excel, pdf o pendientes) y devolver su id"""
+    try:
+        data = request.get_json(silent=True) or {}
+        tipo = data.get('tipo') or request.args.get('tipo', 'excel')
         
-        output.seek(0)
+        if tipo not in TIPOS_REPORTE:
+            return jsonify({'success': False, 'error': f'Tipo de reporte no válido: {tipo}'}), 400
         
-        return Response(
-            output.getvalue(),
-            mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={
-                "Content-Disposition": "attachment; filename=estudiantes_pendientes.xlsx"
-            }
-        )
+        job = db.reportes.enviar(tipo)
+        return jsonify({'success': True, 'reporte': job.to_dict()}), 202
         
     except Exception as e:
-        print(f"❌ Error generando reporte pendientes: {e}")
+        logger.error("❌ Error en /reportes: %s", e)
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/reportes/<job_id>')
+def estado_reporte(job_id):
+    """Consultar el estado de un reporte"""
+    job = db.reportes.obtener(job_id)
+    
+    if not job:
+        return jsonify({'success': False, 'error': 'Reporte no encontrado'}), 404
+    
+    return jsonify({'success': True, 'reporte': job.to_dict()})
+
+@app.route('/reportes/<job_id>/descargar')
+def descargar_reporte(job_id):
+    """Descargar un reporte ya generado"""
+    job = db.reportes.obtener(job_id)
+    
+    if not job:
+        return jsonify({'success': False, 'error': 'Reporte no encontrado'}), 404
+    
+    if job.estado != 'listo':
+        return jsonify({'success': False, 'error': 'El reporte aún no está listo', 'reporte': job.to_dict()}), 409
+    
+    config = TIPOS_REPORTE[job.tipo]
+    return send_file(job.ruta, mimetype=config['mimetype'], as_attachment=True, download_name=config['nombre'])
+
+@app.route('/api/cache/stats')
+def get_cache_stats():
+    """Hits/misses de las cachés en memoria de este worker"""
+    try:
+        return jsonify({'success': True, 'cache': db.cache_stats()})
+    except Exception as e:
+        logger.error("❌ Error en /api/cache/stats: %s", e)
         return jsonify({'success': False, 'error': str(e)})
 
+@app.route('/health')
+def health():
+    """Chequeo de vida para PM2/Docker/Railway: el worker responde y la BD contesta"""
+    base_datos = db.ping()
+    return jsonify({
+        'status': 'healthy' if base_datos else 'degraded',
+        'base_datos': 'ok' if base_datos else 'error',
+        'pid': os.getpid(),
+        'pool': db.pool.stats(),
+        'arranque_ms': TIEMPO_ARRANQUE_MS,
+        'memoria_max_mb': _memoria_max_mb()
+    })
+
+def _memoria_max_mb():
+    """RSS máximo del proceso en MB (ru_maxrss está en KB en Linux)"""
+    if resource is None:
+        return None
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+@app.route('/metrics')
+def get_metrics():
+    """Métricas en formato Prometheus (de todos los workers con PROMETHEUS_MULTIPROC_DIR)"""
+    metrics.refrescar_estado(db, forzar=True)
+    cuerpo, content_type = metrics.exportar()
+    return Response(cuerpo, content_type=content_type)
+
 @app.route('/diagnostico')
 def diagnostico():
     """Endpoint temporal para diagnóstico"""
@@ -401,10 +493,15 @@ def diagnostico():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
+# Tiempo de importación de la app (Flask, config/*, NeonDatabase); se publica en /health
+TIEMPO_ARRANQUE_MS = round((time.perf_counter() - _INICIO_IMPORTACION) * 1000, 1)
+logger.info("⏱️ App cargada en %s ms", TIEMPO_ARRANQUE_MS)
+
 if __name__ == '__main__':
-    print("🚀 ChatBot Universitario funcionando en http://localhost:5000")
-    print("📊 Endpoints de descarga disponibles:")
-    print("   • /descargar/excel - Descargar Excel con todos los estudiantes")
-    print("   • /descargar/pdf - Descargar PDF con todos los estudiantes") 
-    print("   • /descargar/reporte/pendientes - Descargar Excel con estudiantes pendientes")
+    logger.info("🚀 ChatBot Universitario funcionando en http://localhost:5000")
+    logger.info("📊 Endpoints de descarga disponibles:")
+    logger.info("   • /descargar/excel - Descargar Excel con todos los estudiantes")
+    logger.info("   • /descargar/pdf - Descargar PDF con todos los estudiantes")
+    logger.info("   • /descargar/reporte/pendientes - Descargar Excel con estudiantes pendientes")
+    logger.warning("⚠️ Servidor de desarrollo; en producción: gunicorn -c gunicorn.conf.py wsgi:app")
     app.run(debug=False, use_reloader=False, port=5000)
\ No newline at end of file
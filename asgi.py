@@ -0,0 +1,289 @@
+"""Punto de entrada ASGI: /chat, /history y /api/universidad/* asíncronos
+
+    uvicorn asgi:application --workers 2 --port 5000
+
+Las rutas asíncronas usan AsyncNeonDatabase (pool de asyncpg), así un
+worker atiende cientos de sesiones mientras espera a Neon. El resto de la
+aplicación Flask (página, descargas, reportes, diagnóstico) se sirve tal
+cual a través de WsgiToAsgi. La app síncrona (app.py + gunicorn) sigue
+funcionando igual.
+"""
+import time
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
+from asgiref.wsgi import WsgiToAsgi
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Mount, Route
+
+from app import (app as flask_app, db, armar_respuesta_chat, formatear_historial, leer_pagado,
+                 PAGINA_MAX, BUSQUEDA_MAX, BUSQUEDA_MAX_OFFSET)
+from config.async_database import AsyncNeonDatabase
+from config.exports import iterar_ndjson, NDJSON_MIMETYPE
+from config import metrics, logs, busqueda
+
+logger = logging.getLogger(__name__)
+
+adb = AsyncNeonDatabase(db)
+
+
+def jsonify(datos, status=200):
+    """JSON serializado igual que el jsonify de Flask (fechas, Decimal, claves ordenadas)"""
+    return Response(flask_app.json.dumps(datos), status_code=status, media_type='application/json')
+
+
+def _entero(valor, default=None):
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        return default
+
+
+def _quiere_ndjson(request):
+    return request.query_params.get('format', '').lower() == 'ndjson'
+
+
+def _respuesta_ndjson(filas, ruta, lote=500):
+    """NDJSON por bloques desde un cursor asíncrono del servidor"""
+    async def generar():
+        enviados = 0
+        bloque = []
+        try:
+            async for fila in filas:
+                bloque.append(fila)
+                if len(bloque) >= lote:
+                    enviados += len(bloque)
+                    yield b''.join(iterar_ndjson(bloque, lote))
+                    bloque = []
+            if bloque:
+                enviados += len(bloque)
+                yield b''.join(iterar_ndjson(bloque, lote))
+        except Exception as e:
+            # Las cabeceras ya se enviaron: sólo queda registrar y cortar el stream
+            logger.error("❌ Error en streaming de %s: %s", ruta, e)
+        finally:
+            await filas.aclose()
+        logger.info("📤 %s: %s filas enviadas por streaming", ruta, enviados, extra={'filas': enviados})
+
+    return StreamingResponse(generar(), media_type=NDJSON_MIMETYPE, headers={'X-Accel-Buffering': 'no'})
+
+
+async def chat(request):
+    try:
+        data = await request.json()
+        user_message = data.get('message', '').strip()
+        session_id = data.get('session_id')
+
+        if not user_message:
+            return jsonify({'success': False, 'error': 'Mensaje vacío'})
+
+        logger.debug("💬 Mensaje: '%s' - Sesión: %s", user_message, session_id)
+
+        bot_response, intent, confidence, datos = await adb.procesar_mensaje(user_message)
+        response_data = armar_respuesta_chat(bot_response, intent, confidence, datos)
+
+        # En un hilo: con WRITE_BEHIND=0 (o la cola llena) guardar bloquea con psycopg2
+        if session_id:
+            await asyncio.to_thread(
+                db.save_conversation,
+                session_id=session_id,
+                user_message=user_message,
+                bot_response=bot_response,
+                intent=intent,
+                confidence=confidence
+            )
+
+        return jsonify(response_data)
+
+    except Exception as e:
+        logger.error("❌ Error en /chat: %s", e)
+        return jsonify({
+            'success': False,
+            'error': 'Error interno',
+            'bot_response': 'Lo siento, hubo un error. Por favor intenta nuevamente.'
+        })
+
+
+async def get_history(request):
+    try:
+        session_id = request.query_params.get('session_id')
+
+        if not session_id:
+            return jsonify({'success': True, 'history': []})
+
+        chat_history = await adb.get_chat_history(session_id, limit=20)
+        return jsonify({'success': True, 'history': formatear_historial(chat_history)})
+
+    except Exception as e:
+        logger.error("❌ Error en /history: %s", e)
+        return jsonify({'success': False, 'error': 'Error obteniendo historial'})
+
+
+async def get_estadisticas_universidad(request):
+    try:
+        return jsonify({'success': True, 'estadisticas': await adb.get_estadisticas_estudiantes()})
+    except Exception as e:
+        logger.error("❌ Error en /api/universidad/estadisticas: %s", e)
+        return jsonify({'success': False, 'error': str(e)})
+
+
+async def get_estudiantes_pendientes(request):
+    try:
+        if _quiere_ndjson(request):
+            return _respuesta_ndjson(adb.iterar_estudiantes_pendientes(), request.url.path)
+
+        estudiantes = await adb.get_estudiantes_pendientes_inscripcion()
+        return jsonify({'success': True, 'estudiantes': estudiantes, 'total': len(estudiantes)})
+    except Exception as e:
+        logger.error("❌ Error en /api/universidad/estudiantes/pendientes: %s", e)
+        return jsonify({'success': False, 'error': str(e)})
+
+
+async def get_carreras_universidad(request):
+    try:
+        return jsonify({'success': True, 'carreras': await adb.get_carreras()})
+    except Exception as e:
+        logger.error("❌ Error en /api/universidad/carreras: %s", e)
+        return jsonify({'success': False, 'error': str(e)})
+
+
+async def get_todos_estudiantes(request):
+    try:
+        args = request.query_params
+        carrera = args.get('carrera') or None
+        try:
+            pagado = leer_pagado(args.get('pagado'))
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}, 400)
+
+        if _quiere_ndjson(request):
+            filas = adb.iterar_estudiantes(_entero(args.get('limit')), carrera, pagado)
+            return _respuesta_ndjson(filas, request.url.path)
+
+        limit = min(max(_entero(args.get('limit'), 200), 1), PAGINA_MAX)
+        try:
+            pagina = await adb.get_estudiantes_pagina(carrera, pagado, args.get('cursor'), limit)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}, 400)
+
+        estudiantes = pagina['estudiantes']
+        return jsonify({
+            'success': True,
+            'estudiantes': estudiantes,
+            'total': len(estudiantes),
+            'limit': limit,
+            'siguiente': pagina['siguiente'],
+            'hay_mas': pagina['siguiente'] is not None
+        })
+    except Exception as e:
+        logger.error("❌ Error en /api/universidad/estudiantes/todos: %s", e)
+        return jsonify({'success': False, 'error': str(e)})
+
+
+async def get_estudiantes_carrera(request):
+    try:
+        carrera = request.query_params.get('carrera') or None
+        if _quiere_ndjson(request):
+            return _respuesta_ndjson(adb.iterar_estudiantes_por_carrera(carrera), request.url.path)
+
+        estudiantes = await adb.get_estudiantes_por_carrera(carrera)
+        return jsonify({'success': True, 'carrera': carrera, 'estudiantes': estudiantes, 'total': len(estudiantes)})
+    except Exception as e:
+        logger.error("❌ Error en /api/universidad/estudiantes/carrera: %s", e)
+        return jsonify({'success': False, 'error': str(e)})
+
+
+async def buscar_estudiantes(request):
+    try:
+        args = request.query_params
+        q = args.get('q', '')
+        if not busqueda.termino(q):
+            return jsonify({'success': False, 'error': f'q debe tener al menos {busqueda.MIN_CARACTERES} caracteres'}, 400)
+
+        limit = min(max(_entero(args.get('limit'), 20), 1), BUSQUEDA_MAX)
+        offset = min(max(_entero(args.get('offset'), 0), 0), BUSQUEDA_MAX_OFFSET)
+        resultado = await adb.buscar_estudiantes(q, limit, offset)
+
+        siguiente = resultado['siguiente']
+        if siguiente is not None and siguiente > BUSQUEDA_MAX_OFFSET:
+            siguiente = None
+
+        return jsonify({
+            'success': True,
+            'q': q,
+            'estudiantes': resultado['estudiantes'],
+            'total': len(resultado['estudiantes']),
+            'limit': limit,
+            'siguiente': siguiente,
+            'hay_mas': siguiente is not None
+        })
+    except Exception as e:
+        logger.error("❌ Error en /api/universidad/estudiantes/buscar: %s", e)
+        return jsonify({'success': False, 'error': str(e)})
+
+
+async def autocompletar_estudiantes(request):
+    try:
+        q = request.query_params.get('q', '')
+        limit = min(max(_entero(request.query_params.get('limit'), 10), 1), BUSQUEDA_MAX)
+        estudiantes = await adb.autocompletar_estudiantes(q, limit)
+        return jsonify({'success': True, 'q': q, 'estudiantes': estudiantes, 'total': len(estudiantes)})
+    except Exception as e:
+        logger.error("❌ Error en /api/universidad/estudiantes/autocompletar: %s", e)
+        return jsonify({'success': False, 'error': str(e)})
+
+
+class MedirPeticiones(BaseHTTPMiddleware):
+    """Request id, log de acceso y latencia de las rutas asíncronas (Flask usa su after_request)"""
+
+    async def dispatch(self, request, call_next):
+        if request.url.path not in RUTAS_ASINCRONAS:
+            return await call_next(request)
+
+        inicio = time.perf_counter()
+        request_id = logs.iniciar_peticion(request.headers.get('x-request-id'))
+        response = await call_next(request)
+        duracion = time.perf_counter() - inicio
+        metrics.registrar_peticion(request.method, request.url.path, response.status_code, duracion)
+        logger.info("%s %s %s", request.method, request.url.path, response.status_code, extra={
+            'ruta': request.url.path, 'estado': response.status_code, 'duracion_ms': round(duracion * 1000, 2)
+        })
+        response.headers['X-Request-ID'] = request_id
+        metrics.refrescar_estado(db)
+        return response
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Cada worker abre su propio pool y su hilo de LISTEN
+    await adb.conectar()
+    db.escuchar_cambios()
+    yield
+    await adb.cerrar()
+
+
+RUTAS = [
+    Route('/chat', chat, methods=['POST']),
+    Route('/history', get_history),
+    Route('/api/universidad/estadisticas', get_estadisticas_universidad),
+    Route('/api/universidad/estudiantes/pendientes', get_estudiantes_pendientes),
+    Route('/api/universidad/carreras', get_carreras_universidad),
+    Route('/api/universidad/estudiantes/todos', get_todos_estudiantes),
+    Route('/api/universidad/estudiantes/carrera', get_estudiantes_carrera),
+    Route('/api/universidad/estudiantes/buscar', buscar_estudiantes),
+    Route('/api/universidad/estudiantes/autocompletar', autocompletar_estudiantes),
+]
+RUTAS_ASINCRONAS = {ruta.path for ruta in RUTAS}
+
+application = Starlette(
+    routes=RUTAS + [
+        # Todo lo demás lo atiende la app Flask síncrona
+        Mount('/', app=WsgiToAsgi(flask_app)),
+    ],
+    middleware=[Middleware(MedirPeticiones)],
+    lifespan=lifespan
+)
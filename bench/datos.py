@@ -0,0 +1,177 @@
+"""Datos sintéticos y deterministas para los benchmarks
+
+Cada estudiante se calcula a partir de su índice (sin guardarlo en memoria),
+y el orden de los índices coincide con ``ORDER BY carrera, nombre, apellido,
+matricula``: la base falsa pagina con búsqueda binaria y la semilla de
+Postgres escribe 1M de filas con memoria constante.
+"""
+import re
+import zlib
+from datetime import date, datetime, timedelta, timezone
+
+
+ESCALAS = {'1k': 1_000, '10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+
+CARRERAS = [
+    {'codigo': 'ADM', 'nombre': 'Administración de Empresas', 'duracion_semestres': 8, 'costo_inscripcion': 1200},
+    {'codigo': 'ARQ', 'nombre': 'Arquitectura', 'duracion_semestres': 10, 'costo_inscripcion': 1800},
+    {'codigo': 'CON', 'nombre': 'Contaduría Pública', 'duracion_semestres': 8, 'costo_inscripcion': 1100},
+    {'codigo': 'DER', 'nombre': 'Derecho', 'duracion_semestres': 9, 'costo_inscripcion': 1400},
+    {'codigo': 'ISC', 'nombre': 'Ingeniería en Sistemas Computacionales', 'duracion_semestres': 9, 'costo_inscripcion': 1500},
+    {'codigo': 'IND', 'nombre': 'Ingeniería Industrial', 'duracion_semestres': 9, 'costo_inscripcion': 1500},
+    {'codigo': 'MED', 'nombre': 'Medicina', 'duracion_semestres': 12, 'costo_inscripcion': 2500},
+    {'codigo': 'PSI', 'nombre': 'Psicología', 'duracion_semestres': 8, 'costo_inscripcion': 1300},
+]
+NOMBRES_CARRERA = sorted(carrera['nombre'] for carrera in CARRERAS)
+
+# Ordenadas: el índice dentro de cada bloque respeta el ORDER BY
+NOMBRES = sorted([
+    'Alejandro', 'Ana', 'Andrea', 'Carlos', 'Daniela', 'Diego', 'Fernanda', 'Gabriel', 'Isabel',
+    'Javier', 'José', 'Laura', 'Luis', 'María', 'Mariana', 'Miguel', 'Natalia', 'Pablo',
+    'Paola', 'Ricardo', 'Sofía', 'Valeria', 'Víctor', 'Ximena'
+])
+APELLIDOS = sorted([
+    'Castillo', 'Cruz', 'Díaz', 'Flores', 'García', 'Gómez', 'González', 'Hernández', 'Jiménez',
+    'López', 'Martínez', 'Morales', 'Moreno', 'Pérez', 'Ramírez', 'Reyes', 'Rodríguez', 'Romero',
+    'Ruiz', 'Sánchez', 'Torres', 'Vargas'
+])
+
+COMMON_INTENTS = [
+    {'intent_name': 'horarios', 'response_template': 'Las clases son de lunes a viernes de 7:00 a 21:00.',
+     'example_questions': ['horario de clases', 'a qué hora abren', 'horarios de la universidad']},
+    {'intent_name': 'becas', 'response_template': 'Tenemos becas académicas y deportivas; pregunta en servicios escolares.',
+     'example_questions': ['hay becas', 'como pido una beca', 'becas disponibles']},
+    {'intent_name': 'ubicacion', 'response_template': 'Estamos en Av. Universidad 100, edificio central.',
+     'example_questions': ['donde estan', 'direccion de la universidad', 'como llego']},
+    {'intent_name': 'contacto', 'response_template': 'Escríbenos a contacto@universidad.edu o llama al 555-0100.',
+     'example_questions': ['telefono de contacto', 'correo de la universidad', 'como los contacto']},
+]
+
+# Mensajes del escenario /chat: mezcla de intenciones con y sin consulta a la BD
+MENSAJES_CHAT = [
+    'hola', 'estadísticas de estudiantes', 'qué carreras tienen', 'estudiantes pendientes de pago',
+    'cuántos estudiantes hay', 'horario de clases', 'hay becas', 'generar reporte completo',
+    'información de inscripciones', 'gracias', 'donde estan', 'total de estudiantes',
+    'busca a Ana Pérez',
+]
+
+# Términos del escenario de búsqueda (con y sin acentos, incompletos)
+BUSQUEDAS = ['ana perez', 'María López', 'jose', 'ximena ruiz', 'gonzalez', 'luis her']
+
+# Proporción de inscripciones pagadas
+PAGADOS_POR_CIEN = 70
+
+
+def escala(valor):
+    """Número de estudiantes de '1k', '100k', '1m' o un entero"""
+    valor = str(valor).lower()
+    if valor in ESCALAS:
+        return ESCALAS[valor]
+    if not re.fullmatch(r'\d+', valor):
+        raise ValueError(f"Escala no válida: {valor} (usa {', '.join(ESCALAS)} o un número)")
+    return int(valor)
+
+
+def _hash(i, sal):
+    return zlib.crc32(f'{sal}:{i}'.encode()) % 100
+
+
+class Estudiantes:
+    """Secuencia de solo lectura de ``n`` estudiantes calculados por índice"""
+
+    def __init__(self, n):
+        self.n = n
+        # Bloques contiguos por carrera (en orden alfabético)
+        self.inicios = [k * n // len(NOMBRES_CARRERA) for k in range(len(NOMBRES_CARRERA) + 1)]
+
+    def __len__(self):
+        return self.n
+
+    def rango_carrera(self, carrera):
+        """(inicio, fin) de los índices de ``carrera``; vacío si no existe"""
+        if carrera not in NOMBRES_CARRERA:
+            return 0, 0
+        k = NOMBRES_CARRERA.index(carrera)
+        return self.inicios[k], self.inicios[k + 1]
+
+    def pagado(self, i):
+        return _hash(i, 'pago') < PAGADOS_POR_CIEN
+
+    def semestre(self, i):
+        return 1 + _hash(i, 'semestre') % 10
+
+    def clave(self, i):
+        """``(carrera, nombre, apellido, matricula)`` de la fila ``i``"""
+        k = next(k for k in range(len(NOMBRES_CARRERA)) if self.inicios[k + 1] > i)
+        inicio, fin = self.inicios[k], self.inicios[k + 1]
+        j, tamano = i - inicio, fin - inicio
+        # (nombre, apellido) crece con j dentro del bloque
+        posicion = j * len(NOMBRES) * len(APELLIDOS) // tamano
+        nombre, apellido = divmod(posicion, len(APELLIDOS))
+        return NOMBRES_CARRERA[k], NOMBRES[nombre], APELLIDOS[apellido], f'A{i:07d}'
+
+    def fila(self, i):
+        carrera, nombre, apellido, matricula = self.clave(i)
+        return {
+            'matricula': matricula,
+            'nombre': nombre,
+            'apellido': apellido,
+            'carrera': carrera,
+            'semestre': self.semestre(i),
+            'fecha_inscripcion': date(2025, 8, 1) - timedelta(days=_hash(i, 'fecha') * 7),
+            'inscripcion_pagada': self.pagado(i),
+            'email': f'{matricula.lower()}@alumnos.universidad.edu',
+            'telefono': f'555{i % 10_000_000:07d}'
+        }
+
+    def __getitem__(self, i):
+        return self.fila(i)
+
+
+class _Claves:
+    """Vista de las claves de orden para ``bisect``"""
+
+    def __init__(self, estudiantes):
+        self.estudiantes = estudiantes
+
+    def __len__(self):
+        return len(self.estudiantes)
+
+    def __getitem__(self, i):
+        return self.estudiantes.clave(i)
+
+
+def claves(estudiantes):
+    return _Claves(estudiantes)
+
+
+def resumen_carreras(estudiantes):
+    """Filas de resumen_carreras (carrera, cantidad, pagados, pendientes)"""
+    filas = []
+    for carrera in NOMBRES_CARRERA:
+        inicio, fin = estudiantes.rango_carrera(carrera)
+        pagados = sum(1 for i in range(inicio, fin) if estudiantes.pagado(i))
+        filas.append({'carrera': carrera, 'cantidad': fin - inicio,
+                      'pagados': pagados, 'pendientes': fin - inicio - pagados})
+    return filas
+
+
+def sesiones(n_estudiantes):
+    """Ids de sesión con historial: una por cada 10 estudiantes (mínimo 10)"""
+    return [f'bench-{i:06d}' for i in range(max(10, n_estudiantes // 10))]
+
+
+def mensajes_sesion(session_id, cantidad=10):
+    """Historial sintético de una sesión (pares usuario/bot), del más viejo al más nuevo"""
+    base = datetime(2025, 9, 1, tzinfo=timezone.utc) + timedelta(minutes=zlib.crc32(session_id.encode()) % 10_000)
+    mensajes = []
+    for j in range(cantidad):
+        mensaje = MENSAJES_CHAT[(j + len(session_id)) % len(MENSAJES_CHAT)]
+        mensajes.append({
+            'message_type': 'user' if j % 2 == 0 else 'bot',
+            'user_message': mensaje,
+            'bot_response': None if j % 2 == 0 else f'Respuesta a: {mensaje}',
+            'intent_detected': None,
+            'created_at': base + timedelta(seconds=30 * j)
+        })
+    return mensajes
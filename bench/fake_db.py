@@ -0,0 +1,184 @@
+"""NeonDatabase sin Postgres para benchmarks: mismas cachés, clasificador y reportes
+
+Sólo se reemplazan los métodos que hablan con la base de datos; cada
+consulta espera ``latencia`` segundos (el viaje de red a Neon) y los
+recorridos por streaming esperan además una vez por cada lote de
+``itersize`` filas, como un cursor del servidor.
+"""
+import time
+import bisect
+from itertools import islice
+
+from config import respuestas as textos
+from config import busqueda
+from config.intents import normalizar
+from config.database import NeonDatabase, codificar_cursor, decodificar_cursor, clave_cursor
+
+from bench import datos
+
+
+class FakeNeonDatabase(NeonDatabase):
+
+    # Columnas de cada consulta real (el orden de pendientes por fecha no se imita)
+    COLUMNAS_PENDIENTES = ('matricula', 'nombre', 'apellido', 'carrera', 'semestre',
+                           'fecha_inscripcion', 'email', 'telefono')
+    COLUMNAS_POR_CARRERA = ('matricula', 'nombre', 'apellido', 'semestre', 'inscripcion_pagada')
+
+    def __init__(self, n_estudiantes=1000, latencia=0.002, itersize=2000):
+        super().__init__()
+        # Sin hilo de LISTEN ni pool real
+        self.notificaciones = None
+        self.latencia = latencia
+        self.itersize = itersize
+        self.estudiantes = datos.Estudiantes(n_estudiantes)
+        self._claves = datos.claves(self.estudiantes)
+        self._resumen = datos.resumen_carreras(self.estudiantes)
+        self._historial = {}
+        self._sesiones = set(datos.sesiones(n_estudiantes))
+        self.escrituras = 0
+
+    def _esperar(self):
+        if self.latencia:
+            time.sleep(self.latencia)
+
+    def get_connection(self):
+        raise RuntimeError("FakeNeonDatabase no abre conexiones: falta sobrescribir un método")
+
+    def iniciar_worker(self):
+        pass
+
+    def ping(self):
+        self._esperar()
+        return True
+
+    def version_datos(self):
+        self._esperar()
+        return "v0"
+
+    def registrar_reporte(self, tipo_reporte, parametros):
+        self._esperar()
+        return True
+
+    # === LECTURAS ===
+
+    def _consultar_common_intents(self):
+        self._esperar()
+        return [dict(fila) for fila in datos.COMMON_INTENTS]
+
+    def _consultar_estadisticas(self):
+        self._esperar()
+        return textos.armar_estadisticas(self._resumen)
+
+    def _consultar_carreras(self):
+        self._esperar()
+        return sorted((dict(carrera) for carrera in datos.CARRERAS), key=lambda c: c['nombre'])
+
+    def _indices(self, carrera=None, pagado=None, desde=0, semestre=None):
+        inicio, fin = self.estudiantes.rango_carrera(carrera) if carrera else (0, len(self.estudiantes))
+        for i in range(max(inicio, desde), fin):
+            if pagado is not None and self.estudiantes.pagado(i) != pagado:
+                continue
+            if semestre is None or self.estudiantes.semestre(i) == semestre:
+                yield i
+
+    def _filas(self, indices, columnas=None):
+        for i in indices:
+            fila = self.estudiantes.fila(i)
+            yield {c: fila[c] for c in columnas} if columnas else fila
+
+    def _streaming(self, filas):
+        """Generador con una espera por lote, como un cursor con nombre de psycopg2"""
+        self._esperar()
+        for n, fila in enumerate(filas, 1):
+            yield fila
+            if n % self.itersize == 0:
+                self._esperar()
+
+    def get_estudiantes_pendientes_inscripcion(self):
+        self._esperar()
+        return list(self._filas(self._indices(pagado=False), self.COLUMNAS_PENDIENTES))
+
+    def get_estudiantes_pagina(self, carrera=None, pagado=None, cursor=None, limite=200, semestre=None):
+        desde = 0
+        if cursor:
+            desde = bisect.bisect_right(self._claves, tuple(decodificar_cursor(cursor)))
+        self._esperar()
+        estudiantes = list(self._filas(islice(self._indices(carrera, pagado, desde, semestre), limite + 1)))
+
+        siguiente = None
+        if len(estudiantes) > limite:
+            estudiantes = estudiantes[:limite]
+            ultimo = estudiantes[-1]
+            siguiente = codificar_cursor(clave_cursor(ultimo))
+        return {'estudiantes': estudiantes, 'siguiente': siguiente}
+
+    def get_estudiantes_por_carrera(self, carrera=None):
+        self._esperar()
+        return list(self._filas(self._indices(carrera), self._columnas_por_carrera(carrera)))
+
+    def _columnas_por_carrera(self, carrera):
+        return self.COLUMNAS_POR_CARRERA if carrera else self.COLUMNAS_POR_CARRERA + ('carrera',)
+
+    def iterar_estudiantes(self, limit=None, carrera=None, pagado=None):
+        return self._streaming(self._filas(islice(self._indices(carrera, pagado), limit)))
+
+    def iterar_estudiantes_pendientes(self):
+        return self._streaming(self._filas(self._indices(pagado=False), self.COLUMNAS_PENDIENTES))
+
+    def iterar_estudiantes_por_carrera(self, carrera=None):
+        return self._streaming(self._filas(self._indices(carrera), self._columnas_por_carrera(carrera)))
+
+    # === BÚSQUEDA ===
+
+    def _coincidencias(self, condicion, columnas):
+        # Recorrido lineal (sin índice de trigramas): sólo para medir el resto de la petición
+        return self._filas((i for i in range(len(self.estudiantes)) if condicion(self.estudiantes.clave(i))), columnas)
+
+    def buscar_estudiantes(self, texto, limite=20, desplazamiento=0):
+        termino = busqueda.termino(texto)
+        if not termino:
+            return {'estudiantes': [], 'siguiente': None}
+        self._esperar()
+        columnas = ('matricula', 'nombre', 'apellido', 'carrera', 'semestre', 'inscripcion_pagada')
+        if busqueda.es_matricula(termino):
+            clave = termino.upper()
+            estudiantes = list(islice(self._coincidencias(lambda c: c[3] == clave, columnas), 1))
+            return {'estudiantes': estudiantes, 'siguiente': None}
+
+        coincide = lambda c: termino in normalizar(f'{c[1]} {c[2]}')
+        estudiantes = [dict(fila, puntaje=1.0) for fila in islice(
+            self._coincidencias(coincide, columnas), desplazamiento, desplazamiento + limite + 1
+        )]
+        siguiente = None
+        if len(estudiantes) > limite:
+            estudiantes, siguiente = estudiantes[:limite], desplazamiento + limite
+        return {'estudiantes': estudiantes, 'siguiente': siguiente}
+
+    def autocompletar_estudiantes(self, prefijo, limite=10):
+        termino = busqueda.termino(prefijo)
+        if not termino:
+            return []
+        self._esperar()
+        coincide = lambda c: normalizar(f'{c[1]} {c[2]}').startswith(termino) or normalizar(c[2]).startswith(termino)
+        return list(islice(self._coincidencias(
+            coincide, ('matricula', 'nombre', 'apellido', 'carrera', 'semestre', 'inscripcion_pagada')
+        ), limite))
+
+    # === HISTORIAL ===
+
+    def _insertar_mensajes(self, registros):
+        self._esperar()
+        for session_id, message_type, user_message, bot_response, intent, confianza, creado in registros:
+            self._historial.setdefault(session_id, []).append({
+                'message_type': message_type, 'user_message': user_message, 'bot_response': bot_response,
+                'intent_detected': intent, 'created_at': creado
+            })
+            self.escrituras += 1
+
+    def _consultar_historial(self, session_id, limite):
+        self._esperar()
+        mensajes = self._historial.get(session_id)
+        if mensajes is None:
+            mensajes = datos.mensajes_sesion(session_id) if session_id in self._sesiones else []
+            self._historial[session_id] = mensajes
+        return list(mensajes[-limite:]) if limite > 0 else []
@@ -0,0 +1,268 @@
+"""Benchmark de carga: /chat, /history, APIs de estudiantes y descargas
+
+    python -m bench.run --escala 100k --concurrencia 16 --peticiones 500
+    python -m bench.run --escala 1m --escenarios chat,todos --salida actual.json --comparar base.json
+
+Sin ``--url`` levanta la app en este proceso (servidor WSGI con hilos) sobre
+``FakeNeonDatabase`` con datos sintéticos; con ``--bd real`` usa la base de
+DATABASE_URL (sembrada con ``python -m bench.sembrar``). Con ``--url`` mide un
+servidor ya levantado, p. ej. gunicorn sobre la base falsa:
+
+    BENCH_ESCALA=100k gunicorn -c gunicorn.conf.py bench.wsgi_fake:app
+
+Cada escenario corre ``--peticiones`` peticiones con ``--concurrencia``
+clientes (conexiones keep-alive) y reporta throughput, p50/p95/p99 y máximo.
+``--comparar`` sale con código 1 si algún escenario empeora más que ``--tolerancia``.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+import http.client
+from urllib.parse import quote, urlsplit
+
+# Permitir ejecutar como script: python bench/run.py
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from bench import datos
+
+
+def _ruta_pagina(estado, rnd):
+    # Recorre el listado con el cursor de la respuesta anterior (por cliente)
+    cursor = estado.get('cursor')
+    ruta = '/api/universidad/estudiantes/todos?limit=200'
+    return ruta + (f'&cursor={cursor}' if cursor else '')
+
+
+def _despues_pagina(estado, cuerpo):
+    try:
+        estado['cursor'] = json.loads(cuerpo).get('siguiente')
+    except ValueError:
+        estado['cursor'] = None
+
+
+# Escenarios: (método, ruta o función(estado, rnd) -> ruta, cuerpo o función, procesar respuesta)
+ESCENARIOS = {
+    'chat': ('POST', '/chat', lambda estado, rnd: {
+        'message': rnd.choice(datos.MENSAJES_CHAT), 'session_id': estado['sesion']
+    }, None),
+    'history': ('GET', lambda estado, rnd: f"/history?session_id={estado['sesion']}", None, None),
+    'estadisticas': ('GET', '/api/universidad/estadisticas', None, None),
+    'carreras': ('GET', '/api/universidad/carreras', None, None),
+    'pendientes': ('GET', '/api/universidad/estudiantes/pendientes', None, None),
+    'todos': ('GET', _ruta_pagina, None, _despues_pagina),
+    'por_carrera': ('GET', lambda estado, rnd: (
+        f"/api/universidad/estudiantes/carrera?carrera={quote(rnd.choice(datos.NOMBRES_CARRERA))}"
+    ), None, None),
+    'buscar': ('GET', lambda estado, rnd: (
+        f"/api/universidad/estudiantes/buscar?q={quote(rnd.choice(datos.BUSQUEDAS))}&limit=20"
+    ), None, None),
+    'autocompletar': ('GET', lambda estado, rnd: (
+        f"/api/universidad/estudiantes/autocompletar?q={quote(rnd.choice(datos.BUSQUEDAS)[:3])}"
+    ), None, None),
+    'excel': ('GET', '/descargar/excel?esperar=1', None, None),
+    'excel_1000': ('GET', '/descargar/excel?limit=1000', None, None),
+    'pdf': ('GET', '/descargar/pdf?esperar=1', None, None),
+    'pendientes_excel': ('GET', '/descargar/reporte/pendientes?esperar=1', None, None),
+}
+
+ESCENARIOS_RAPIDOS = ['chat', 'history', 'estadisticas', 'carreras', 'todos', 'por_carrera', 'excel_1000']
+
+
+def percentil(ordenados, p):
+    """Percentil por rango más cercano de una lista ordenada"""
+    if not ordenados:
+        return 0.0
+    indice = max(0, min(len(ordenados) - 1, int(round(p / 100 * len(ordenados) + 0.5)) - 1))
+    return ordenados[indice]
+
+
+def correr_escenario(base_url, nombre, peticiones, concurrencia, sesiones, semilla=0, timeout=300):
+    """Lanzar ``peticiones`` con ``concurrencia`` clientes; devuelve el resumen de latencias"""
+    metodo, ruta, cuerpo, despues = ESCENARIOS[nombre]
+    partes = urlsplit(base_url)
+    restantes = [peticiones]
+    lock = threading.Lock()
+    latencias = []
+    errores = [0]
+    bytes_recibidos = [0]
+
+    def cliente(numero):
+        rnd = random.Random(semilla * 1000 + numero)
+        estado = {'sesion': rnd.choice(sesiones)}
+        conexion = http.client.HTTPConnection(partes.hostname, partes.port or 80, timeout=timeout)
+        propias = []
+        try:
+            while True:
+                with lock:
+                    if restantes[0] <= 0:
+                        break
+                    restantes[0] -= 1
+
+                url = ruta(estado, rnd) if callable(ruta) else ruta
+                datos_cuerpo = cuerpo(estado, rnd) if callable(cuerpo) else cuerpo
+                encabezados = {'Content-Type': 'application/json'} if datos_cuerpo is not None else {}
+                crudo = json.dumps(datos_cuerpo).encode() if datos_cuerpo is not None else None
+
+                inicio = time.perf_counter()
+                try:
+                    conexion.request(metodo, url, body=crudo, headers=encabezados)
+                    respuesta = conexion.getresponse()
+                    contenido = respuesta.read()
+                    ok = respuesta.status < 400
+                except (OSError, ValueError, http.client.HTTPException):
+                    conexion.close()
+                    conexion = http.client.HTTPConnection(partes.hostname, partes.port or 80, timeout=timeout)
+                    contenido, ok = b'', False
+                propias.append(time.perf_counter() - inicio)
+
+                with lock:
+                    bytes_recibidos[0] += len(contenido)
+                    if not ok:
+                        errores[0] += 1
+                if despues and ok:
+                    despues(estado, contenido)
+        finally:
+            conexion.close()
+            with lock:
+                latencias.extend(propias)
+
+    inicio = time.perf_counter()
+    hilos = [threading.Thread(target=cliente, args=(n,)) for n in range(concurrencia)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    duracion = time.perf_counter() - inicio
+
+    latencias.sort()
+    return {
+        'escenario': nombre,
+        'peticiones': len(latencias),
+        'errores': errores[0],
+        'concurrencia': concurrencia,
+        'duracion_s': round(duracion, 3),
+        'rps': round(len(latencias) / duracion, 1) if duracion else 0.0,
+        'p50_ms': round(percentil(latencias, 50) * 1000, 2),
+        'p95_ms': round(percentil(latencias, 95) * 1000, 2),
+        'p99_ms': round(percentil(latencias, 99) * 1000, 2),
+        'max_ms': round(latencias[-1] * 1000, 2) if latencias else 0.0,
+        'kb_por_peticion': round(bytes_recibidos[0] / 1024 / len(latencias), 1) if latencias else 0.0
+    }
+
+
+def imprimir(resultados):
+    columnas = ['escenario', 'peticiones', 'errores', 'rps', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms', 'kb_por_peticion']
+    anchos = [max(len(c), *(len(str(r[c])) for r in resultados)) for c in columnas]
+    print('  '.join(c.ljust(a) for c, a in zip(columnas, anchos)))
+    for r in resultados:
+        print('  '.join(str(r[c]).ljust(a) for c, a in zip(columnas, anchos)))
+
+
+def comparar(resultados, base, tolerancia):
+    """Regresiones (p95 más alto o rps más bajo que la base por encima de ``tolerancia``)"""
+    previos = {r['escenario']: r for r in base['resultados']}
+    regresiones = []
+    for r in resultados:
+        anterior = previos.get(r['escenario'])
+        if not anterior:
+            continue
+        if anterior['p95_ms'] and r['p95_ms'] > anterior['p95_ms'] * (1 + tolerancia):
+            regresiones.append(f"{r['escenario']}: p95 {anterior['p95_ms']} → {r['p95_ms']} ms")
+        if anterior['rps'] and r['rps'] < anterior['rps'] * (1 - tolerancia):
+            regresiones.append(f"{r['escenario']}: rps {anterior['rps']} → {r['rps']}")
+    return regresiones
+
+
+def servidor_local(bd, n_estudiantes, latencia):
+    """Levantar la app en un hilo sobre la base falsa (o la real); devuelve (url, servidor)"""
+    from werkzeug.serving import make_server
+
+    os.environ.setdefault('CACHE_NOTIFY', '0')
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    os.environ.setdefault('LOG_DEBUG_SAMPLE', '0')
+    import app as app_module
+
+    if bd == 'falsa':
+        from bench.fake_db import FakeNeonDatabase
+        app_module.db = FakeNeonDatabase(n_estudiantes, latencia=latencia)
+
+    servidor = make_server('127.0.0.1', 0, app_module.app, threaded=True)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return f'http://127.0.0.1:{servidor.server_port}', servidor
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--url', help='servidor ya levantado (por defecto, la app en este proceso)')
+    parser.add_argument('--bd', choices=['falsa', 'real'], default='falsa')
+    parser.add_argument('--escala', default='1k', help=f"{', '.join(datos.ESCALAS)} o un número de estudiantes")
+    parser.add_argument('--latencia-ms', type=float, default=2.0, help='latencia simulada por consulta (base falsa)')
+    parser.add_argument('--escenarios', default=','.join(ESCENARIOS_RAPIDOS),
+                        help=f"separados por coma, o 'todos' ({', '.join(ESCENARIOS)})")
+    parser.add_argument('--concurrencia', type=int, default=16)
+    parser.add_argument('--peticiones', type=int, default=500)
+    parser.add_argument('--calentamiento', type=int, default=20, help='peticiones previas no medidas por escenario')
+    parser.add_argument('--salida', help='guardar los resultados en JSON')
+    parser.add_argument('--comparar', help='JSON de una corrida anterior para detectar regresiones')
+    parser.add_argument('--tolerancia', type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    n_estudiantes = datos.escala(args.escala)
+    nombres = list(ESCENARIOS) if args.escenarios == 'todos' else args.escenarios.split(',')
+    desconocidos = [n for n in nombres if n not in ESCENARIOS]
+    if desconocidos:
+        parser.error(f"Escenarios desconocidos: {', '.join(desconocidos)}")
+
+    servidor = None
+    base_url = args.url
+    if not base_url:
+        print(f"⏳ Preparando {n_estudiantes} estudiantes sintéticos (base {args.bd})...")
+        base_url, servidor = servidor_local(args.bd, n_estudiantes, args.latencia_ms / 1000)
+
+    sesiones = datos.sesiones(n_estudiantes)
+    resultados = []
+    try:
+        for nombre in nombres:
+            if args.calentamiento:
+                correr_escenario(base_url, nombre, args.calentamiento, min(args.concurrencia, args.calentamiento), sesiones)
+            resultado = correr_escenario(base_url, nombre, args.peticiones, args.concurrencia, sesiones, semilla=1)
+            resultados.append(resultado)
+            print(f"✅ {nombre}: {resultado['rps']} req/s, p95 {resultado['p95_ms']} ms")
+    finally:
+        if servidor is not None:
+            servidor.shutdown()
+
+    print()
+    imprimir(resultados)
+
+    informe = {
+        'escala': n_estudiantes,
+        'bd': 'externa' if args.url else args.bd,
+        'latencia_ms': args.latencia_ms,
+        'concurrencia': args.concurrencia,
+        'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'resultados': resultados
+    }
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(informe, f, indent=2, ensure_ascii=False)
+        print(f"\n💾 Resultados guardados en {args.salida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            regresiones = comparar(resultados, json.load(f), args.tolerancia)
+        if regresiones:
+            print("\n❌ Regresiones:")
+            for regresion in regresiones:
+                print(f"   • {regresion}")
+            return 1
+        print(f"\n✅ Sin regresiones (tolerancia {args.tolerancia:.0%})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,20 @@
+"""La app sobre FakeNeonDatabase, para medir el despliegue real (gunicorn) sin Postgres
+
+    BENCH_ESCALA=100k BENCH_LATENCIA_MS=2 gunicorn -c gunicorn.conf.py bench.wsgi_fake:app
+    python -m bench.run --url http://127.0.0.1:5000 --escala 100k
+"""
+import os
+
+os.environ.setdefault('CACHE_NOTIFY', '0')
+
+import app as app_module
+from bench import datos
+from bench.fake_db import FakeNeonDatabase
+
+app_module.db = FakeNeonDatabase(
+    datos.escala(os.getenv('BENCH_ESCALA', '1k')),
+    latencia=float(os.getenv('BENCH_LATENCIA_MS', 2)) / 1000
+)
+# gunicorn.conf.py importa ``db`` de app en sus hooks
+db = app_module.db
+app = application = app_module.app
@@ -0,0 +1,378 @@
+import os
+import logging
+import asyncio
+import time
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+try:
+    import asyncpg
+except ImportError:  # Sólo necesario para el modo asíncrono (asgi.py)
+    asyncpg = None
+
+from config import respuestas as textos
+from config import busqueda, entidades
+from config.database import codificar_cursor, decodificar_cursor, clave_cursor
+from config.metrics import medir_consulta
+from config.queries import posicional, nombre_pagina, usar_preparadas
+
+
+logger = logging.getLogger(__name__)
+
+
+# Parámetros de libpq que asyncpg no entiende (los tomaría como ajustes del servidor)
+_PARAMETROS_LIBPQ = {'channel_binding'}
+
+
+def dsn_asyncpg(url):
+    """URL de psycopg2/libpq adaptada para asyncpg"""
+    partes = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(partes.query) if k not in _PARAMETROS_LIBPQ]
+    return urlunsplit(partes._replace(query=urlencode(query)))
+
+
+class AsyncNeonDatabase:
+    """Acceso asíncrono a Neon con un pool de asyncpg para el modo ASGI
+
+    Comparte con ``NeonDatabase`` el clasificador, las cachés, el historial,
+    la escritura diferida y los reportes; sólo las consultas cambian, de
+    modo que una espera de red no bloquea al worker. Lo que aún es
+    síncrono (reportes, índice de common_intents) corre en un hilo con
+    ``asyncio.to_thread``.
+
+    Las consultas salen del registro de config/queries.py (en formato $n).
+    El pooler de Neon (pgbouncer en modo transacción) no admite sentencias
+    preparadas con nombre: con DB_PREPARED=auto la caché de sentencias de
+    asyncpg sólo se activa con una conexión directa.
+    """
+
+    def __init__(self, db, dsn=None, min_size=None, max_size=None):
+        self.db = db
+        self.dsn = dsn_asyncpg(dsn or os.getenv('DATABASE_ASYNC_URL') or db.db_url)
+        self.min_size = min_size or int(os.getenv('DB_ASYNC_POOL_MIN', 1))
+        self.max_size = max_size or int(os.getenv('DB_ASYNC_POOL_MAX', 20))
+        self.pool = None
+        self._manejadores = {
+            'busqueda': self._procesar_busqueda,
+            'estudiantes': self._procesar_consulta_estudiantes,
+            'estadisticas': self._procesar_estadisticas,
+            'inscripciones': self._procesar_inscripciones,
+            'reportes': self._procesar_reportes,
+            'carreras': self._procesar_carreras
+        }
+
+    async def conectar(self):
+        if asyncpg is None:
+            raise RuntimeError("El modo asíncrono necesita el paquete 'asyncpg'")
+        self.pool = await asyncpg.create_pool(
+            self.dsn,
+            min_size=self.min_size,
+            max_size=self.max_size,
+            statement_cache_size=100 if usar_preparadas(self.dsn) else 0,
+            command_timeout=float(os.getenv('DB_ASYNC_TIMEOUT', 30))
+        )
+        logger.info("✅ Pool asyncpg listo (%s-%s conexiones)", self.min_size, self.max_size)
+
+    async def cerrar(self):
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
+
+    async def fetch(self, query, *args):
+        """Filas de una consulta como dicts (mismo formato que RealDictCursor)"""
+        async with self.pool.acquire() as conn:
+            return [dict(fila) for fila in await conn.fetch(query, *args)]
+
+    @medir_consulta('async_iterar')
+    async def iterar(self, query, *args, prefetch=2000):
+        """Recorrer una consulta con un cursor del servidor (la conexión se libera al terminar)"""
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                async for fila in conn.cursor(query, *args, prefetch=prefetch):
+                    yield dict(fila)
+
+    @staticmethod
+    async def _sin_bloquear(cache, funcion, *args, **kwargs):
+        """Operación sobre ``cache``: directa si es en memoria, en un hilo si hace E/S (Redis)"""
+        if cache.bloqueante:
+            return await asyncio.to_thread(funcion, *args, **kwargs)
+        return funcion(*args, **kwargs)
+
+    # === CHAT ===
+
+    async def procesar_mensaje(self, user_message):
+        """Versión asíncrona de NeonDatabase.procesar_mensaje (mismas respuestas y caché)"""
+        try:
+            clasificacion = self.db.clasificador.classify(user_message)
+            logger.debug("🔍 Analizando: '%s' → %s", clasificacion.texto, clasificacion.intent)
+
+            cacheada = await self._sin_bloquear(self.db.respuestas, self.db._respuesta_cacheada, clasificacion)
+            if cacheada is not None:
+                return cacheada
+
+            manejador = self._manejadores.get(clasificacion.intent)
+            if manejador:
+                resultado = await manejador(clasificacion)
+            else:
+                # common_intents se resuelve en memoria (la recarga periódica va en un hilo)
+                resultado = await asyncio.to_thread(self.db._procesar_consulta_normal, clasificacion)
+
+            await self._sin_bloquear(self.db.respuestas, self.db._cachear_respuesta, clasificacion, resultado)
+            return resultado
+
+        except Exception as e:
+            logger.error("❌ Error en procesar_mensaje (async): %s", e)
+            return "¡Hola! ¿En qué puedo ayudarte con información universitaria?", "error", 0.0, {}
+
+    async def _procesar_estadisticas(self, clasificacion):
+        try:
+            return textos.respuesta_estadisticas(await self.get_estadisticas_estudiantes())
+        except Exception as e:
+            logger.error("❌ Error procesando estadísticas: %s", e)
+            return "Error obteniendo estadísticas universitarias.", "error", 0.0, {}
+
+    async def _entidades(self, clasificacion):
+        return entidades.extraer_entidades(clasificacion.texto, await self.get_carreras())
+
+    async def _procesar_inscripciones(self, clasificacion, filtros=None):
+        try:
+            filtros = filtros or await self._entidades(clasificacion)
+            if filtros.pagado is False:
+                pagina = await self.get_estudiantes_pagina(
+                    filtros.carrera, False, limite=textos.LIMITE_LISTA, semestre=filtros.semestre
+                )
+                total = None
+                if filtros.semestre is None:
+                    total = textos.pendientes_en_estadisticas(await self.get_estadisticas_estudiantes(), filtros.carrera)
+                return textos.respuesta_pendientes(
+                    pagina['estudiantes'], total, entidades.describir(filtros._replace(pagado=None)),
+                    pagina['siguiente'] is not None
+                )
+            return textos.respuesta_inscripciones()
+        except Exception as e:
+            logger.error("❌ Error procesando inscripciones: %s", e)
+            return "Error obteniendo información de inscripciones.", "error", 0.0, {}
+
+    async def _procesar_reportes(self, clasificacion):
+        # La cola de reportes es síncrona (versión de datos, archivos en disco)
+        return await asyncio.to_thread(self.db._procesar_reportes, clasificacion)
+
+    async def _procesar_carreras(self, clasificacion):
+        try:
+            carreras = await self.get_carreras()
+            carrera = entidades.extraer_entidades(clasificacion.texto, carreras).carrera
+            if carrera:
+                carreras = [c for c in carreras if c['nombre'] == carrera]
+            return textos.respuesta_carreras(carreras)
+        except Exception as e:
+            logger.error("❌ Error obteniendo carreras: %s", e)
+            return "Error obteniendo información de carreras.", "error", 0.0, {}
+
+    async def _procesar_consulta_estudiantes(self, clasificacion):
+        try:
+            if clasificacion.palabras & {'total', 'cuantos'}:
+                return textos.respuesta_total_estudiantes(await self.get_estadisticas_estudiantes())
+            filtros = await self._entidades(clasificacion)
+            if filtros.pagado is False or ('inscripciones' in clasificacion.intenciones and filtros.pagado is None):
+                return await self._procesar_inscripciones(clasificacion, filtros)
+
+            if filtros.matricula:
+                resultado = await self.buscar_estudiantes(filtros.matricula)
+                return textos.respuesta_busqueda(filtros.matricula, resultado['estudiantes'])
+
+            if filtros.carrera or filtros.semestre or filtros.pagado is not None:
+                pagina = await self.get_estudiantes_pagina(
+                    filtros.carrera, filtros.pagado, limite=textos.LIMITE_LISTA, semestre=filtros.semestre
+                )
+                return textos.respuesta_estudiantes_filtrados(
+                    pagina['estudiantes'], entidades.describir(filtros), pagina['siguiente'] is not None
+                )
+            return textos.respuesta_estudiantes()
+        except Exception as e:
+            logger.error("❌ Error procesando consulta estudiantes: %s", e)
+            return "Error obteniendo información de estudiantes.", "error", 0.0, {}
+
+    async def _procesar_busqueda(self, clasificacion):
+        try:
+            termino = busqueda.extraer_termino_chat(clasificacion.texto)
+            if not termino:
+                return textos.respuesta_busqueda_sin_termino()
+            resultado = await self.buscar_estudiantes(termino, limite=5)
+            return textos.respuesta_busqueda(termino, resultado['estudiantes'])
+        except Exception as e:
+            logger.error("❌ Error buscando estudiante: %s", e)
+            return "Error buscando al estudiante.", "error", 0.0, {}
+
+    async def get_chat_history(self, session_id, limit=20):
+        """Historial desde la caché de sesiones o, si no está, desde la BD"""
+        mensajes = await self._sin_bloquear(self.db.historial, self.db.historial.get, session_id, limit)
+        if mensajes is not None:
+            return mensajes
+
+        try:
+            # Un mensaje guardado mientras se lee la BD hace que no se cachee esta lectura
+            marca = await self._sin_bloquear(self.db.historial, self.db.historial.marca, session_id)
+
+            # Los mensajes aún en cola deben verse en el historial
+            if self.db.escritura_diferida:
+                await asyncio.to_thread(self.db.mensajes.vaciar)
+
+            messages = await self.fetch(posicional('historial'), session_id, max(limit, self.db.historial.maxlen))
+
+            messages.reverse()  # Ordenar de más viejo a más nuevo
+            if limit <= self.db.historial.maxlen:
+                await self._sin_bloquear(self.db.historial, self.db.historial.set, session_id, messages, marca)
+            return messages[-limit:] if limit > 0 else []
+
+        except Exception as e:
+            logger.error("❌ Error obteniendo historial: %s", e)
+            return []
+
+    # === MÉTODOS UNIVERSITARIOS ===
+
+    async def get_estadisticas_estudiantes(self):
+        """Estadísticas desde resumen_carreras, compartiendo la caché del modo síncrono"""
+        marcador = object()
+        estadisticas = await self._sin_bloquear(self.db.cache, self.db.cache.get, 'estadisticas', marcador)
+        if estadisticas is not marcador:
+            return estadisticas
+
+        try:
+            try:
+                filas = await self.fetch(posicional('resumen_carreras'))
+            except asyncpg.exceptions.UndefinedTableError:
+                filas = await self.fetch(posicional('agregar_por_carrera'))
+
+            estadisticas = textos.armar_estadisticas(filas)
+            if estadisticas['por_carrera']:
+                await self._sin_bloquear(self.db.cache, self.db.cache.set, 'estadisticas', estadisticas,
+                                         tags=('estudiantes',))
+            return estadisticas
+
+        except Exception as e:
+            logger.error("❌ Error obteniendo estadísticas: %s", e)
+            return {}
+
+    async def get_carreras(self):
+        marcador = object()
+        carreras = await self._sin_bloquear(self.db.cache, self.db.cache.get, 'carreras', marcador)
+        if carreras is not marcador:
+            return carreras
+
+        try:
+            carreras = await self.fetch(posicional('carreras'))
+            if carreras:
+                await self._sin_bloquear(self.db.cache, self.db.cache.set, 'carreras', carreras,
+                                         ttl=float(os.getenv('CARRERAS_TTL', 300)), tags=('carreras',))
+            return carreras
+
+        except Exception as e:
+            logger.error("❌ Error obteniendo carreras: %s", e)
+            return []
+
+    @medir_consulta('async_get_estudiantes_pendientes_inscripcion')
+    async def get_estudiantes_pendientes_inscripcion(self):
+        try:
+            return await self.fetch(posicional('estudiantes_pendientes'))
+        except Exception as e:
+            logger.error("❌ Error obteniendo estudiantes pendientes: %s", e)
+            return []
+
+    @medir_consulta('async_get_estudiantes_por_carrera')
+    async def get_estudiantes_por_carrera(self, carrera=None):
+        try:
+            if carrera:
+                return await self.fetch(posicional('estudiantes_de_carrera'), carrera)
+            return await self.fetch(posicional('estudiantes_por_carrera'))
+        except Exception as e:
+            logger.error("❌ Error obteniendo estudiantes por carrera: %s", e)
+            return []
+
+    def _consulta_estudiantes(self, carrera, pagado, cursor=None, semestre=None):
+        """SELECT del listado de estudiantes con filtros y continuación ($n de asyncpg)"""
+        params = [valor for valor in (carrera, pagado, semestre) if valor is not None]
+        if cursor:
+            params.extend(decodificar_cursor(cursor))
+        query = posicional(nombre_pagina(bool(carrera), pagado is not None, bool(cursor), semestre is not None))
+        return query, params
+
+    @medir_consulta('async_get_estudiantes_pagina')
+    async def get_estudiantes_pagina(self, carrera=None, pagado=None, cursor=None, limite=200, semestre=None):
+        """Igual que NeonDatabase.get_estudiantes_pagina; ValueError si el cursor no es válido"""
+        query, params = self._consulta_estudiantes(carrera, pagado, cursor, semestre)
+        try:
+            estudiantes = await self.fetch(query, *params, limite + 1)
+
+            siguiente = None
+            if len(estudiantes) > limite:
+                estudiantes = estudiantes[:limite]
+                ultimo = estudiantes[-1]
+                siguiente = codificar_cursor(clave_cursor(ultimo))
+            return {'estudiantes': estudiantes, 'siguiente': siguiente}
+
+        except Exception as e:
+            logger.error("❌ Error en get_estudiantes_pagina (async): %s", e)
+            return {'estudiantes': [], 'siguiente': None}
+
+    @medir_consulta('async_buscar_estudiantes')
+    async def buscar_estudiantes(self, texto, limite=20, desplazamiento=0):
+        """Igual que NeonDatabase.buscar_estudiantes"""
+        termino = busqueda.termino(texto)
+        if not termino:
+            return {'estudiantes': [], 'siguiente': None}
+
+        try:
+            if busqueda.es_matricula(termino):
+                estudiantes = await self.fetch(posicional('buscar_matricula'), termino.upper())
+                return {'estudiantes': estudiantes, 'siguiente': None}
+
+            estudiantes = await self._buscar('buscar_estudiantes', (termino, termino, termino),
+                                             ('buscar_estudiantes_ilike', (busqueda.patron_like(termino),)),
+                                             (limite + 1, desplazamiento))
+            siguiente = None
+            if len(estudiantes) > limite:
+                estudiantes = estudiantes[:limite]
+                siguiente = desplazamiento + limite
+            return {'estudiantes': estudiantes, 'siguiente': siguiente}
+
+        except Exception as e:
+            logger.error("❌ Error en buscar_estudiantes (async): %s", e)
+            return {'estudiantes': [], 'siguiente': None}
+
+    @medir_consulta('async_autocompletar_estudiantes')
+    async def autocompletar_estudiantes(self, prefijo, limite=10):
+        termino = busqueda.termino(prefijo)
+        if not termino:
+            return []
+
+        try:
+            patron = busqueda.patron_like(termino, prefijo=True)
+            return await self._buscar('autocompletar_estudiantes', busqueda.rango_prefijo(termino) * 2,
+                                      ('autocompletar_estudiantes_ilike', (patron, patron)), (limite,))
+        except Exception as e:
+            logger.error("❌ Error en autocompletar_estudiantes (async): %s", e)
+            return []
+
+    async def _buscar(self, consulta, params, respaldo, paginacion):
+        # Comparte con NeonDatabase el aviso de que faltan las migraciones de pg_trgm
+        if time.monotonic() >= self.db._busqueda_sin_indice_hasta:
+            try:
+                return await self.fetch(posicional(consulta), *params, *paginacion)
+            except (asyncpg.exceptions.UndefinedFunctionError, asyncpg.exceptions.UndefinedObjectError):
+                self.db._busqueda_sin_indice_hasta = time.monotonic() + self.db.busqueda_reintento
+                logger.warning("⚠️ Búsqueda sin índices (python config/migrations.py); usando ILIKE por %ss",
+                               self.db.busqueda_reintento)
+
+        consulta, params = respaldo
+        return await self.fetch(posicional(consulta), *params, *paginacion)
+
+    def iterar_estudiantes(self, limit=None, carrera=None, pagado=None):
+        query, params = self._consulta_estudiantes(carrera, pagado)
+        return self.iterar(query, *params, limit)
+
+    def iterar_estudiantes_pendientes(self):
+        return self.iterar(posicional('estudiantes_pendientes_completo'))
+
+    def iterar_estudiantes_por_carrera(self, carrera=None):
+        if carrera:
+            return self.iterar(posicional('estudiantes_de_carrera'), carrera)
+        return self.iterar(posicional('estudiantes_por_carrera'))
@@ -0,0 +1,64 @@
+import re
+
+from config.intents import normalizar
+
+
+# Búsqueda de estudiantes por nombre: utilidades sin acceso a la BD.
+# El texto buscado se normaliza igual que chatbot_normalizar() en Postgres
+# (minúsculas y sin acentos), así "Pérez", "perez" y "PEREZ" coinciden.
+
+MIN_CARACTERES = 2
+MAX_CARACTERES = 100
+
+# Matrículas: letras opcionales y al menos tres dígitos (A0001234, 2023-0456)
+_PATRON_MATRICULA = re.compile(r'[a-z]{0,4}-?\d{3,}[a-z0-9-]*')
+
+# "busca a Juan Pérez", "buscar al alumno juan", "encuentra a la estudiante María López"
+_PATRON_CHAT = re.compile(
+    r'\b(?:busca|buscar|buscame|encuentra|encontrar)\b\s*'
+    r'(?:a\s+la\s+|al\s+|a\s+)?'
+    r'(?:(?:el|la)\s+)?(?:(?:estudiante|alumno|alumna)\b\s*)?'
+    r'(?:(?:llamad[oa]|de\s+nombre)\s+)?'
+    r'(?P<termino>.*)'
+)
+
+
+def termino(texto):
+    """Texto de búsqueda normalizado y recortado; ``None`` si es demasiado corto"""
+    texto = normalizar(texto or '')[:MAX_CARACTERES].strip(' ¿?¡!.,;:"\'')
+    return texto if len(texto) >= MIN_CARACTERES else None
+
+
+def es_matricula(texto):
+    return bool(_PATRON_MATRICULA.fullmatch(texto))
+
+
+def rango_prefijo(prefijo):
+    """(desde, hasta) con ``desde <= texto < hasta`` equivalente a ``texto LIKE prefijo || '%'``
+
+    Como rango lo usa el índice ``text_pattern_ops`` también con planes
+    genéricos de sentencias preparadas (un ``LIKE $1`` no puede).
+    """
+    return prefijo, prefijo[:-1] + chr(ord(prefijo[-1]) + 1)
+
+
+def patron_like(texto, prefijo=False):
+    """Patrón ILIKE que busca ``texto`` literal (escapando % y _)"""
+    texto = texto.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return f'{texto}%' if prefijo else f'%{texto}%'
+
+
+def extraer_termino_chat(texto):
+    """Nombre o matrícula pedido en un mensaje como "busca a Juan Pérez" (``None`` si no hay)"""
+    coincidencia = _PATRON_CHAT.search(texto)
+    if not coincidencia:
+        return None
+    return termino(coincidencia.group('termino'))
+
+
+def resolver_carreras(texto, carreras):
+    """Nombres de las carreras (de ``get_carreras``) que contienen ``texto``, sin acentos"""
+    buscado = normalizar(texto or '')
+    if not buscado:
+        return []
+    return [carrera['nombre'] for carrera in carreras if buscado in normalizar(carrera['nombre'])]
@@ -0,0 +1,551 @@
+import os
+import logging
+import json
+import time
+import pickle
+import threading
+from collections import OrderedDict, deque
+
+try:
+    import redis
+except ImportError:  # Backend compartido opcional
+    redis = None
+
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend:
+    """Interfaz común de las cachés clave-valor
+
+    - ``get(key, default)``: valor vigente o ``default``
+    - ``set(key, value, ttl, tags)``: guardar con expiración y etiquetas
+    - ``invalidate(key=None)`` / ``invalidate_tag(tag)``: descartar entradas
+    - ``stats()``: hits, misses y hit_rate
+
+    ``TTLCache`` vive en el proceso; ``RedisCache`` se comparte entre los
+    workers de un mismo host (o de varios). ``bloqueante`` indica si las
+    operaciones hacen E/S de red (el modo asíncrono las llama en un hilo).
+    """
+
+    bloqueante = False
+
+    def get(self, key, default=None):
+        raise NotImplementedError
+
+    def set(self, key, value, ttl=None, tags=()):
+        raise NotImplementedError
+
+    def invalidate(self, key=None):
+        raise NotImplementedError
+
+    def invalidate_tag(self, tag):
+        raise NotImplementedError
+
+    def stats(self):
+        raise NotImplementedError
+
+    def get_or_set(self, key, loader, ttl=None, tags=()):
+        """Devolver el valor cacheado o calcularlo con ``loader()`` y guardarlo
+
+        Los valores vacíos (``{}``, ``[]``, ``None``) no se cachean para no
+        fijar un error transitorio de la base de datos durante todo el TTL.
+        """
+        marcador = object()
+        valor = self.get(key, marcador)
+        if valor is not marcador:
+            return valor
+
+        valor = loader()
+        if valor:
+            self.set(key, valor, ttl, tags)
+        return valor
+
+
+class TTLCache(CacheBackend):
+    """Caché en memoria thread-safe con expiración por entrada y límite de tamaño (LRU)
+
+    Cada entrada puede llevar etiquetas (por ejemplo la tabla de la que
+    depende) para invalidar de una vez todo lo derivado de esa tabla.
+    """
+
+    def __init__(self, default_ttl=60, maxsize=1024):
+        self.default_ttl = default_ttl
+        self.maxsize = maxsize
+        self._datos = OrderedDict()  # clave -> (valor, expira, etiquetas)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        """Valor vigente para ``key`` o ``default`` si no existe o expiró"""
+        with self._lock:
+            entrada = self._datos.get(key)
+            if entrada is not None:
+                valor, expira, _ = entrada
+                if expira > time.monotonic():
+                    self._datos.move_to_end(key)
+                    self.hits += 1
+                    return valor
+                del self._datos[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl=None, tags=()):
+        ttl = self.default_ttl if ttl is None else ttl
+        with self._lock:
+            self._datos[key] = (value, time.monotonic() + ttl, frozenset(tags))
+            self._datos.move_to_end(key)
+            while len(self._datos) > self.maxsize:
+                self._datos.popitem(last=False)
+
+    def invalidate(self, key=None):
+        """Eliminar una clave o, sin argumentos, todo el contenido"""
+        with self._lock:
+            if key is None:
+                self._datos.clear()
+            else:
+                self._datos.pop(key, None)
+
+    def invalidate_tag(self, tag):
+        """Eliminar todas las entradas con la etiqueta ``tag``; devuelve cuántas se eliminaron"""
+        with self._lock:
+            claves = [key for key, (_, _, tags) in self._datos.items() if tag in tags]
+            for key in claves:
+                del self._datos[key]
+            return len(claves)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'backend': 'memoria',
+                'entradas': len(self._datos),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / total, 3) if total else 0.0
+            }
+
+
+class HistoryCache:
+    """Últimos mensajes por sesión en memoria (anillo acotado) con LRU entre sesiones
+
+    Cada sesión guarda a lo sumo ``maxlen`` mensajes en orden cronológico.
+    Una sesión sólo se cachea completa (tras leerla de la base de datos),
+    así ``append`` ignora sesiones que no están en memoria y un ``get`` que
+    pide más de ``maxlen`` mensajes es siempre un miss.
+
+    Para no cachear una lectura que ya quedó vieja, ``marca`` se toma antes
+    de consultar la base de datos y ``set`` descarta el resultado si la
+    sesión cambió (``append`` o ``invalidate``) desde entonces.
+    """
+
+    bloqueante = False
+
+    def __init__(self, maxsesiones=1000, maxlen=50, ttl=900):
+        self.maxsesiones = maxsesiones
+        self.maxlen = maxlen
+        self.ttl = ttl
+        self._sesiones = OrderedDict()  # session_id -> (deque de mensajes, expira)
+        self._cambios = OrderedDict()  # session_id -> número del último cambio
+        self._contador = 0
+        self._olvidado = 0  # cambio más reciente que ya no está en _cambios
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.descartes = 0
+
+    def get(self, session_id, limit):
+        """Últimos ``limit`` mensajes (del más viejo al más nuevo) o ``None`` si no está cacheada"""
+        with self._lock:
+            entrada = self._sesiones.get(session_id)
+            if entrada is not None and limit <= self.maxlen:
+                mensajes, expira = entrada
+                if expira > time.monotonic():
+                    self._sesiones.move_to_end(session_id)
+                    self.hits += 1
+                    return list(mensajes)[-limit:] if limit > 0 else []
+                del self._sesiones[session_id]
+            self.misses += 1
+            return None
+
+    def marca(self, session_id):
+        """Marca a tomar antes de leer la sesión de la base de datos (ver ``set``)"""
+        with self._lock:
+            return self._contador
+
+    def set(self, session_id, mensajes, marca=None):
+        """Cachear el historial de una sesión leído de la base de datos (orden cronológico)
+
+        Con ``marca`` no se cachea si la sesión cambió después de tomarla.
+        """
+        with self._lock:
+            if marca is not None and max(self._cambios.get(session_id, 0), self._olvidado) > marca:
+                self.descartes += 1
+                return
+            self._sesiones[session_id] = (deque(mensajes, maxlen=self.maxlen), time.monotonic() + self.ttl)
+            self._sesiones.move_to_end(session_id)
+            while len(self._sesiones) > self.maxsesiones:
+                self._sesiones.popitem(last=False)
+
+    def _registrar_cambio(self, session_id):
+        self._contador += 1
+        self._cambios[session_id] = self._contador
+        self._cambios.move_to_end(session_id)
+        while len(self._cambios) > self.maxsesiones:
+            _, numero = self._cambios.popitem(last=False)
+            self._olvidado = max(self._olvidado, numero)
+
+    def append(self, session_id, mensaje):
+        """Agregar un mensaje nuevo a una sesión cacheada (no-op si no está en memoria)"""
+        with self._lock:
+            self._registrar_cambio(session_id)
+            entrada = self._sesiones.get(session_id)
+            if entrada is not None:
+                entrada[0].append(mensaje)
+                self._sesiones.move_to_end(session_id)
+
+    def invalidate(self, session_id=None):
+        """Olvidar una sesión o, sin argumentos, todas"""
+        with self._lock:
+            if session_id is None:
+                self._sesiones.clear()
+                self._cambios.clear()
+                self._contador += 1
+                self._olvidado = self._contador
+            else:
+                self._sesiones.pop(session_id, None)
+                self._registrar_cambio(session_id)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'sesiones': len(self._sesiones),
+                'hits': self.hits,
+                'misses': self.misses,
+                'descartes': self.descartes,
+                'hit_rate': round(self.hits / total, 3) if total else 0.0
+            }
+
+
+# === BACKEND COMPARTIDO (Redis o compatible: Valkey, KeyDB, Dragonfly) ===
+
+_clientes = {}
+_clientes_lock = threading.Lock()
+
+
+def _cliente_redis(url):
+    """Un cliente por URL y proceso (redis-py rehace sus conexiones tras un fork)"""
+    with _clientes_lock:
+        if url not in _clientes:
+            _clientes[url] = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        return _clientes[url]
+
+
+def _clave(key):
+    return key if isinstance(key, str) else json.dumps(key, ensure_ascii=False)
+
+
+class RedisCache(CacheBackend):
+    """Caché compartida en Redis: un valor calculado por un worker lo ven todos
+
+    Los valores se serializan con pickle (sólo datos propios en un Redis
+    local de confianza). Si Redis no responde, cada operación se comporta
+    como un miss y la aplicación sigue consultando la base de datos.
+    ``get_or_set`` toma un candado corto para que, ante un miss, un solo
+    worker ejecute la consulta y los demás esperen su resultado.
+
+    Con ``maxsize`` las claves se anotan en un sorted set por último uso y
+    cada ``set`` recorta las menos usadas que sobran (LRU aproximado entre
+    workers, como ``TTLCache``); sin él sólo los TTL acotan la memoria.
+    La expiración de los conjuntos por etiqueta y del índice sólo se alarga
+    (``EXPIRE NX`` y ``GT``, Redis 7 o compatible): nunca vencen antes que
+    las claves que listan.
+    """
+
+    bloqueante = True
+
+    def __init__(self, url, namespace, default_ttl=60, maxsize=None, espera=5.0):
+        self.url = url
+        self.namespace = namespace
+        self.default_ttl = default_ttl
+        self.maxsize = maxsize
+        self.espera = espera
+        self.hits = 0
+        self.misses = 0
+        self.errores = 0
+        self._lock = threading.Lock()
+        self._pausa_hasta = 0.0
+
+    @property
+    def _redis(self):
+        # Tras un error no se reintenta durante unos segundos: sin Redis no se paga un timeout por operación
+        if time.monotonic() < self._pausa_hasta:
+            raise ConnectionError('caché Redis en pausa tras un error')
+        return _cliente_redis(self.url)
+
+    def _k(self, key):
+        return f"{self.namespace}:{_clave(key)}"
+
+    def _tag(self, tag):
+        return f"{self.namespace}:#{tag}"
+
+    @property
+    def _indice(self):
+        # Doble '#' para no chocar con una etiqueta llamada igual
+        return f"{self.namespace}:##lru"
+
+    @staticmethod
+    def _alargar(pipe, clave, ttl):
+        """Expirar ``clave`` a los ``ttl`` + 60 s si no tenía expiración o si vencía antes"""
+        segundos = max(int(ttl), 1) + 60
+        pipe.expire(clave, segundos, nx=True)
+        pipe.expire(clave, segundos, gt=True)
+
+    def _indexar(self, pipe, clave, ttl):
+        """Anotar el uso de ``clave`` en el índice LRU (dentro de un pipeline)"""
+        if self.maxsize:
+            pipe.zadd(self._indice, {clave: time.time()})
+            self._alargar(pipe, self._indice, ttl)
+
+    def _recortar(self):
+        """Borrar las claves menos usadas que exceden ``maxsize``"""
+        if not self.maxsize:
+            return
+        sobran = self._redis.zcard(self._indice) - self.maxsize
+        if sobran > 0:
+            claves = self._redis.zrange(self._indice, 0, sobran - 1)
+            if claves:
+                pipe = self._redis.pipeline()
+                pipe.delete(*claves)
+                pipe.zrem(self._indice, *claves)
+                pipe.execute()
+
+    def _contar(self, campo):
+        with self._lock:
+            setattr(self, campo, getattr(self, campo) + 1)
+
+    def _error(self, operacion, e):
+        if time.monotonic() < self._pausa_hasta:
+            return
+        self._contar('errores')
+        self._pausa_hasta = time.monotonic() + 5.0
+        logger.error("❌ Error en caché Redis (%s %s): %s", operacion, self.namespace, e)
+
+    def get(self, key, default=None):
+        clave = self._k(key)
+        try:
+            if self.maxsize:
+                pipe = self._redis.pipeline()
+                pipe.get(clave)
+                pipe.zadd(self._indice, {clave: time.time()}, xx=True)
+                crudo = pipe.execute()[0]
+            else:
+                crudo = self._redis.get(clave)
+        except Exception as e:
+            self._error('get', e)
+            crudo = None
+        if crudo is None:
+            self._contar('misses')
+            return default
+        self._contar('hits')
+        return pickle.loads(crudo)
+
+    def set(self, key, value, ttl=None, tags=()):
+        ttl = self.default_ttl if ttl is None else ttl
+        clave = self._k(key)
+        try:
+            pipe = self._redis.pipeline()
+            pipe.set(clave, pickle.dumps(value), px=max(int(ttl * 1000), 1))
+            for tag in tags:
+                pipe.sadd(self._tag(tag), clave)
+                self._alargar(pipe, self._tag(tag), ttl)
+            self._indexar(pipe, clave, ttl)
+            pipe.execute()
+            self._recortar()
+        except Exception as e:
+            self._error('set', e)
+
+    def get_or_set(self, key, loader, ttl=None, tags=()):
+        marcador = object()
+        valor = self.get(key, marcador)
+        if valor is not marcador:
+            return valor
+
+        candado = f"{self._k(key)}#cargando"
+        try:
+            propio = self._redis.set(candado, os.getpid(), nx=True, px=int(self.espera * 1000))
+        except Exception as e:
+            self._error('candado', e)
+            propio = True
+
+        if not propio:
+            # Otro worker está calculando el valor: esperarlo antes de consultar por cuenta propia
+            limite = time.monotonic() + self.espera
+            while time.monotonic() < limite:
+                time.sleep(0.05)
+                try:
+                    crudo = self._redis.get(self._k(key))
+                except Exception:
+                    break
+                if crudo is not None:
+                    return pickle.loads(crudo)
+
+        try:
+            valor = loader()
+            if valor:
+                self.set(key, valor, ttl, tags)
+            return valor
+        finally:
+            if propio:
+                try:
+                    self._redis.delete(candado)
+                except Exception:
+                    pass
+
+    def invalidate(self, key=None):
+        try:
+            if key is not None:
+                pipe = self._redis.pipeline()
+                pipe.delete(self._k(key))
+                pipe.zrem(self._indice, self._k(key))
+                pipe.execute()
+                return
+            claves = list(self._redis.scan_iter(match=f"{self.namespace}:*", count=500))
+            if claves:
+                self._redis.delete(*claves)
+        except Exception as e:
+            self._error('invalidate', e)
+
+    def invalidate_tag(self, tag):
+        try:
+            claves = list(self._redis.smembers(self._tag(tag)))
+            pipe = self._redis.pipeline()
+            if claves:
+                pipe.delete(*claves)
+                pipe.zrem(self._indice, *claves)
+            pipe.delete(self._tag(tag))
+            pipe.execute()
+            return len(claves)
+        except Exception as e:
+            self._error('invalidate_tag', e)
+            return 0
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'backend': 'redis',
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'errores': self.errores,
+                'hit_rate': round(self.hits / total, 3) if total else 0.0
+            }
+
+
+class RedisHistoryCache:
+    """Versión compartida de HistoryCache: la lista de cada sesión vive en Redis
+
+    Así un mensaje guardado por un worker aparece en el historial que sirve
+    otro. ``append`` sólo escribe si la sesión ya existe (``xx``); se aceptan
+    las carreras entre dos mensajes simultáneos de una misma sesión. Cada
+    ``append`` sube además un contador por sesión: ``set`` con la ``marca``
+    tomada antes de leer la BD no pisa la lista si hubo mensajes entre medio.
+    """
+
+    bloqueante = True
+
+    def __init__(self, url, namespace, maxsesiones=None, maxlen=50, ttl=900):
+        self.url = url
+        self.namespace = namespace
+        self.maxlen = maxlen
+        self.ttl = ttl
+        self._cache = RedisCache(url, namespace, default_ttl=ttl, maxsize=maxsesiones)
+
+    def get(self, session_id, limit):
+        if limit > self.maxlen:
+            self._cache._contar('misses')
+            return None
+        mensajes = self._cache.get(session_id)
+        if mensajes is None:
+            return None
+        return mensajes[-limit:] if limit > 0 else []
+
+    def _contador(self, session_id):
+        return f"{self.namespace}:#cambios:{_clave(session_id)}"
+
+    def marca(self, session_id):
+        try:
+            return self._cache._redis.get(self._contador(session_id)) or b'0'
+        except Exception as e:
+            self._cache._error('marca', e)
+            return None
+
+    def set(self, session_id, mensajes, marca=None):
+        if marca is None:
+            self._cache.set(session_id, list(mensajes)[-self.maxlen:])
+            return
+        contador = self._contador(session_id)
+        try:
+            with self._cache._redis.pipeline() as pipe:
+                # WATCH: si un append sube el contador antes del EXEC, la escritura se aborta
+                pipe.watch(contador)
+                if (pipe.get(contador) or b'0') != marca:
+                    return
+                pipe.multi()
+                pipe.set(self._cache._k(session_id), pickle.dumps(list(mensajes)[-self.maxlen:]), ex=int(self.ttl))
+                self._cache._indexar(pipe, self._cache._k(session_id), self.ttl)
+                pipe.execute()
+            self._cache._recortar()
+        except redis.WatchError:
+            pass
+        except Exception as e:
+            self._cache._error('set', e)
+
+    def append(self, session_id, mensaje):
+        clave = self._cache._k(session_id)
+        try:
+            with self._cache._redis.pipeline() as pipe:
+                pipe.incr(self._contador(session_id))
+                pipe.expire(self._contador(session_id), int(self.ttl))
+                pipe.execute()
+            crudo = self._cache._redis.get(clave)
+            if crudo is not None:
+                mensajes = (pickle.loads(crudo) + [mensaje])[-self.maxlen:]
+                self._cache._redis.set(clave, pickle.dumps(mensajes), ex=int(self.ttl), xx=True)
+        except Exception as e:
+            self._cache._error('append', e)
+
+    def invalidate(self, session_id=None):
+        self._cache.invalidate(session_id)
+
+    def stats(self):
+        return self._cache.stats()
+
+
+def _backend_compartido():
+    """URL de Redis si CACHE_BACKEND=redis y el cliente está instalado; si no, None"""
+    if os.getenv('CACHE_BACKEND', 'memoria').lower() != 'redis':
+        return None
+    if redis is None:
+        logger.warning("⚠️ CACHE_BACKEND=redis pero el paquete 'redis' no está instalado; usando caché en memoria")
+        return None
+    return os.getenv('CACHE_URL', 'redis://localhost:6379/0')
+
+
+def crear_cache(nombre, default_ttl=60, maxsize=1024):
+    """Caché según CACHE_BACKEND (``memoria`` por defecto o ``redis`` con CACHE_URL)"""
+    url = _backend_compartido()
+    if url:
+        return RedisCache(url, f"chatbot:{nombre}", default_ttl=default_ttl, maxsize=maxsize)
+    return TTLCache(default_ttl=default_ttl, maxsize=maxsize)
+
+
+def crear_historial(maxsesiones=1000, maxlen=50, ttl=900):
+    """Caché de historial según CACHE_BACKEND"""
+    url = _backend_compartido()
+    if url:
+        return RedisHistoryCache(url, 'chatbot:historial', maxsesiones=maxsesiones, maxlen=maxlen, ttl=ttl)
+    return HistoryCache(maxsesiones=maxsesiones, maxlen=maxlen, ttl=ttl)
@@ -0,0 +1,124 @@
+import re
+from collections import namedtuple
+
+from config.intents import normalizar
+from config.busqueda import es_matricula
+
+
+# Entidades de un mensaje del chat (después de detectar la intención):
+# carrera, semestre, matrícula y estado de pago. Con ellas los manejadores
+# filtran en SQL y limitan las filas en lugar de traer la tabla completa.
+
+Entidades = namedtuple('Entidades', ['carrera', 'semestre', 'matricula', 'pagado'])
+Entidades.__doc__ = """Entidades encontradas en un mensaje (``None`` si no aparecen)
+
+- ``carrera``: nombre exacto de la carrera (como en la tabla carreras)
+- ``semestre``: número de semestre (1-12)
+- ``matricula``: matrícula en mayúsculas
+- ``pagado``: ``False`` si pregunta por pendientes, ``True`` por pagados
+"""
+
+SEMESTRE_MAX = 12
+
+_ORDINALES = {
+    'primer': 1, 'primero': 1, 'segundo': 2, 'tercer': 3, 'tercero': 3, 'cuarto': 4,
+    'quinto': 5, 'sexto': 6, 'septimo': 7, 'octavo': 8, 'noveno': 9, 'decimo': 10,
+}
+_NUMERO = r'(\d{1,2}|' + '|'.join(sorted(_ORDINALES, key=len, reverse=True)) + r')'
+
+# "semestre 3", "3er semestre", "tercer semestre", "5to semestre"
+_PATRON_SEMESTRE = re.compile(
+    r'\bsemestre\s+' + _NUMERO + r'\b'
+    r'|\b' + _NUMERO + r'\s*(?:er|ro|do|to|vo|no|mo|o|°|º)?\s+semestre\b'
+)
+
+# "pendientes", "deben", "no han pagado", "sin pagar" / "pagados", "al corriente"
+_PATRON_PENDIENTE = re.compile(
+    r'\b(?:pendientes?|deben?|adeud[oa]s?|no\s+(?:han\s+|ha\s+)?(?:pagad[oa]s?|pagaron|pago)|sin\s+pagar)\b'
+)
+_PATRON_PAGADO = re.compile(r'\b(?:pagad[oa]s?|pagaron|al\s+corriente)\b')
+
+_PATRON_PALABRA = re.compile(r'[a-z0-9-]+')
+
+# Palabras que no identifican una carrera aunque aparezcan en su nombre o
+# coincidan con un código ("con" es CON, Contaduría)
+_COMUNES = {'a', 'al', 'con', 'de', 'del', 'e', 'el', 'en', 'la', 'las', 'los', 'para', 'por', 'sin', 'y'}
+
+
+def _semestre(texto):
+    coincidencia = _PATRON_SEMESTRE.search(texto)
+    if not coincidencia:
+        return None
+    valor = coincidencia.group(1) or coincidencia.group(2)
+    numero = int(valor) if valor.isdigit() else _ORDINALES[valor]
+    return numero if 1 <= numero <= SEMESTRE_MAX else None
+
+
+def _pagado(texto):
+    # Primero lo pendiente: "no han pagado" también contiene "pagado"
+    if _PATRON_PENDIENTE.search(texto):
+        return False
+    if _PATRON_PAGADO.search(texto):
+        return True
+    return None
+
+
+def _matricula(palabras):
+    for palabra in palabras:
+        # Al menos 5 caracteres: "2024" o "semestre 10" no son matrículas
+        if len(palabra) >= 5 and es_matricula(palabra):
+            return palabra.upper()
+    return None
+
+
+def _carrera(palabras, carreras):
+    """Carrera con más palabras distintivas en el mensaje (o su código); ``None`` si empatan"""
+    tokens = {}
+    frecuencia = {}
+    for carrera in carreras:
+        propios = set(_PATRON_PALABRA.findall(normalizar(carrera['nombre']))) - _COMUNES
+        tokens[carrera['nombre']] = propios
+        for token in propios:
+            frecuencia[token] = frecuencia.get(token, 0) + 1
+
+    puntajes = {}
+    for carrera in carreras:
+        nombre = carrera['nombre']
+        # Una palabra compartida por varias carreras ("ingenieria") no decide por sí sola
+        distintivas = {t for t in tokens[nombre] if frecuencia[t] == 1}
+        decisivas = len(distintivas & palabras)
+        codigo = normalizar(carrera.get('codigo') or '')
+        if codigo and codigo not in _COMUNES and codigo in palabras:
+            decisivas += 1
+        if decisivas:
+            puntajes[nombre] = decisivas * 2 + len((tokens[nombre] - distintivas) & palabras)
+
+    if not puntajes:
+        return None
+    mejores = sorted(puntajes.items(), key=lambda item: -item[1])
+    if len(mejores) > 1 and mejores[0][1] == mejores[1][1]:
+        return None
+    return mejores[0][0]
+
+
+def extraer_entidades(texto, carreras):
+    """Entidades de ``texto`` (ya normalizado) contra la lista de ``carreras`` cacheada"""
+    palabras = _PATRON_PALABRA.findall(texto)
+    return Entidades(
+        carrera=_carrera(set(palabras), carreras or []),
+        semestre=_semestre(texto),
+        matricula=_matricula(palabras),
+        pagado=_pagado(texto)
+    )
+
+
+def describir(entidades):
+    """Texto de los filtros para las respuestas: " de Medicina, semestre 3, con inscripción pagada" """
+    partes = []
+    if entidades.carrera:
+        partes.append(f"de {entidades.carrera}")
+    if entidades.semestre:
+        partes.append(f"semestre {entidades.semestre}")
+    if entidades.pagado is not None:
+        partes.append("con inscripción pagada" if entidades.pagado else "con pago pendiente")
+    return (' ' + ', '.join(partes)) if partes else ''
@@ -0,0 +1,233 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+from itertools import chain, islice
+
+# openpyxl y reportlab se importan al generar el primer archivo (escribir_excel /
+# escribir_pdf): son más de la mitad del tiempo de arranque y de la memoria de
+# un worker que nunca descarga reportes. precargar() los importa por adelantado.
+
+
+def _fecha(valor, formato='%Y-%m-%d'):
+    return valor.strftime(formato) if valor else 'N/A'
+
+
+# Columnas de cada reporte: (encabezado, función que extrae el valor de la fila)
+COLUMNAS_ESTUDIANTES = [
+    ('Matrícula', lambda est: est['matricula']),
+    ('Nombre', lambda est: f"{est['nombre']} {est['apellido']}"),
+    ('Carrera', lambda est: est['carrera']),
+    ('Semestre', lambda est: est['semestre']),
+    ('Fecha Inscripción', lambda est: _fecha(est['fecha_inscripcion'])),
+    ('Estado Pago', lambda est: '✅ PAGADO' if est['inscripcion_pagada'] else '❌ PENDIENTE'),
+    ('Email', lambda est: est.get('email', 'No especificado')),
+    ('Teléfono', lambda est: est.get('telefono', 'No especificado'))
+]
+
+COLUMNAS_PENDIENTES = [
+    columna for columna in COLUMNAS_ESTUDIANTES if columna[0] != 'Estado Pago'
+]
+
+# Columnas del PDF: (encabezado, ancho en puntos, máximo de caracteres, extractor)
+COLUMNAS_PDF = [
+    ('Matrícula', 70, 14, lambda est: est['matricula']),
+    ('Nombre', 140, 32, lambda est: f"{est['nombre']} {est['apellido']}"),
+    ('Carrera', 150, 34, lambda est: est['carrera']),
+    ('Semestre', 50, 8, lambda est: str(est['semestre'])),
+    ('Estado', 58, 10, lambda est: 'PAGADO' if est['inscripcion_pagada'] else 'PENDIENTE')
+]
+
+
+@lru_cache(maxsize=None)
+def _estilo_tabla_pdf():
+    from reportlab.lib import colors
+    from reportlab.platypus import TableStyle
+
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 10),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 1), (-1, -1), 8),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ])
+
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+TAMANO_CHUNK = 64 * 1024
+
+
+def precargar():
+    """Importar openpyxl y reportlab ya (p. ej. en el maestro de gunicorn antes del fork)"""
+    import openpyxl  # noqa: F401
+    import reportlab.platypus  # noqa: F401
+    _estilo_tabla_pdf()
+
+
+def escribir_excel(filas, columnas, hoja, destino, muestra=1000):
+    """Escribir ``filas`` en un XLSX con memoria constante; devuelve cuántas filas se escribieron
+
+    El libro es de solo escritura (openpyxl vuelca cada fila a disco), así que
+    la memoria no crece con el número de filas. En ese modo los anchos deben
+    fijarse antes de la primera fila: se calculan con el encabezado y las
+    primeras ``muestra`` filas, que se leen por adelantado.
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+    from openpyxl.utils import get_column_letter
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(hoja)
+
+    valores = ([extraer(fila) for _, extraer in columnas] for fila in filas)
+    primeras = list(islice(valores, muestra))
+
+    # Ancho de columnas según el contenido más largo de la muestra
+    for i, (encabezado, _) in enumerate(columnas):
+        max_length = max([len(encabezado)] + [len(str(fila[i])) for fila in primeras])
+        ws.column_dimensions[get_column_letter(i + 1)].width = max_length + 2
+
+    encabezados = []
+    for encabezado, _ in columnas:
+        celda = WriteOnlyCell(ws, value=encabezado)
+        celda.font = Font(bold=True)
+        encabezados.append(celda)
+    ws.append(encabezados)
+
+    total = 0
+    for fila in chain(primeras, valores):
+        ws.append(fila)
+        total += 1
+
+    wb.save(destino)
+    return total
+
+
+class _FlowablesPorDemanda(list):
+    """Lista de flowables que se rellena desde un generador conforme reportlab la consume
+
+    ``SimpleDocTemplate.build`` va sacando elementos del inicio de la lista;
+    así sólo hay unas pocas tablas en memoria a la vez en lugar del
+    documento completo.
+    """
+
+    def __init__(self, generador, reserva=3):
+        super().__init__()
+        self._generador = generador
+        self._reserva = reserva
+
+    def _rellenar(self):
+        while self._generador is not None and list.__len__(self) < self._reserva:
+            try:
+                self.append(next(self._generador))
+            except StopIteration:
+                self._generador = None
+
+    def __len__(self):
+        self._rellenar()
+        return list.__len__(self)
+
+    def __getitem__(self, indice):
+        self._rellenar()
+        return list.__getitem__(self, indice)
+
+
+def _recortar(valor, maximo):
+    valor = '' if valor is None else str(valor)
+    return valor if len(valor) <= maximo else valor[:maximo - 1] + '…'
+
+
+def escribir_pdf(filas, estadisticas, destino, filas_por_tabla=40):
+    """Escribir el reporte de estudiantes en PDF con memoria acotada
+
+    Los estudiantes se parten en tablas de ``filas_por_tabla`` filas (más o
+    menos una página) con anchos fijos y encabezado repetido, generadas a
+    medida que reportlab las maqueta. Devuelve cuántos estudiantes se escribieron.
+    """
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import SimpleDocTemplate, Table, Paragraph
+
+    styles = getSampleStyleSheet()
+    encabezado = [nombre for nombre, _, _, _ in COLUMNAS_PDF]
+    anchos = [ancho for _, ancho, _, _ in COLUMNAS_PDF]
+    total = 0
+
+    def elementos():
+        nonlocal total
+
+        # Título
+        yield Paragraph("REPORTE DE ESTUDIANTES - UNIVERSIDAD", styles['Title'])
+
+        # Estadísticas
+        stats_text = f"""
+        <b>Estadísticas:</b><br/>
+        • Total de estudiantes: {estadisticas.get('total_estudiantes', 0)}<br/>
+        • Inscripción pagada: {estadisticas.get('inscritos_pagados', 0)}<br/>
+        • Pendientes de pago: {estadisticas.get('pendientes_inscripcion', 0)}<br/>
+        • Fecha de generación: {datetime.now().strftime('%d/%m/%Y %H:%M')}
+        """
+        yield Paragraph(stats_text, styles['Normal'])
+        yield Paragraph("<br/>", styles['Normal'])
+
+        # Tablas por bloques con encabezado repetido
+        iterador = iter(filas)
+        while True:
+            bloque = [
+                [_recortar(extraer(est), maximo) for _, _, maximo, extraer in COLUMNAS_PDF]
+                for est in islice(iterador, filas_por_tabla)
+            ]
+            if not bloque:
+                break
+            total += len(bloque)
+            yield Table([encabezado] + bloque, colWidths=anchos, repeatRows=1, style=_estilo_tabla_pdf())
+
+    doc = SimpleDocTemplate(destino, pagesize=letter)
+    doc.build(_FlowablesPorDemanda(elementos()))
+    return total
+
+
+def iterar_archivo(archivo, tamano=TAMANO_CHUNK):
+    """Enviar un archivo temporal por bloques y cerrarlo al terminar"""
+    try:
+        archivo.seek(0)
+        while True:
+            bloque = archivo.read(tamano)
+            if not bloque:
+                break
+            yield bloque
+    finally:
+        archivo.close()
+
+
+def _json_default(valor):
+    """Tipos de las filas de psycopg2 que json no serializa por sí mismo"""
+    if isinstance(valor, (date, datetime)):
+        return valor.isoformat()
+    if isinstance(valor, Decimal):
+        return float(valor)
+    raise TypeError(f"Tipo no serializable: {type(valor).__name__}")
+
+
+def iterar_ndjson(filas, lote=500):
+    """Serializar ``filas`` como NDJSON (un objeto JSON por línea) en bloques de ``lote`` filas
+
+    Cada bloque se entrega ya codificado para que el servidor lo envíe en
+    cuanto está listo; nunca hay más de ``lote`` filas en memoria.
+    """
+    bloque = []
+    for fila in filas:
+        bloque.append(json.dumps(fila, ensure_ascii=False, default=_json_default))
+        if len(bloque) >= lote:
+            yield ('\n'.join(bloque) + '\n').encode('utf-8')
+            bloque = []
+    if bloque:
+        yield ('\n'.join(bloque) + '\n').encode('utf-8')
@@ -0,0 +1,226 @@
+import re
+import time
+import logging
+import threading
+import unicodedata
+from collections import namedtuple
+
+
+logger = logging.getLogger(__name__)
+
+
+# Reglas en orden de prioridad: si un mensaje coincide con varias, gana la primera
+REGLAS_INTENCIONES = [
+    # === CONSULTAS UNIVERSITARIAS ===
+    # Antes que 'estudiantes': "busca al alumno Juan" es una búsqueda
+    ('busqueda', ['busca', 'encuentra', 'encontrar']),
+    ('estudiantes', ['estudiante', 'alumno', 'alumnos', 'matrícula']),
+    ('estadisticas', ['total', 'cuántos', 'estadística', 'estadísticas']),
+    ('inscripciones', ['inscripción', 'pago', 'debe', 'pendiente']),
+    ('reportes', ['reporte', 'archivo', 'descargar', 'generar', 'excel']),
+    ('carreras', ['carrera', 'ingeniería', 'sistemas', 'industrial', 'contaduría']),
+
+    # === CONSULTAS GENERALES (common_intents) ===
+    ('greeting', ['hola']),
+    ('services', ['servicio']),
+    ('contact', ['contacto']),
+    ('hours', ['horario']),
+    ('location', ['ubicación']),
+    ('pricing', ['precio']),
+    ('thanks', ['gracias']),
+    ('goodbye', ['adiós']),
+]
+
+
+# Intenciones que además exigen un patrón en el mensaje normalizado. "encuentra"
+# sólo es búsqueda con "a/al <nombre>", una matrícula o una mención de
+# estudiante/alumno: "¿dónde se encuentra la universidad?" queda para
+# common_intents (ubicación).
+CONFIRMACIONES = {
+    'busqueda': re.compile(
+        r'\bbusca(?:r|me)?\b'
+        r'|\b(?:encuentra|encontrar)\s+(?:al?\s+\w|[a-z]{0,4}-?\d{3})'
+        r'|\b(?:estudiante|alumn[oa])s?\b'
+    ),
+}
+
+
+# Respuestas cacheables por intención del clasificador: (TTL en segundos, tablas de las que dependen)
+# Las intenciones sin manejador universitario se responden desde common_intents.
+# 'reportes' no se cachea: cada respuesta refleja el estado de un trabajo en curso.
+# Las que extraen entidades (config/entidades.py) dependen también de los nombres de carrera.
+CACHE_RESPUESTAS = {
+    'busqueda': (30, ('estudiantes', 'carreras')),
+    'estudiantes': (30, ('estudiantes', 'carreras')),
+    'estadisticas': (30, ('estudiantes',)),
+    'inscripciones': (30, ('estudiantes', 'carreras')),
+    'carreras': (300, ('carreras',)),
+}
+CACHE_RESPUESTAS_GENERAL = (300, ('common_intents',))
+
+
+Clasificacion = namedtuple('Clasificacion', ['intent', 'texto', 'mensaje', 'palabras', 'intenciones'])
+Clasificacion.__doc__ = """Resultado de clasificar un mensaje
+
+- ``intent``: intención de mayor prioridad encontrada (o ``None``)
+- ``texto``: mensaje normalizado (minúsculas, sin acentos)
+- ``mensaje``: mensaje original en minúsculas
+- ``palabras``: palabras clave encontradas (normalizadas)
+- ``intenciones``: todas las intenciones con alguna coincidencia
+"""
+
+
+def normalizar(texto):
+    """Minúsculas, sin acentos y con espacios colapsados"""
+    texto = unicodedata.normalize('NFKD', texto.lower())
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return ' '.join(texto.split())
+
+
+class IntentClassifier:
+    """Clasificador de intenciones con una sola expresión regular precompilada
+
+    Todas las palabras clave se combinan en una alternancia dentro de un
+    lookahead, así una única pasada sobre el mensaje encuentra todas las
+    coincidencias (incluso superpuestas) sin importar cuántas reglas haya.
+    """
+
+    def __init__(self, reglas=REGLAS_INTENCIONES, confirmaciones=CONFIRMACIONES):
+        self._intent_de = {}
+        self._prioridad = {}
+        self._confirmaciones = confirmaciones
+
+        for prioridad, (intent, palabras) in enumerate(reglas):
+            self._prioridad.setdefault(intent, prioridad)
+            for palabra in palabras:
+                # Si una palabra aparece en dos reglas, conserva la de mayor prioridad
+                self._intent_de.setdefault(normalizar(palabra), intent)
+
+        # Las palabras más largas primero para preferir 'estadisticas' sobre 'estadistica'
+        alternativas = sorted(self._intent_de, key=lambda p: (-len(p), p))
+        self._patron = re.compile('(?=(' + '|'.join(map(re.escape, alternativas)) + '))')
+
+        self._lock = threading.Lock()
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self._total = 0
+        self._tiempo_total = 0.0
+        self._tiempo_max = 0.0
+        self._por_intencion = {}
+
+    def classify(self, message):
+        """Clasificar un mensaje (normaliza una sola vez y recorre el texto una sola vez)"""
+        inicio = time.perf_counter()
+
+        mensaje = message.lower().strip()
+        texto = normalizar(mensaje)
+        palabras = frozenset(m.group(1) for m in self._patron.finditer(texto))
+        intenciones = frozenset(
+            i for i in map(self._intent_de.__getitem__, palabras)
+            if i not in self._confirmaciones or self._confirmaciones[i].search(texto)
+        )
+        intent = min(intenciones, key=self._prioridad.__getitem__) if intenciones else None
+
+        transcurrido = time.perf_counter() - inicio
+        with self._lock:
+            self._total += 1
+            self._tiempo_total += transcurrido
+            self._tiempo_max = max(self._tiempo_max, transcurrido)
+            self._por_intencion[intent] = self._por_intencion.get(intent, 0) + 1
+
+        return Clasificacion(intent, texto, mensaje, palabras, intenciones)
+
+    def stats(self):
+        """Estadísticas de tiempo y distribución de intenciones"""
+        with self._lock:
+            return {
+                'clasificaciones': self._total,
+                'promedio_us': round(self._tiempo_total / self._total * 1e6, 2) if self._total else 0.0,
+                'max_us': round(self._tiempo_max * 1e6, 2),
+                'por_intencion': {str(k): v for k, v in self._por_intencion.items()}
+            }
+
+
+class IntentIndex:
+    """Índice en memoria de ``common_intents`` (frases de ejemplo y respuestas)
+
+    ``loader()`` devuelve filas con ``intent_name``, ``response_template`` y
+    ``example_questions``. El índice se construye en el primer uso, se
+    recarga cada ``refresh`` segundos y puede invalidarse explícitamente.
+    Las frases se indexan por su primer token; un mensaje se resuelve
+    recorriendo sus tokens sin ningún viaje a la base de datos.
+    """
+
+    def __init__(self, loader, refresh=300, retry=30):
+        self._loader = loader
+        self.refresh = refresh
+        self.retry = retry
+        self._lock = threading.Lock()
+        # (primer token -> [(tokens, intent_name)], intent_name -> respuesta)
+        self._datos = ({}, {})
+        self._expira = 0.0
+
+    @staticmethod
+    def _tokens(texto):
+        return tuple(re.findall(r'\w+', normalizar(texto)))
+
+    def _construir(self, filas):
+        frases = {}
+        respuestas = {}
+        for fila in filas:
+            intent = fila['intent_name']
+            respuestas[intent] = fila['response_template']
+            for pregunta in fila['example_questions'] or []:
+                tokens = self._tokens(pregunta)
+                if tokens:
+                    frases.setdefault(tokens[0], []).append((tokens, intent))
+
+        # Las frases más largas primero: la coincidencia más específica gana
+        for candidatas in frases.values():
+            candidatas.sort(key=lambda c: (-len(c[0]), -sum(map(len, c[0])), c[1]))
+        return frases, respuestas
+
+    def _vigente(self):
+        """Datos actuales, recargándolos si expiraron"""
+        if time.monotonic() < self._expira:
+            return self._datos
+
+        with self._lock:
+            if time.monotonic() < self._expira:
+                return self._datos
+            try:
+                self._datos = self._construir(self._loader())
+                self._expira = time.monotonic() + self.refresh
+                logger.info("📚 Índice de intenciones cargado: %s intenciones", len(self._datos[1]))
+            except Exception as e:
+                # Conservar el índice anterior y reintentar más tarde
+                logger.error("❌ Error cargando common_intents: %s", e)
+                self._expira = time.monotonic() + self.retry
+            return self._datos
+
+    def buscar(self, texto):
+        """(intent_name, respuesta) de la frase de ejemplo más larga contenida en ``texto``"""
+        frases, respuestas = self._vigente()
+        tokens = self._tokens(texto)
+
+        mejor = None
+        for i, token in enumerate(tokens):
+            for frase, intent in frases.get(token, ()):
+                # Candidatas ordenadas de más larga a más corta: la primera que encaja es la mejor aquí
+                if tokens[i:i + len(frase)] == frase:
+                    if mejor is None or len(frase) > len(mejor[0]):
+                        mejor = (frase, intent)
+                    break
+
+        if mejor is None:
+            return None
+        return mejor[1], respuestas[mejor[1]]
+
+    def respuesta(self, intent_name):
+        """Plantilla de respuesta de una intención (o ``None``)"""
+        return self._vigente()[1].get(intent_name)
+
+    def invalidar(self):
+        """Forzar la recarga en el próximo uso"""
+        self._expira = 0.0
@@ -0,0 +1,184 @@
+import os
+import sys
+import json
+import time
+import queue
+import random
+import atexit
+import logging
+import threading
+import contextvars
+from logging.handlers import QueueHandler, QueueListener
+
+
+# Logging del chatbot: el hilo que atiende la petición sólo encola el registro;
+# un QueueListener por proceso lo formatea y lo escribe en stdout. Así la
+# latencia no depende de la escritura en los logs de PM2/Docker.
+#
+#   LOG_LEVEL          nivel mínimo (INFO por defecto)
+#   LOG_FORMAT         json (por defecto) o texto
+#   LOG_DEBUG_SAMPLE   fracción de peticiones con traza DEBUG completa (0.01 por defecto)
+#   LOG_QUEUE_SIZE     registros en cola antes de descartar (10000 por defecto)
+
+_request_id = contextvars.ContextVar('request_id', default='-')
+_muestreada = contextvars.ContextVar('muestreada', default=None)
+
+# Atributos propios de LogRecord: todo lo demás vino en ``extra=`` y va al JSON
+_ATRIBUTOS_RECORD = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'request_id'}
+
+_manejador = None
+_tasa_muestreo = 0.0
+
+
+def iniciar_peticion(request_id=None):
+    """Asociar un id a la petición actual y decidir si su traza DEBUG se registra"""
+    request_id = request_id or os.urandom(8).hex()
+    _request_id.set(request_id)
+    _muestreada.set(random.random() < _tasa_muestreo)
+    return request_id
+
+
+class FiltroContexto(logging.Filter):
+    """Añade el request id y muestrea los DEBUG (por petición: traza completa o nada)"""
+
+    def __init__(self, nivel):
+        super().__init__()
+        self.nivel = nivel
+
+    def filter(self, record):
+        record.request_id = _request_id.get()
+        if record.levelno >= self.nivel:
+            return True
+        muestreada = _muestreada.get()
+        if muestreada is None:
+            # Fuera de una petición: muestreo registro a registro
+            muestreada = random.random() < _tasa_muestreo
+        return muestreada
+
+
+class FormatoJSON(logging.Formatter):
+    """Una línea JSON por registro: ts, nivel, logger, request_id, mensaje y los ``extra``"""
+
+    def format(self, record):
+        datos = {
+            'ts': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(record.created)) + f'.{int(record.msecs):03d}Z',
+            'nivel': record.levelname,
+            'logger': record.name,
+            'pid': record.process,
+            'request_id': getattr(record, 'request_id', '-'),
+            'mensaje': record.getMessage()
+        }
+        for clave, valor in vars(record).items():
+            if clave not in _ATRIBUTOS_RECORD:
+                datos[clave] = valor
+        if record.exc_text:
+            datos['excepcion'] = record.exc_text
+        return json.dumps(datos, ensure_ascii=False, default=str)
+
+
+class FormatoTexto(logging.Formatter):
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)-7s [%(request_id)s] %(name)s: %(message)s')
+
+    def format(self, record):
+        texto = super().format(record)
+        extras = {clave: valor for clave, valor in vars(record).items() if clave not in _ATRIBUTOS_RECORD}
+        if extras:
+            texto += ' ' + ' '.join(f'{clave}={valor}' for clave, valor in extras.items())
+        return texto
+
+
+class _Listener(QueueListener):
+    def enqueue_sentinel(self):
+        # Al cerrar sí se espera: la cola puede estar llena y el listener debe terminarla
+        self.queue.put(self._sentinel)
+
+
+class ManejadorEnCola(QueueHandler):
+    """QueueHandler que no bloquea nunca y arranca su QueueListener en cada proceso
+
+    Con gunicorn y ``preload_app`` el logging se configura en el maestro;
+    el hilo del listener no sobrevive al fork, así que cada worker crea su
+    cola y su listener al registrar el primer mensaje. Si la cola está
+    llena el registro se descarta (y se cuenta) en lugar de esperar.
+    """
+
+    def __init__(self, destino, maxsize=10000):
+        super().__init__(queue.Queue(maxsize))
+        self.destino = destino
+        self.maxsize = maxsize
+        self.descartados = 0
+        self._listener = None
+        self._pid = None
+        self._lock_listener = threading.Lock()
+
+    def _asegurar_listener(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock_listener:
+            if self._pid == os.getpid():
+                return
+            # La cola heredada del padre puede traer registros suyos o un lock tomado
+            self.queue = queue.Queue(self.maxsize)
+            self._listener = _Listener(self.queue, self.destino, respect_handler_level=True)
+            self._listener.start()
+            self._pid = os.getpid()
+
+    def prepare(self, record):
+        # Resolver mensaje y traceback en el hilo que registra (los args pueden cambiar después)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        self._asegurar_listener()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.descartados += 1
+
+    def detener(self):
+        """Escribir lo que queda en la cola y parar el listener de este proceso"""
+        if self._listener is not None and self._pid == os.getpid():
+            self._listener.stop()
+            self._listener = None
+            self._pid = None
+
+
+def configurar_logging(nivel=None, formato=None, muestreo=None, stream=None):
+    """Configurar el logger raíz (idempotente: la segunda llamada sólo cambia la configuración)"""
+    global _manejador, _tasa_muestreo
+
+    nivel = logging.getLevelName((nivel or os.getenv('LOG_LEVEL', 'INFO')).upper())
+    formato = (formato or os.getenv('LOG_FORMAT', 'json')).lower()
+    _tasa_muestreo = float(os.getenv('LOG_DEBUG_SAMPLE', 0.01) if muestreo is None else muestreo)
+
+    stream = stream or sys.stdout
+    if (getattr(stream, 'encoding', None) or '').lower().replace('-', '') != 'utf8' and hasattr(stream, 'reconfigure'):
+        # Consolas que no son UTF-8 (Windows): un emoji no debe romper la escritura del log
+        stream.reconfigure(errors='backslashreplace')
+    destino = logging.StreamHandler(stream)
+    destino.setFormatter(FormatoTexto() if formato == 'texto' else FormatoJSON())
+
+    raiz = logging.getLogger()
+    if _manejador is not None:
+        _manejador.detener()
+        raiz.removeHandler(_manejador)
+
+    _manejador = ManejadorEnCola(destino, maxsize=int(os.getenv('LOG_QUEUE_SIZE', 10000)))
+    _manejador.addFilter(FiltroContexto(nivel))
+    raiz.addHandler(_manejador)
+    # Con muestreo los DEBUG se crean y el filtro decide; sin él ni se construyen
+    raiz.setLevel(logging.DEBUG if _tasa_muestreo > 0 and nivel > logging.DEBUG else nivel)
+    return _manejador
+
+
+def detener_logging():
+    if _manejador is not None:
+        _manejador.detener()
+
+
+atexit.register(detener_logging)
@@ -0,0 +1,179 @@
+import os
+import time
+import inspect
+import threading
+from functools import wraps
+
+from prometheus_client import (CollectorRegistry, Counter, Gauge, Histogram, REGISTRY,
+                               CONTENT_TYPE_LATEST, generate_latest)
+from prometheus_client import multiprocess
+
+
+# Métricas en formato Prometheus (/metrics). Con varios workers de gunicorn
+# hay que definir PROMETHEUS_MULTIPROC_DIR (gunicorn.conf.py lo hace): cada
+# proceso escribe sus valores en ese directorio y /metrics los suma todos,
+# así da igual qué worker atienda el scrape.
+
+BUCKETS_HTTP = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+BUCKETS_BD = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 10)
+
+PETICIONES = Counter(
+    'chatbot_http_requests_total', 'Peticiones HTTP atendidas',
+    ['metodo', 'ruta', 'estado']
+)
+LATENCIA_HTTP = Histogram(
+    'chatbot_http_request_duration_seconds', 'Latencia de las peticiones HTTP (hasta el primer byte)',
+    ['metodo', 'ruta'], buckets=BUCKETS_HTTP
+)
+CONSULTAS = Counter(
+    'chatbot_db_queries_total', 'Llamadas a métodos de NeonDatabase que consultan la BD',
+    ['metodo', 'resultado']
+)
+LATENCIA_BD = Histogram(
+    'chatbot_db_query_duration_seconds', 'Duración de los métodos de NeonDatabase que consultan la BD',
+    ['metodo'], buckets=BUCKETS_BD
+)
+LATENCIA_SQL = Histogram(
+    'chatbot_sql_duration_seconds', 'Duración de cada consulta del registro (config/queries.py)',
+    ['consulta', 'modo'], buckets=BUCKETS_BD
+)
+PREPARACIONES = Counter(
+    'chatbot_sql_prepares_total', 'PREPARE enviados (uno por consulta y conexión del pool)',
+    ['consulta']
+)
+ESPERA_POOL = Histogram(
+    'chatbot_db_pool_wait_seconds', 'Espera para obtener una conexión del pool',
+    buckets=BUCKETS_BD
+)
+POOL = Gauge(
+    'chatbot_db_pool_connections', 'Conexiones del pool por estado (suma de los workers vivos)',
+    ['estado'], multiprocess_mode='livesum'
+)
+CACHE_HITS = Gauge(
+    'chatbot_cache_hits', 'Aciertos acumulados de cada caché (suma de los workers vivos)',
+    ['cache'], multiprocess_mode='livesum'
+)
+CACHE_MISSES = Gauge(
+    'chatbot_cache_misses', 'Fallos acumulados de cada caché (suma de los workers vivos)',
+    ['cache'], multiprocess_mode='livesum'
+)
+INTENCIONES = Counter(
+    'chatbot_intents_total', 'Respuestas del chat por intención',
+    ['intencion']
+)
+
+# Los gauges de pool y cachés se refrescan como mucho cada REFRESCO segundos por worker
+REFRESCO = float(os.getenv('METRICS_REFRESH', 5))
+_ultimo_refresco = 0.0
+_lock_refresco = threading.Lock()
+
+
+def multiproceso():
+    return bool(os.getenv('PROMETHEUS_MULTIPROC_DIR'))
+
+
+def exportar():
+    """(cuerpo, content-type) de /metrics, sumando todos los workers en modo multiproceso"""
+    if multiproceso():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def registrar_peticion(metodo, ruta, estado, duracion):
+    PETICIONES.labels(metodo, ruta, str(estado)).inc()
+    LATENCIA_HTTP.labels(metodo, ruta).observe(duracion)
+
+
+def registrar_intencion(intencion):
+    INTENCIONES.labels(intencion or 'desconocida').inc()
+
+
+def refrescar_estado(db, forzar=False):
+    """Copiar a los gauges el estado del pool y los contadores de las cachés de este worker"""
+    global _ultimo_refresco
+    ahora = time.monotonic()
+    if not forzar and ahora - _ultimo_refresco < REFRESCO:
+        return
+    with _lock_refresco:
+        if not forzar and ahora - _ultimo_refresco < REFRESCO:
+            return
+        _ultimo_refresco = ahora
+
+    pool = db.pool.stats()
+    POOL.labels('en_uso').set(pool['en_uso'])
+    POOL.labels('ociosas').set(pool['ociosas'])
+    POOL.labels('max').set(pool['max'])
+
+    for nombre, cache in (('respuestas', db.respuestas), ('consultas', db.cache), ('historial', db.historial)):
+        stats = cache.stats()
+        CACHE_HITS.labels(nombre).set(stats['hits'])
+        CACHE_MISSES.labels(nombre).set(stats['misses'])
+
+
+def medir_consulta(nombre=None):
+    """Decorador: cuenta y cronometra un método que consulta la BD
+
+    Funciona con métodos normales, generadores (se mide la iteración
+    completa), corrutinas y generadores asíncronos. ``resultado`` es
+    ``error`` si la excepción sale del método; los métodos que la capturan
+    y devuelven ``{}``/``[]`` cuentan como ``ok``.
+    """
+    def decorador(funcion):
+        metodo = nombre or funcion.__name__
+        latencia = LATENCIA_BD.labels(metodo)
+
+        def registrar(inicio, resultado):
+            latencia.observe(time.perf_counter() - inicio)
+            CONSULTAS.labels(metodo, resultado).inc()
+
+        if inspect.isasyncgenfunction(funcion):
+            @wraps(funcion)
+            async def envoltura(*args, **kwargs):
+                inicio, resultado = time.perf_counter(), 'error'
+                try:
+                    async for valor in funcion(*args, **kwargs):
+                        yield valor
+                    resultado = 'ok'
+                except GeneratorExit:
+                    # Cerrado antes de terminar (p. ej. el cliente cortó el stream)
+                    resultado = 'ok'
+                    raise
+                finally:
+                    registrar(inicio, resultado)
+        elif inspect.iscoroutinefunction(funcion):
+            @wraps(funcion)
+            async def envoltura(*args, **kwargs):
+                inicio, resultado = time.perf_counter(), 'error'
+                try:
+                    valor = await funcion(*args, **kwargs)
+                    resultado = 'ok'
+                    return valor
+                finally:
+                    registrar(inicio, resultado)
+        elif inspect.isgeneratorfunction(funcion):
+            @wraps(funcion)
+            def envoltura(*args, **kwargs):
+                inicio, resultado = time.perf_counter(), 'error'
+                try:
+                    yield from funcion(*args, **kwargs)
+                    resultado = 'ok'
+                except GeneratorExit:
+                    resultado = 'ok'
+                    raise
+                finally:
+                    registrar(inicio, resultado)
+        else:
+            @wraps(funcion)
+            def envoltura(*args, **kwargs):
+                inicio, resultado = time.perf_counter(), 'error'
+                try:
+                    valor = funcion(*args, **kwargs)
+                    resultado = 'ok'
+                    return valor
+                finally:
+                    registrar(inicio, resultado)
+        return envoltura
+    return decorador
@@ -0,0 +1,203 @@
+import sys
+import os
+import logging
+
+# Permitir ejecutar como script: python config/migrations.py
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+
+from config.notifications import CANAL_CAMBIOS, TABLAS_NOTIFICADAS
+
+
+# Similitud mínima de palabra para la búsqueda difusa de estudiantes (se aplica a las sesiones nuevas)
+UMBRAL_BUSQUEDA = float(os.getenv('BUSQUEDA_UMBRAL', 0.4))
+
+
+logger = logging.getLogger(__name__)
+
+
+# Migraciones idempotentes en orden: (nombre, sentencia SQL)
+MIGRACIONES = [
+    # Paginación por clave del listado de estudiantes (get_estudiantes_pagina): mismas
+    # expresiones sin NULL que CLAVE_ORDEN en config/queries.py; reemplaza al índice por columnas
+    ('idx_estudiantes_orden_clave', '''
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_estudiantes_orden_clave
+        ON estudiantes ((COALESCE(carrera, 'Sin carrera')), (COALESCE(nombre, '')),
+                        (COALESCE(apellido, '')), matricula)
+    '''),
+    ('drop_idx_estudiantes_orden', 'DROP INDEX CONCURRENTLY IF EXISTS idx_estudiantes_orden'),
+    # Historial por sesión (get_chat_history): búsqueda por sesión ya ordenada por fecha
+    ('idx_chat_messages_sesion', '''
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_chat_messages_sesion
+        ON chat_messages (session_id, created_at)
+    '''),
+    # Avisos de cambios para invalidar cachés (config/notifications.py): un NOTIFY por sentencia
+    ('fn_chatbot_notificar_cambio', f'''
+        CREATE OR REPLACE FUNCTION chatbot_notificar_cambio() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('{CANAL_CAMBIOS}', TG_TABLE_NAME);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    '''),
+    # Resumen por carrera mantenido por trigger: las estadísticas leen O(carreras) filas
+    ('tabla_resumen_carreras', '''
+        CREATE TABLE IF NOT EXISTS resumen_carreras (
+            carrera TEXT PRIMARY KEY,
+            total BIGINT NOT NULL DEFAULT 0,
+            pagados BIGINT NOT NULL DEFAULT 0,
+            pendientes BIGINT NOT NULL DEFAULT 0
+        )
+    '''),
+    ('fn_chatbot_actualizar_resumen', '''
+        CREATE OR REPLACE FUNCTION chatbot_actualizar_resumen() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                INSERT INTO resumen_carreras AS r (carrera, total, pagados, pendientes)
+                VALUES (COALESCE(OLD.carrera, 'Sin carrera'), -1,
+                        -(OLD.inscripcion_pagada IS TRUE)::int, -(OLD.inscripcion_pagada IS FALSE)::int)
+                ON CONFLICT (carrera) DO UPDATE SET
+                    total = r.total + EXCLUDED.total,
+                    pagados = r.pagados + EXCLUDED.pagados,
+                    pendientes = r.pendientes + EXCLUDED.pendientes;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO resumen_carreras AS r (carrera, total, pagados, pendientes)
+                VALUES (COALESCE(NEW.carrera, 'Sin carrera'), 1,
+                        (NEW.inscripcion_pagada IS TRUE)::int, (NEW.inscripcion_pagada IS FALSE)::int)
+                ON CONFLICT (carrera) DO UPDATE SET
+                    total = r.total + EXCLUDED.total,
+                    pagados = r.pagados + EXCLUDED.pagados,
+                    pendientes = r.pendientes + EXCLUDED.pendientes;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    '''),
+    ('fn_chatbot_vaciar_resumen', '''
+        CREATE OR REPLACE FUNCTION chatbot_vaciar_resumen() RETURNS trigger AS $$
+        BEGIN
+            DELETE FROM resumen_carreras;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    '''),
+    # Triggers y recálculo en una sola transacción con estudiantes bloqueada para escritura:
+    # ningún cambio queda fuera del conteo ni se cuenta dos veces. Re-ejecutarla resincroniza.
+    ('resumen_carreras_sincronizado', '''
+        LOCK TABLE estudiantes IN SHARE ROW EXCLUSIVE MODE;
+        CREATE OR REPLACE TRIGGER trg_estudiantes_resumen
+        AFTER INSERT OR DELETE OR UPDATE OF carrera, inscripcion_pagada ON estudiantes
+        FOR EACH ROW EXECUTE FUNCTION chatbot_actualizar_resumen();
+        CREATE OR REPLACE TRIGGER trg_estudiantes_resumen_truncate
+        AFTER TRUNCATE ON estudiantes
+        FOR EACH STATEMENT EXECUTE FUNCTION chatbot_vaciar_resumen();
+        DELETE FROM resumen_carreras;
+        INSERT INTO resumen_carreras (carrera, total, pagados, pendientes)
+        SELECT 
+            COALESCE(carrera, 'Sin carrera'),
+            COUNT(*),
+            COUNT(*) FILTER (WHERE inscripcion_pagada = TRUE),
+            COUNT(*) FILTER (WHERE inscripcion_pagada = FALSE)
+        FROM estudiantes 
+        GROUP BY 1
+    '''),
+    # Versión de los datos para los reportes cacheados (version_datos): contador transaccional
+    # que sube con cada sentencia sobre estudiantes (no se reinicia como pg_stat_user_tables)
+    ('tabla_datos_version', '''
+        CREATE TABLE IF NOT EXISTS datos_version (
+            tabla TEXT PRIMARY KEY,
+            version BIGINT NOT NULL DEFAULT 0
+        );
+        INSERT INTO datos_version (tabla) VALUES ('estudiantes') ON CONFLICT DO NOTHING
+    '''),
+    ('fn_chatbot_incrementar_version', '''
+        CREATE OR REPLACE FUNCTION chatbot_incrementar_version() RETURNS trigger AS $$
+        BEGIN
+            UPDATE datos_version SET version = version + 1 WHERE tabla = TG_TABLE_NAME;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+    '''),
+    ('trg_estudiantes_version', '''
+        CREATE OR REPLACE TRIGGER trg_estudiantes_version
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON estudiantes
+        FOR EACH STATEMENT EXECUTE FUNCTION chatbot_incrementar_version()
+    '''),
+    # Búsqueda de estudiantes por nombre (buscar_estudiantes / autocompletar_estudiantes)
+    ('ext_pg_trgm', 'CREATE EXTENSION IF NOT EXISTS pg_trgm'),
+    ('ext_unaccent', 'CREATE EXTENSION IF NOT EXISTS unaccent'),
+    # unaccent() no es IMMUTABLE (depende del diccionario en search_path): con el diccionario
+    # fijo sí se puede usar en un índice
+    ('fn_chatbot_normalizar', '''
+        CREATE OR REPLACE FUNCTION chatbot_normalizar(texto TEXT) RETURNS TEXT AS $$
+            SELECT lower(public.unaccent('public.unaccent'::regdictionary, texto))
+        $$ LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+    '''),
+    # GiST (no GIN): filtra con <% y devuelve ya ordenado por distancia, sin leer todas las coincidencias
+    ('idx_estudiantes_nombre_trgm', '''
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_estudiantes_nombre_trgm
+        ON estudiantes USING gist (chatbot_normalizar(nombre || ' ' || apellido) gist_trgm_ops)
+    '''),
+    ('idx_estudiantes_nombre_prefijo', '''
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_estudiantes_nombre_prefijo
+        ON estudiantes (chatbot_normalizar(nombre || ' ' || apellido) text_pattern_ops)
+    '''),
+    ('idx_estudiantes_apellido_prefijo', '''
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_estudiantes_apellido_prefijo
+        ON estudiantes (chatbot_normalizar(apellido) text_pattern_ops)
+    '''),
+    # Umbral de <% (0.6 por defecto) más tolerante con errores de tipeo ("jaun peres")
+    ('umbral_busqueda', f'''
+        DO $$ BEGIN
+            EXECUTE format('ALTER DATABASE %I SET pg_trgm.word_similarity_threshold = {UMBRAL_BUSQUEDA}',
+                           current_database());
+        END $$
+    '''),
+] + [
+    (f'trg_{tabla}_notificar', f'''
+        CREATE OR REPLACE TRIGGER trg_{tabla}_notificar
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {tabla}
+        FOR EACH STATEMENT EXECUTE FUNCTION chatbot_notificar_cambio()
+    ''')
+    for tabla in TABLAS_NOTIFICADAS
+]
+
+
+def aplicar_migraciones(db, migraciones=MIGRACIONES):
+    """Aplicar las migraciones con una conexión directa en autocommit
+
+    ``CREATE INDEX CONCURRENTLY`` no bloquea escrituras pero no puede correr
+    dentro de una transacción, por eso no se usa una conexión del pool.
+    Devuelve la lista de migraciones aplicadas sin error.
+    """
+    conn = db.get_connection()
+    if not conn:
+        logger.error("❌ No se pudo conectar para aplicar migraciones")
+        return []
+
+    aplicadas = []
+    try:
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            for nombre, sql in migraciones:
+                try:
+                    cur.execute(sql)
+                    aplicadas.append(nombre)
+                    logger.info("✅ Migración aplicada: %s", nombre)
+                except Exception as e:
+                    logger.error("❌ Error en migración %s: %s", nombre, e)
+    finally:
+        conn.close()
+
+    return aplicadas
+
+
+if __name__ == '__main__':
+    from config.database import NeonDatabase
+    from config.logs import configurar_logging
+
+    configurar_logging(formato='texto')
+
+    logger.info("🔧 APLICANDO MIGRACIONES...")
+    aplicar_migraciones(NeonDatabase())
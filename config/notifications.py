@@ -0,0 +1,138 @@
+import os
+import logging
+import time
+import select
+import threading
+
+import psycopg2
+from psycopg2 import extensions
+
+
+logger = logging.getLogger(__name__)
+
+
+# Canal y tablas que avisan de sus cambios (ver config/migrations.py)
+CANAL_CAMBIOS = 'chatbot_cambios'
+TABLAS_NOTIFICADAS = ('estudiantes', 'carreras', 'common_intents')
+
+# Canal de los mensajes de chat: el payload es "<origen>:<session_id>" (ver NeonDatabase._insertar_mensajes)
+CANAL_HISTORIAL = 'chatbot_historial'
+
+
+class ChangeListener:
+    """Hilo que escucha ``LISTEN chatbot_cambios`` y traduce cada NOTIFY en una invalidación
+
+    Los triggers envían el nombre de la tabla modificada como payload;
+    ``on_cambio(tabla)`` se llama una vez por tabla y por tanda de avisos.
+    LISTEN necesita una conexión de sesión propia: no puede ir por el pool
+    ni por el pooler de Neon (pgbouncer en modo transacción).
+
+    Con ``on_historial`` escucha además ``chatbot_historial`` y le pasa el
+    payload de cada aviso (``None`` tras una reconexión: invalidar todo).
+
+    Si la conexión se pierde se reconecta con espera creciente y, al
+    volver, se invalida todo: los avisos emitidos mientras tanto se perdieron.
+    """
+
+    def __init__(self, url, on_cambio, canal=CANAL_CAMBIOS, tablas=TABLAS_NOTIFICADAS,
+                 espera_max=60, on_historial=None):
+        self.url = url
+        self.on_cambio = on_cambio
+        self.on_historial = on_historial
+        self.canal = canal
+        self.tablas = tablas
+        self.espera_max = espera_max
+        self._lock = threading.Lock()
+        self._hilo = None
+        self._pid = None
+        self._detener = threading.Event()
+        self._stats = {'conectado': False, 'notificaciones': 0, 'reconexiones': 0, 'ultima': None}
+
+    def iniciar(self):
+        """Arrancar el hilo si no está corriendo en este proceso (llamar en cada petición es barato)"""
+        if self._hilo is not None and self._pid == os.getpid() and self._hilo.is_alive():
+            return
+        with self._lock:
+            if self._hilo is not None and self._pid == os.getpid() and self._hilo.is_alive():
+                return
+            self._pid = os.getpid()
+            self._detener.clear()
+            self._hilo = threading.Thread(target=self._ejecutar, name='listen-cambios', daemon=True)
+            self._hilo.start()
+
+    def detener(self):
+        self._detener.set()
+
+    def stats(self):
+        return dict(self._stats)
+
+    def _conectar(self):
+        conn = psycopg2.connect(self.url, connect_timeout=10, keepalives=1, keepalives_idle=30)
+        conn.set_isolation_level(extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        with conn.cursor() as cur:
+            cur.execute(f'LISTEN {self.canal}')
+            if self.on_historial:
+                cur.execute(f'LISTEN {CANAL_HISTORIAL}')
+        return conn
+
+    def _ejecutar(self):
+        espera = 1
+        primera = True
+        while not self._detener.is_set():
+            conn = None
+            try:
+                conn = self._conectar()
+                self._stats['conectado'] = True
+                logger.info("👂 Escuchando cambios en el canal %s", self.canal)
+
+                if not primera:
+                    # Lo que cambió mientras no escuchábamos no se sabe: invalidar todo
+                    self._stats['reconexiones'] += 1
+                    self._despachar(set(self.tablas))
+                    self._despachar_historial({None})
+                primera = False
+                espera = 1
+
+                while not self._detener.is_set():
+                    # select con timeout para poder detener el hilo y detectar conexiones muertas
+                    if select.select([conn], [], [], 5) == ([], [], []):
+                        continue
+                    conn.poll()
+                    tablas, sesiones = set(), set()
+                    while conn.notifies:
+                        aviso = conn.notifies.pop(0)
+                        (sesiones if aviso.channel == CANAL_HISTORIAL else tablas).add(aviso.payload)
+                    self._despachar(tablas)
+                    self._despachar_historial(sesiones)
+
+            except Exception as e:
+                self._stats['conectado'] = False
+                logger.error("❌ Error escuchando cambios (%s): %s; reintento en %ss", self.canal, e, espera)
+                self._detener.wait(espera)
+                espera = min(espera * 2, self.espera_max)
+            finally:
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+
+    def _despachar(self, tablas):
+        for tabla in tablas:
+            if tabla not in self.tablas:
+                continue
+            self._stats['notificaciones'] += 1
+            self._stats['ultima'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+            try:
+                self.on_cambio(tabla)
+            except Exception as e:
+                logger.error("❌ Error invalidando caché de %s: %s", tabla, e)
+
+    def _despachar_historial(self, avisos):
+        if not self.on_historial:
+            return
+        for aviso in avisos:
+            try:
+                self.on_historial(aviso)
+            except Exception as e:
+                logger.error("❌ Error invalidando historial (%s): %s", aviso, e)
@@ -0,0 +1,216 @@
+import os
+import time
+import threading
+from collections import deque
+
+from psycopg2 import extensions
+
+
+class PoolAgotadoError(Exception):
+    """No se obtuvo una conexión del pool dentro del tiempo de espera"""
+
+
+class ConnectionPool:
+    """Pool de conexiones thread-safe con health check y reciclaje
+
+    - ``minconn``: conexiones ociosas que se conservan aunque lleven tiempo sin usarse
+    - ``maxconn``: máximo de conexiones abiertas (en uso + ociosas)
+    - ``max_lifetime``: segundos tras los cuales una conexión se recicla
+    - ``max_idle``: segundos ociosa tras los cuales se cierra (por encima de ``minconn``)
+    - ``check_after``: segundos ociosa tras los cuales se valida con ``SELECT 1``
+    - ``timeout``: segundos de espera máxima cuando el pool está lleno
+    """
+
+    def __init__(self, connect, minconn=1, maxconn=10, max_lifetime=1800,
+                 max_idle=300, check_after=30, timeout=10):
+        if minconn < 0 or maxconn < 1 or minconn > maxconn:
+            raise ValueError(f"Tamaño de pool inválido: min={minconn}, max={maxconn}")
+
+        self._connect = connect
+        self.minconn = minconn
+        self.maxconn = maxconn
+        self.max_lifetime = max_lifetime
+        self.max_idle = max_idle
+        self.check_after = check_after
+        self.timeout = timeout
+
+        self._cond = threading.Condition()
+        self._reset()
+
+    def _reset(self):
+        # Ociosas: (conn, creada, liberada); la más reciente al final (LIFO)
+        self._idle = deque()
+        self._creadas = {}
+        self._total = 0
+        self._pid = os.getpid()
+
+    def _verificar_fork(self):
+        """Tras un fork las conexiones del padre no se comparten: se olvidan sin cerrarlas"""
+        if self._pid != os.getpid():
+            with self._cond:
+                if self._pid != os.getpid():
+                    self._reset()
+
+    # === CHECKOUT / CHECKIN ===
+
+    def getconn(self):
+        """Obtener una conexión sana del pool (bloquea hasta ``timeout`` si está lleno)"""
+        self._verificar_fork()
+        limite = time.monotonic() + self.timeout
+
+        while True:
+            entrada = self._reservar(limite)
+
+            if entrada is None:
+                # Hay cupo: abrir una conexión nueva fuera del lock
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._total -= 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self._creadas[id(conn)] = time.monotonic()
+                return conn
+
+            conn, creada, liberada = entrada
+            if self._es_valida(conn, creada, liberada):
+                with self._cond:
+                    self._creadas[id(conn)] = creada
+                return conn
+
+            self._descartar(conn)
+
+    def _reservar(self, limite):
+        """Tomar una conexión ociosa o reservar cupo para abrir una nueva"""
+        with self._cond:
+            while True:
+                if self._idle:
+                    return self._idle.pop()
+
+                if self._total < self.maxconn:
+                    self._total += 1
+                    return None
+
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    raise PoolAgotadoError(
+                        f"Pool agotado: {self.maxconn} conexiones en uso tras {self.timeout}s"
+                    )
+                self._cond.wait(restante)
+
+    def _es_valida(self, conn, creada, liberada):
+        """Health check al hacer checkout"""
+        if conn.closed:
+            return False
+
+        ahora = time.monotonic()
+        if ahora - creada > self.max_lifetime:
+            return False
+
+        if ahora - liberada > self.check_after:
+            try:
+                with conn.cursor() as cur:
+                    cur.execute('SELECT 1')
+                conn.rollback()
+            except Exception:
+                return False
+
+        return True
+
+    def putconn(self, conn, cerrar=False):
+        """Devolver una conexión al pool (o descartarla si está rota o vieja)"""
+        if self._pid != os.getpid():
+            return
+
+        with self._cond:
+            creada = self._creadas.pop(id(conn), None)
+
+        if creada is None:
+            # No pertenece a este pool (o ya se devolvió)
+            return
+
+        if not cerrar and not conn.closed:
+            try:
+                if conn.info.transaction_status != extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except Exception:
+                cerrar = True
+
+        if cerrar or conn.closed or time.monotonic() - creada > self.max_lifetime:
+            self._descartar(conn)
+            return
+
+        with self._cond:
+            self._idle.append((conn, creada, time.monotonic()))
+            self._purgar_ociosas()
+            self._cond.notify()
+
+    def _purgar_ociosas(self):
+        """Cerrar las ociosas más antiguas que exceden ``max_idle`` (llamar con el lock)"""
+        ahora = time.monotonic()
+        while len(self._idle) > self.minconn and ahora - self._idle[0][2] > self.max_idle:
+            conn = self._idle.popleft()[0]
+            self._total -= 1
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def _descartar(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._total -= 1
+            self._cond.notify()
+
+    # === ADMINISTRACIÓN ===
+
+    def calentar(self):
+        """Abrir conexiones hasta tener ``minconn`` ociosas"""
+        self._verificar_fork()
+        with self._cond:
+            faltantes = max(0, self.minconn - len(self._idle))
+
+        for _ in range(faltantes):
+            with self._cond:
+                if self._total >= self.maxconn:
+                    return
+                self._total += 1
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._cond:
+                    self._total -= 1
+                    self._cond.notify()
+                raise
+            ahora = time.monotonic()
+            with self._cond:
+                self._idle.append((conn, ahora, ahora))
+                self._cond.notify()
+
+    def closeall(self):
+        """Cerrar todas las conexiones ociosas (las que están en uso se cierran al devolverse)"""
+        with self._cond:
+            while self._idle:
+                conn = self._idle.pop()[0]
+                self._total -= 1
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            self._cond.notify_all()
+
+    def stats(self):
+        """Estado actual del pool"""
+        with self._cond:
+            return {
+                'total': self._total,
+                'en_uso': len(self._creadas),
+                'ociosas': len(self._idle),
+                'min': self.minconn,
+                'max': self.maxconn
+            }
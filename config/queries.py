@@ -0,0 +1,323 @@
+import os
+import re
+import time
+import logging
+from functools import lru_cache
+
+from psycopg2 import extensions, errors
+
+from config.metrics import LATENCIA_SQL, PREPARACIONES
+from config.notifications import CANAL_HISTORIAL
+
+
+# Registro central de las consultas de NeonDatabase: cada una tiene un
+# nombre y parámetros %s (nunca valores interpolados en el texto). Con
+# sentencias preparadas activas, cada conexión del pool hace PREPARE la
+# primera vez que usa una consulta y después sólo EXECUTE: Postgres ya no
+# vuelve a analizar ni a planificar el texto en cada llamada.
+#
+#   DB_PREPARED   auto (por defecto): preparar salvo detrás del pooler de Neon
+#                 1: preparar siempre · 0: enviar siempre el texto
+#
+# El pooler de Neon (PgBouncer en modo transacción) reparte cada
+# transacción en cualquier backend, y un PREPARE sólo existe en el backend
+# donde se hizo; por eso ``auto`` no prepara con las URL ``-pooler.``.
+
+logger = logging.getLogger(__name__)
+
+_COLUMNAS_ESTUDIANTE = '''
+    matricula,
+    nombre,
+    apellido,
+    carrera,
+    semestre,
+    fecha_inscripcion,
+    inscripcion_pagada,
+    COALESCE(email, 'No especificado') as email,
+    COALESCE(telefono, 'No especificado') as telefono
+'''
+
+# Orden del listado paginado: sin NULL, porque una comparación de filas con NULL nunca es verdadera
+# y la página siguiente a una fila con NULL saldría vacía (ver clave_cursor en config/database.py)
+CLAVE_ORDEN = "COALESCE(carrera, 'Sin carrera'), COALESCE(nombre, ''), COALESCE(apellido, ''), matricula"
+
+_COLUMNAS_BUSQUEDA = 'matricula, nombre, apellido, carrera, semestre, inscripcion_pagada'
+_NOMBRE_COMPLETO = "chatbot_normalizar(nombre || ' ' || apellido)"
+
+CONSULTAS = {
+    'ping': 'SELECT 1',
+    'common_intents': '''
+        SELECT intent_name, response_template, example_questions
+        FROM common_intents
+    ''',
+    'resumen_carreras': '''
+        SELECT carrera, total AS cantidad, pagados, pendientes
+        FROM resumen_carreras
+        WHERE total > 0
+    ''',
+    'agregar_por_carrera': '''
+        SELECT
+            COALESCE(carrera, 'Sin carrera') AS carrera,
+            COUNT(*) AS cantidad,
+            COUNT(*) FILTER (WHERE inscripcion_pagada = TRUE) AS pagados,
+            COUNT(*) FILTER (WHERE inscripcion_pagada = FALSE) AS pendientes
+        FROM estudiantes
+        GROUP BY 1
+    ''',
+    'estudiantes_pendientes': '''
+        SELECT matricula, nombre, apellido, carrera, semestre, fecha_inscripcion
+        FROM estudiantes
+        WHERE inscripcion_pagada = FALSE
+        ORDER BY fecha_inscripcion DESC
+    ''',
+    'estudiantes_pendientes_completo': '''
+        SELECT
+            matricula,
+            nombre,
+            apellido,
+            carrera,
+            semestre,
+            fecha_inscripcion,
+            COALESCE(email, 'No especificado') as email,
+            COALESCE(telefono, 'No especificado') as telefono
+        FROM estudiantes
+        WHERE inscripcion_pagada = FALSE
+        ORDER BY fecha_inscripcion DESC
+    ''',
+    'estudiantes_de_carrera': '''
+        SELECT matricula, nombre, apellido, semestre, inscripcion_pagada
+        FROM estudiantes
+        WHERE carrera = %s
+        ORDER BY nombre
+    ''',
+    'estudiantes_por_carrera': '''
+        SELECT matricula, nombre, apellido, carrera, semestre, inscripcion_pagada
+        FROM estudiantes
+        ORDER BY carrera, nombre
+    ''',
+    'carreras': '''
+        SELECT codigo, nombre, duracion_semestres, costo_inscripcion
+        FROM carreras
+        WHERE activa = TRUE
+        ORDER BY nombre
+    ''',
+    'reporte_completo': f'''
+        SELECT {_COLUMNAS_ESTUDIANTE}
+        FROM estudiantes
+        ORDER BY carrera, nombre, apellido
+        LIMIT 1000
+    ''',
+    'registrar_reporte': '''
+        INSERT INTO reportes_generados (tipo_reporte, parametros, generado_por)
+        VALUES (%s, %s, %s)
+    ''',
+    'version_datos': "SELECT version FROM datos_version WHERE tabla = 'estudiantes'",
+    # Sin la migración de datos_version: contadores no transaccionales, marcados con el
+    # arranque del servidor y el último reinicio de estadísticas para no repetir versiones
+    'version_datos_estadisticas': '''
+        SELECT t.n_tup_ins, t.n_tup_upd, t.n_tup_del,
+               extract(epoch FROM pg_postmaster_start_time())::bigint AS arranque,
+               COALESCE(extract(epoch FROM d.stats_reset), 0)::bigint AS reinicio
+        FROM pg_stat_user_tables t, pg_stat_database d
+        WHERE t.relname = 'estudiantes' AND d.datname = current_database()
+    ''',
+    'buscar_matricula': 'SELECT * FROM estudiantes WHERE matricula = %s',
+    'buscar_carrera': 'SELECT * FROM estudiantes WHERE carrera = ANY(%s)',
+    # Búsqueda difusa (migraciones de pg_trgm): índice GiST filtrado por <% y ordenado por distancia
+    'buscar_estudiantes': f'''
+        SELECT {_COLUMNAS_BUSQUEDA},
+               round((1 - (%s <<-> {_NOMBRE_COMPLETO}))::numeric, 3)::float8 AS puntaje
+        FROM estudiantes
+        WHERE %s <%% {_NOMBRE_COMPLETO}
+        ORDER BY %s <<-> {_NOMBRE_COMPLETO}, matricula
+        LIMIT %s OFFSET %s
+    ''',
+    'autocompletar_estudiantes': f'''
+        SELECT {_COLUMNAS_BUSQUEDA}
+        FROM estudiantes
+        WHERE ({_NOMBRE_COMPLETO} ~>=~ %s AND {_NOMBRE_COMPLETO} ~<~ %s)
+           OR (chatbot_normalizar(apellido) ~>=~ %s AND chatbot_normalizar(apellido) ~<~ %s)
+        ORDER BY apellido, nombre, matricula
+        LIMIT %s
+    ''',
+    # Mismas búsquedas sin las migraciones (recorren la tabla y no ignoran acentos)
+    'buscar_estudiantes_ilike': f'''
+        SELECT {_COLUMNAS_BUSQUEDA}, NULL::float8 AS puntaje
+        FROM estudiantes
+        WHERE nombre || ' ' || apellido ILIKE %s
+        ORDER BY apellido, nombre, matricula
+        LIMIT %s OFFSET %s
+    ''',
+    'autocompletar_estudiantes_ilike': f'''
+        SELECT {_COLUMNAS_BUSQUEDA}
+        FROM estudiantes
+        WHERE nombre || ' ' || apellido ILIKE %s OR apellido ILIKE %s
+        ORDER BY apellido, nombre, matricula
+        LIMIT %s
+    ''',
+    'total_mensajes': 'SELECT COUNT(*) as total_messages FROM chat_messages',
+    'sesiones_unicas': 'SELECT COUNT(DISTINCT session_id) as unique_sessions FROM chat_messages',
+    'historial': '''
+        SELECT
+            message_type,
+            user_message,
+            bot_response,
+            intent_detected,
+            created_at
+        FROM chat_messages
+        WHERE session_id = %s
+        ORDER BY created_at DESC
+        LIMIT %s
+    ''',
+    # Un aviso por sesión con mensajes nuevos; se entrega al confirmar el INSERT
+    'avisar_historial': f'''
+        SELECT pg_notify('{CANAL_HISTORIAL}', %s || ':' || sesion)
+        FROM unnest(%s::text[]) AS sesion
+    ''',
+}
+
+
+def sql_estudiantes(carrera=False, pagado=False, cursor=False, semestre=False):
+    """Listado ordenado de estudiantes (paginado o por streaming), terminado en ``LIMIT %s``
+
+    El texto sólo depende de qué filtros hay, nunca de sus valores. Los
+    parámetros van en orden: carrera, pagado, semestre, cursor, límite.
+    """
+    condiciones = []
+    if carrera:
+        condiciones.append('carrera = %s')
+    if pagado:
+        condiciones.append('inscripcion_pagada = %s')
+    if semestre:
+        condiciones.append('semestre = %s')
+    if cursor:
+        condiciones.append(f'({CLAVE_ORDEN}) > (%s, %s, %s, %s)')
+    where = f"WHERE {' AND '.join(condiciones)}" if condiciones else ''
+    return f'''
+        SELECT {_COLUMNAS_ESTUDIANTE}
+        FROM estudiantes
+        {where}
+        ORDER BY {CLAVE_ORDEN}
+        LIMIT %s
+    '''
+
+
+def nombre_pagina(carrera=False, pagado=False, cursor=False, semestre=False):
+    """Nombre registrado del listado con esos filtros presentes"""
+    filtros = (('_carrera', carrera), ('_pagado', pagado), ('_semestre', semestre), ('_cursor', cursor))
+    return 'estudiantes_pagina' + ''.join(sufijo for sufijo, presente in filtros if presente)
+
+
+# Una variante registrada por combinación de filtros (16 en total)
+for _carrera in (False, True):
+    for _pagado in (False, True):
+        for _semestre in (False, True):
+            for _cursor in (False, True):
+                CONSULTAS[nombre_pagina(_carrera, _pagado, _cursor, _semestre)] = \
+                    sql_estudiantes(_carrera, _pagado, _cursor, _semestre)
+
+
+def a_posicionales(sql):
+    """``%s`` de psycopg2 a ``$1, $2...`` de PREPARE; devuelve (texto, cantidad de parámetros)"""
+    contador = [0]
+
+    def reemplazar(coincidencia):
+        if coincidencia.group() == '%%':
+            return '%'
+        contador[0] += 1
+        return f'${contador[0]}'
+
+    return re.sub(r'%%|%s', reemplazar, sql), contador[0]
+
+
+@lru_cache(maxsize=None)
+def posicional(nombre):
+    """Texto de la consulta ``nombre`` con ``$n`` (asyncpg usa este formato directamente)"""
+    return a_posicionales(CONSULTAS[nombre])[0]
+
+
+def usar_preparadas(db_url, valor=None):
+    """DB_PREPARED: ``auto`` prepara sólo si la URL no pasa por el pooler"""
+    valor = (valor or os.getenv('DB_PREPARED', 'auto')).lower()
+    if valor == 'auto':
+        return '-pooler.' not in db_url
+    return valor not in ('0', 'false', 'no')
+
+
+class ConexionPreparada(extensions.connection):
+    """Conexión de psycopg2 que recuerda qué consultas ya preparó en su sesión"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.preparadas = set()
+
+
+class RegistroConsultas:
+    """Ejecutar consultas del registro por nombre (preparadas o como texto) y cronometrarlas"""
+
+    def __init__(self, preparar=True, consultas=CONSULTAS):
+        self.preparar = preparar
+        self._consultas = consultas
+        self._posicionales = {}
+        self.reintentos = 0
+
+    def sql(self, nombre):
+        return self._consultas[nombre]
+
+    def _sentencia(self, nombre):
+        # (identificador, SQL con $n, cantidad de parámetros), calculado una vez por consulta
+        sentencia = self._posicionales.get(nombre)
+        if sentencia is None:
+            texto, cantidad = a_posicionales(self._consultas[nombre])
+            sentencia = self._posicionales[nombre] = (f'q_{nombre}', texto, cantidad)
+        return sentencia
+
+    def ejecutar(self, cur, nombre, params=()):
+        """``cur.execute`` de la consulta ``nombre``; devuelve el cursor para el fetch"""
+        conn = getattr(cur, 'connection', None)
+        preparadas = getattr(conn, 'preparadas', None)
+        inicio = time.perf_counter()
+
+        if not self.preparar or preparadas is None:
+            cur.execute(self._consultas[nombre], params)
+            LATENCIA_SQL.labels(nombre, 'texto').observe(time.perf_counter() - inicio)
+            return cur
+
+        # Sólo se puede repetir si la consulta abre la transacción (si no, se perdería lo anterior)
+        repetible = conn.info.transaction_status == extensions.TRANSACTION_STATUS_IDLE
+        try:
+            self._ejecutar_preparada(cur, nombre, preparadas, params)
+        except (errors.InvalidSqlStatementName, errors.DuplicatePreparedStatement) as e:
+            # 26000: la sesión ya no la tiene (p. ej. DISCARD ALL); 42P05: ya estaba preparada
+            if not repetible:
+                raise
+            conn.rollback()
+            self.reintentos += 1
+            logger.warning("⚠️ Sentencia %s desincronizada (%s); reintentando", nombre, e.pgcode)
+            if isinstance(e, errors.DuplicatePreparedStatement):
+                preparadas.add(self._sentencia(nombre)[0])
+            else:
+                preparadas.clear()
+            self._ejecutar_preparada(cur, nombre, preparadas, params)
+
+        LATENCIA_SQL.labels(nombre, 'preparada').observe(time.perf_counter() - inicio)
+        return cur
+
+    def _ejecutar_preparada(self, cur, nombre, preparadas, params):
+        identificador, texto, cantidad = self._sentencia(nombre)
+        if identificador not in preparadas:
+            cur.execute(f'PREPARE {identificador} AS {texto}')
+            preparadas.add(identificador)
+            PREPARACIONES.labels(nombre).inc()
+        if cantidad:
+            cur.execute(f"EXECUTE {identificador} ({', '.join(['%s'] * cantidad)})", params)
+        else:
+            cur.execute(f'EXECUTE {identificador}')
+
+    def stats(self):
+        return {
+            'preparadas': self.preparar,
+            'consultas': len(self._consultas),
+            'reintentos': self.reintentos
+        }
+
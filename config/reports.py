@@ -0,0 +1,243 @@
+import os
+import logging
+import re
+import glob
+import time
+import tempfile
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+from config.exports import (escribir_excel, escribir_pdf, COLUMNAS_ESTUDIANTES,
+                            COLUMNAS_PENDIENTES, XLSX_MIMETYPE)
+
+
+logger = logging.getLogger(__name__)
+
+
+def _generar_excel(db, destino):
+    return escribir_excel(db.iterar_estudiantes(), COLUMNAS_ESTUDIANTES, 'Estudiantes', destino)
+
+
+def _generar_pendientes(db, destino):
+    return escribir_excel(db.iterar_estudiantes_pendientes(), COLUMNAS_PENDIENTES, 'Estudiantes Pendientes', destino)
+
+
+def _generar_pdf(db, destino):
+    return escribir_pdf(db.iterar_estudiantes(), db.get_estadisticas_estudiantes(), destino)
+
+
+# Tipos de reporte: extensión, mimetype, nombre de descarga, tipo en reportes_generados y generador
+TIPOS_REPORTE = {
+    'excel': {
+        'extension': 'xlsx',
+        'mimetype': XLSX_MIMETYPE,
+        'nombre': 'reporte_estudiantes.xlsx',
+        'tipo_reporte': 'reporte_completo_estudiantes',
+        'generar': _generar_excel
+    },
+    'pdf': {
+        'extension': 'pdf',
+        'mimetype': 'application/pdf',
+        'nombre': 'reporte_estudiantes.pdf',
+        'tipo_reporte': 'reporte_completo_estudiantes_pdf',
+        'generar': _generar_pdf
+    },
+    'pendientes': {
+        'extension': 'xlsx',
+        'mimetype': XLSX_MIMETYPE,
+        'nombre': 'estudiantes_pendientes.xlsx',
+        'tipo_reporte': 'inscripciones_pendientes',
+        'generar': _generar_pendientes
+    }
+}
+
+
+class ReportJob:
+    """Trabajo de generación de un reporte
+
+    El id es ``<tipo>-<versión de datos>``: dos solicitudes del mismo reporte
+    sobre los mismos datos comparten trabajo y archivo, y cualquier worker
+    puede resolver un id a partir del archivo en disco.
+    """
+
+    def __init__(self, tipo, version, ruta, estado='en_cola'):
+        self.id = f"{tipo}-{version}"
+        self.tipo = tipo
+        self.version = version
+        self.ruta = ruta
+        self.estado = estado
+        self.error = None
+        self.total = None
+        self.creado = datetime.now()
+        self.terminado = datetime.now() if estado == 'listo' else None
+        self.inicio = time.time()
+        self._listo = threading.Event()
+        if estado != 'en_cola':
+            self._listo.set()
+
+    def esperar(self, timeout=None):
+        """Bloquear hasta que el trabajo termine; devuelve True si terminó"""
+        return self._listo.wait(timeout)
+
+    def _terminar(self, estado, error=None):
+        self.estado = estado
+        self.error = error
+        self.terminado = datetime.now()
+        self._listo.set()
+
+    def to_dict(self):
+        return {
+            'reporte_id': self.id,
+            'tipo': self.tipo,
+            'estado': self.estado,
+            'error': self.error,
+            'total_estudiantes': self.total,
+            'fecha_solicitud': self.creado.isoformat(),
+            'fecha_generacion': self.terminado.isoformat() if self.terminado else None,
+            'url_estado': f"/reportes/{self.id}",
+            'url_descarga': f"/reportes/{self.id}/descargar"
+        }
+
+
+class ReportManager:
+    """Cola de reportes en segundo plano con archivos cacheados en disco
+
+    Los archivos se guardan en ``directorio`` con el nombre
+    ``<tipo>-<versión>.<ext>``; mientras los datos no cambien, volver a pedir
+    el mismo reporte devuelve el archivo existente al instante.
+    """
+
+    def __init__(self, db, directorio=None, workers=2, retencion=3600):
+        self.db = db
+        self.directorio = directorio or os.path.join(tempfile.gettempdir(), 'chatbot_reportes')
+        self.workers = workers
+        self.retencion = retencion
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._executor = None
+        self._pid = None
+
+    def _get_executor(self):
+        # El pool de hilos se crea en el proceso que lo usa (seguro tras un fork)
+        if self._executor is None or self._pid != os.getpid():
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='reportes')
+            self._pid = os.getpid()
+            self._jobs = {}
+        return self._executor
+
+    def _ruta(self, tipo, version):
+        return os.path.join(self.directorio, f"{tipo}-{version}.{TIPOS_REPORTE[tipo]['extension']}")
+
+    def enviar(self, tipo):
+        """Solicitar un reporte; devuelve el trabajo (nuevo, en curso o ya listo)"""
+        if tipo not in TIPOS_REPORTE:
+            raise ValueError(f"Tipo de reporte no válido: {tipo}")
+
+        version = self.db.version_datos()
+        ruta = self._ruta(tipo, version)
+
+        with self._lock:
+            executor = self._get_executor()
+            self._purgar()
+
+            # Reutilizar el trabajo en curso o terminado (si su archivo sigue en disco)
+            job = self._jobs.get(f"{tipo}-{version}")
+            if job and job.estado in ('en_cola', 'generando'):
+                return job
+            if job and job.estado == 'listo' and os.path.exists(ruta):
+                return job
+
+            if os.path.exists(ruta):
+                job = ReportJob(tipo, version, ruta, estado='listo')
+            else:
+                job = ReportJob(tipo, version, ruta)
+                executor.submit(self._generar, job)
+
+            self._jobs[job.id] = job
+            return job
+
+    def obtener(self, job_id):
+        """Trabajo por id; si es de otro worker se reconstruye desde el disco
+
+        Si el archivo de un trabajo listo ya no está (lo borró una versión
+        más nueva) se encola otro con los datos actuales y se devuelve ese.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job and job.estado == 'listo' and not os.path.exists(job.ruta):
+            with self._lock:
+                self._jobs.pop(job_id, None)
+            return self.enviar(job.tipo)
+        if job:
+            return job
+
+        tipo, _, version = job_id.partition('-')
+        if tipo in TIPOS_REPORTE and re.fullmatch(r'[\w-]+', version):
+            ruta = self._ruta(tipo, version)
+            if os.path.exists(ruta):
+                return ReportJob(tipo, version, ruta, estado='listo')
+            # Otro worker lo está escribiendo (<ruta>.<pid>.tmp)
+            if glob.glob(f"{glob.escape(ruta)}.*.tmp"):
+                return ReportJob(tipo, version, ruta, estado='generando')
+        return None
+
+    def _generar(self, job):
+        config = TIPOS_REPORTE[job.tipo]
+        job.estado = 'generando'
+        temporal = f"{job.ruta}.{os.getpid()}.tmp"
+        inicio = time.perf_counter()
+
+        try:
+            os.makedirs(self.directorio, exist_ok=True)
+            with open(temporal, 'wb') as destino:
+                job.total = config['generar'](self.db, destino)
+            os.replace(temporal, job.ruta)
+
+            segundos = time.perf_counter() - inicio
+            logger.info("📄 Reporte %s generado: %s estudiantes en %.1fs", job.id, job.total, segundos)
+
+            # Registrar sólo los reportes realmente generados
+            self.db.registrar_reporte(config['tipo_reporte'], {
+                'reporte_id': job.id,
+                'total_estudiantes': job.total
+            })
+            self._limpiar_versiones(job)
+            job._terminar('listo')
+
+        except Exception as e:
+            logger.error("❌ Error generando reporte %s: %s", job.id, e)
+            if os.path.exists(temporal):
+                os.remove(temporal)
+            job._terminar('error', str(e))
+
+    def _limpiar_versiones(self, job):
+        """Borrar archivos de versiones anteriores del mismo tipo (nunca los de una más nueva)"""
+        extension = TIPOS_REPORTE[job.tipo]['extension']
+        patron = os.path.join(self.directorio, f"{job.tipo}-*.{extension}")
+        for ruta in glob.glob(patron):
+            version = os.path.basename(ruta)[len(job.tipo) + 1:-len(extension) - 1]
+            if ruta != job.ruta and self._es_anterior(version, ruta, job):
+                try:
+                    os.remove(ruta)
+                except OSError:
+                    pass
+
+    @staticmethod
+    def _es_anterior(version, ruta, job):
+        """``version`` es anterior a la del trabajo: por contador (vN) o, sin él, por fecha del archivo"""
+        actual, otra = re.fullmatch(r'v(\d+)', job.version), re.fullmatch(r'v(\d+)', version)
+        if actual and otra:
+            return int(otra.group(1)) < int(actual.group(1))
+        # Versiones de pg_stat (sin orden): anterior si el archivo ya estaba al empezar este trabajo
+        try:
+            return os.path.getmtime(ruta) < job.inicio
+        except OSError:
+            return False
+
+    def _purgar(self):
+        """Olvidar trabajos terminados hace más de ``retencion`` segundos (llamar con el lock)"""
+        limite = datetime.now().timestamp() - self.retencion
+        for job_id, job in list(self._jobs.items()):
+            if job.terminado and job.terminado.timestamp() < limite:
+                del self._jobs[job_id]
@@ -0,0 +1,183 @@
+from datetime import datetime
+
+
+# Textos del chat a partir de datos ya consultados. Los usan NeonDatabase
+# (síncrono) y AsyncNeonDatabase (asíncrono): cada función devuelve
+# (respuesta, intención, confianza, datos estructurados).
+
+# Filas que muestra el chat; los manejadores piden sólo estas a la BD
+LIMITE_LISTA = 10
+LIMITE_VISTA_REPORTE = 5
+
+
+def armar_estadisticas(filas):
+    """Estadísticas generales a partir de filas {carrera, cantidad, pagados, pendientes}"""
+    # Distribución por carrera
+    por_carrera = [
+        {'carrera': fila['carrera'], 'cantidad': fila['cantidad'],
+         'pagados': fila['pagados'], 'pendientes': fila['pendientes']}
+        for fila in filas
+    ]
+    por_carrera.sort(key=lambda fila: fila['cantidad'], reverse=True)
+
+    return {
+        'total_estudiantes': sum(fila['cantidad'] for fila in filas),
+        'inscritos_pagados': sum(fila['pagados'] for fila in filas),
+        'pendientes_inscripcion': sum(fila['pendientes'] for fila in filas),
+        'por_carrera': por_carrera
+    }
+
+
+def respuesta_estadisticas(estadisticas):
+    if not estadisticas:
+        return "No pude obtener las estadísticas en este momento.", "estadisticas", 0.5, {}
+
+    respuesta = f"📊 **Estadísticas Universitarias**\n\n"
+    respuesta += f"👥 **Total de estudiantes:** {estadisticas['total_estudiantes']}\n"
+    respuesta += f"✅ **Inscripción pagada:** {estadisticas['inscritos_pagados']}\n"
+    respuesta += f"❌ **Pendientes de pago:** {estadisticas['pendientes_inscripcion']}\n\n"
+
+    respuesta += "🎓 **Distribución por carrera:**\n"
+    for carrera in estadisticas['por_carrera']:
+        respuesta += f"  • {carrera['carrera']}: {carrera['cantidad']} estudiantes\n"
+
+    return respuesta, "estadisticas_universidad", 0.9, {'estadisticas': estadisticas}
+
+
+def respuesta_pendientes(estudiantes, total=None, filtro='', hay_mas=False):
+    """Pendientes de inscripción; ``estudiantes`` puede ser sólo la primera página
+
+    ``total`` viene de las estadísticas cacheadas cuando se conoce; si no,
+    ``hay_mas`` indica que la consulta limitada dejó filas sin traer.
+    """
+    if not estudiantes:
+        return f"🎉 **¡Excelente! No hay estudiantes{filtro} pendientes de inscripción.**", "inscripciones", 0.9, {'estudiantes': estudiantes}
+
+    total = len(estudiantes) if total is None else max(total, len(estudiantes))
+    encabezado = f"{total}+" if hay_mas and total <= len(estudiantes) else total
+    respuesta = f"📋 **Estudiantes{filtro} pendientes de inscripción: {encabezado}**\n\n"
+    for i, est in enumerate(estudiantes[:LIMITE_LISTA], 1):
+        respuesta += f"{i}. **{est['matricula']}** - {est['nombre']} {est['apellido']}\n"
+        respuesta += f"   🎓 {est['carrera']} - Semestre {est['semestre']}\n"
+        respuesta += f"   📅 Inscrito desde: {est['fecha_inscripcion']}\n\n"
+
+    mostrados = min(len(estudiantes), LIMITE_LISTA)
+    if total > mostrados:
+        respuesta += f"📝 *Y {total - mostrados} estudiantes más...*"
+    elif hay_mas:
+        respuesta += "📝 *Y más estudiantes: pide el reporte de pendientes para la lista completa.*"
+
+    return respuesta, "inscripciones_pendientes", 0.9, {'estudiantes': estudiantes[:LIMITE_LISTA]}
+
+
+def pendientes_en_estadisticas(estadisticas, carrera=None):
+    """Pendientes de ``carrera`` (o de todas) según las estadísticas; ``None`` si no se saben"""
+    if not estadisticas:
+        return None
+    if carrera is None:
+        return estadisticas['pendientes_inscripcion']
+    return next((fila['pendientes'] for fila in estadisticas['por_carrera'] if fila['carrera'] == carrera), 0)
+
+
+def respuesta_inscripciones():
+    return "Puedo ayudarte con información de inscripciones. ¿Quieres saber sobre estudiantes pendientes de pago?", "inscripciones", 0.7, {}
+
+
+def respuesta_carreras(carreras):
+    respuesta = "🎓 **Carreras disponibles:**\n\n"
+    for carrera in carreras:
+        respuesta += f"• **{carrera['nombre']}** ({carrera['codigo']})\n"
+        respuesta += f"  Duración: {carrera['duracion_semestres']} semestres\n"
+        respuesta += f"  Inscripción: ${carrera['costo_inscripcion']}\n\n"
+
+    return respuesta, "carreras", 0.9, {'carreras': carreras}
+
+
+def respuesta_total_estudiantes(estadisticas):
+    return f"👥 **Total de estudiantes registrados:** {estadisticas['total_estudiantes']}", "estudiantes_total", 0.9, {'estadisticas': estadisticas}
+
+
+def respuesta_estudiantes():
+    return "Puedo ayudarte con información de estudiantes. ¿Quieres saber el total, por carrera o pendientes de inscripción?", "estudiantes", 0.8, {}
+
+
+def respuesta_estudiantes_filtrados(estudiantes, filtro, hay_mas=False):
+    if not estudiantes:
+        return f"👥 No encontré estudiantes{filtro}.", "estudiantes_filtrados", 0.7, {'estudiantes': []}
+
+    respuesta = f"👥 **Estudiantes{filtro}:**\n\n"
+    for i, est in enumerate(estudiantes, 1):
+        pago = "✅" if est['inscripcion_pagada'] else "❌"
+        respuesta += f"{i}. **{est['matricula']}** - {est['nombre']} {est['apellido']} {pago}\n"
+        respuesta += f"   🎓 {est['carrera']} - Semestre {est['semestre']}\n\n"
+
+    if hay_mas:
+        respuesta += f"📝 *Mostrando los primeros {len(estudiantes)}; descarga el Excel para la lista completa.*"
+
+    return respuesta, "estudiantes_filtrados", 0.9, {'estudiantes': estudiantes}
+
+
+def respuesta_busqueda(termino, estudiantes):
+    if not estudiantes:
+        return f"🔎 No encontré estudiantes que coincidan con **{termino}**.", "busqueda_estudiante", 0.7, {'estudiantes': []}
+
+    respuesta = f"🔎 **Estudiantes que coinciden con \"{termino}\":**\n\n"
+    for i, est in enumerate(estudiantes, 1):
+        respuesta += f"{i}. **{est['matricula']}** - {est['nombre']} {est['apellido']}\n"
+        respuesta += f"   🎓 {est['carrera']} - Semestre {est['semestre']}\n\n"
+
+    return respuesta, "busqueda_estudiante", 0.9, {'estudiantes': estudiantes}
+
+
+def respuesta_busqueda_sin_termino():
+    return "¿A quién busco? Escribe el nombre o la matrícula, por ejemplo: *busca a Juan Pérez*.", "busqueda_estudiante", 0.6, {}
+
+
+def respuesta_reporte_pendientes(estudiantes_pendientes, job, total=None):
+    """Resumen del reporte de pendientes; ``estudiantes_pendientes`` es sólo una vista previa"""
+    total = len(estudiantes_pendientes) if total is None else total
+    respuesta = f"📄 **Reporte de INSCRIPCIONES PENDIENTES**\n\n"
+    respuesta += f"• **Estudiantes pendientes:** {total}\n"
+    respuesta += f"• **Fecha de generación:** {datetime.now().strftime('%d/%m/%Y %H:%M')}\n\n"
+
+    vista = estudiantes_pendientes[:LIMITE_VISTA_REPORTE]
+    if vista:
+        respuesta += "📋 **Lista de estudiantes pendientes:**\n"
+        for i, est in enumerate(vista, 1):
+            respuesta += f"{i}. {est['matricula']} - {est['nombre']} {est['apellido']}\n"
+
+        if total > len(vista):
+            respuesta += f"\n📝 *Y {total - len(vista)} estudiantes más...*"
+    else:
+        respuesta += "🎉 **¡No hay estudiantes pendientes!**"
+
+    return respuesta, "reporte_pendientes", 0.9, {'estudiantes': vista, 'reporte': job.to_dict()}
+
+
+def respuesta_reporte_completo(estadisticas, job):
+    reporte = job.to_dict()
+    reporte.update({
+        'total_estudiantes': estadisticas['total_estudiantes'],
+        'estudiantes_pagados': estadisticas['inscritos_pagados'],
+        'estudiantes_pendientes': estadisticas['pendientes_inscripcion']
+    })
+
+    respuesta = f"📄 **📊 REPORTE COMPLETO DE ESTUDIANTES**\n\n"
+    respuesta += f"• **Total de estudiantes:** {reporte['total_estudiantes']}\n"
+    respuesta += f"• **Inscripción pagada:** {reporte['estudiantes_pagados']}\n"
+    respuesta += f"• **Pendientes de pago:** {reporte['estudiantes_pendientes']}\n"
+    respuesta += f"• **ID del reporte:** {reporte['reporte_id']}\n"
+    respuesta += f"• **Fecha:** {datetime.now().strftime('%Y-%m-%d')}\n\n"
+
+    # Mostrar resumen por carreras
+    if estadisticas['por_carrera']:
+        respuesta += "🎓 **Distribución por carrera:**\n"
+        for carrera in estadisticas['por_carrera'][:5]:
+            respuesta += f"  • {carrera['carrera']}: {carrera['cantidad']} estudiantes\n"
+
+    if job.estado == 'listo':
+        respuesta += "\n💡 *El reporte completo está listo para descargar*"
+    else:
+        respuesta += "\n⏳ *El reporte completo se está generando; estará listo para descargar en unos segundos*"
+
+    return respuesta, "reporte_completo", 0.9, {'reporte': reporte}
@@ -2,9 +2,9 @@ import sys
 import os
 
 
-sys.path.append(os.path.join(os.path.dirname(__file__), 'config'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from database import NeonDatabase
+from config.database import NeonDatabase
 
 def test_chatbot_database():
     print("🚀 INICIANDO PRUEBA DE BASE DE DATOS DEL CHATBOT...")
@@ -91,18 +91,16 @@ def test_chatbot_database():
     
     
     try:
-        conn = db.get_connection()
-        cur = conn.cursor()
-        cur.execute("SELECT COUNT(*) as count FROM common_intents")
-        intent_count = cur.fetchone()['count']
-        print(f"   📚 Intenciones configuradas: {intent_count}")
+        with db.connection() as conn, conn.cursor() as cur:
+            cur.execute("SELECT COUNT(*) as count FROM common_intents")
+            intent_count = cur.fetchone()['count']
+            print(f"   📚 Intenciones configuradas: {intent_count}")
+            
+            cur.execute("SELECT intent_name FROM common_intents LIMIT 5")
+            intents = [row['intent_name'] for row in cur.fetchall()]
+            print(f"   🎯 Intenciones disponibles: {', '.join(intents)}")
         
-        cur.execute("SELECT intent_name FROM common_intents LIMIT 5")
-        intents = [row['intent_name'] for row in cur.fetchall()]
-        print(f"   🎯 Intenciones disponibles: {', '.join(intents)}")
-        
-        cur.close()
-        conn.close()
+        print(f"   🔌 Pool: {db.pool.stats()}")
     except Exception as e:
         print(f"   ❌ Error verificando intenciones: {e}")
     
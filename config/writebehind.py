@@ -0,0 +1,201 @@
+import os
+import logging
+import time
+import queue
+import atexit
+import heapq
+import threading
+
+
+logger = logging.getLogger(__name__)
+
+
+# Marca en la cola para despertar al hilo al cerrar
+_FIN = object()
+
+
+class WriteBehindBuffer:
+    """Escritura diferida por lotes desde un hilo en segundo plano
+
+    ``escribir(registros)`` recibe una lista de registros y los persiste de
+    una sola vez (por ejemplo con un INSERT de varias filas). Los registros
+    se acumulan en una cola acotada y se escriben cuando hay ``max_lote``
+    o cuando pasan ``intervalo`` segundos desde el primero pendiente.
+
+    - Contrapresión: si la cola está llena, ``encolar`` espera hasta
+      ``espera`` segundos y, si sigue llena, escribe el registro en el hilo
+      que llama (nunca se pierde por falta de espacio).
+    - Un lote que falla se reintenta ``reintentos`` veces antes de descartarse.
+    - Al terminar el proceso (atexit) se escribe todo lo pendiente.
+    - Cada registro lleva un número de secuencia: ``vaciar`` espera sólo a
+      los encolados antes de llamarla, no a que la cola quede en cero.
+    """
+
+    def __init__(self, escribir, max_lote=100, intervalo=1.0, maxsize=10000,
+                 espera=0.5, reintentos=3, nombre='write-behind'):
+        self._escribir = escribir
+        self.max_lote = max_lote
+        self.intervalo = intervalo
+        self.maxsize = maxsize
+        self.espera = espera
+        self.reintentos = reintentos
+        self.nombre = nombre
+
+        # _lock serializa las escrituras; _cond avisa cuando se termina de escribir un lote
+        self._lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._reset()
+        atexit.register(self.cerrar)
+
+    def _reset(self):
+        self._cola = queue.Queue(maxsize=self.maxsize)
+        self._pendientes = 0
+        self._secuencia = 0
+        self._en_curso = []  # heap de secuencias sin escribir
+        self._terminadas = set()  # secuencias escritas que aún están en el heap
+        self._detener = threading.Event()
+        self._hilo = None
+        self._pid = os.getpid()
+        self._stats = {'encolados': 0, 'escritos': 0, 'lotes': 0,
+                       'sincronos': 0, 'errores': 0, 'descartados': 0}
+
+    def _asegurar_hilo(self):
+        # El hilo se arranca en el proceso que escribe (seguro tras un fork)
+        if self._pid != os.getpid():
+            self._reset()
+        if self._hilo is None or not self._hilo.is_alive():
+            self._hilo = threading.Thread(target=self._ejecutar, name=self.nombre, daemon=True)
+            self._hilo.start()
+
+    # === API ===
+
+    def encolar(self, registro):
+        """Agregar un registro; devuelve False si se tuvo que escribir de forma síncrona"""
+        with self._cond:
+            self._asegurar_hilo()
+            self._pendientes += 1
+            self._secuencia += 1
+            numerado = (self._secuencia, registro)
+            heapq.heappush(self._en_curso, self._secuencia)
+            self._stats['encolados'] += 1
+
+        try:
+            self._cola.put(numerado, timeout=self.espera)
+            return True
+        except queue.Full:
+            # Cola llena: el que llama absorbe la escritura (contrapresión)
+            logger.warning("⚠️ %s: cola llena, escribiendo de forma síncrona", self.nombre)
+            with self._lock:
+                self._escribir_lote([numerado])
+            with self._cond:
+                self._stats['sincronos'] += 1
+            return False
+
+    def vaciar(self, timeout=5.0):
+        """Escribir ya lo encolado hasta ahora; devuelve True si quedó todo escrito
+
+        Los registros que llegan durante la espera no la alargan: con tráfico
+        constante la cola nunca llega a cero.
+        """
+        with self._cond:
+            hasta = self._secuencia
+
+        with self._lock:
+            self._escribir_lote(self._sacar_todos())
+
+        # Un lote en curso del hilo puede seguir escribiéndose: esperarlo
+        with self._cond:
+            return self._cond.wait_for(lambda: self._primera_sin_escribir() > hasta, timeout)
+
+    def cerrar(self, timeout=5.0):
+        """Detener el hilo y escribir lo pendiente (se llama también en atexit)"""
+        if self._pid != os.getpid():
+            return
+        self._detener.set()
+        if self._hilo is not None and self._hilo.is_alive():
+            try:
+                self._cola.put_nowait(_FIN)
+            except queue.Full:
+                pass
+            self._hilo.join(timeout)
+        if not self.vaciar(timeout):
+            logger.warning("⚠️ %s: %s registros sin escribir al cerrar", self.nombre, self._pendientes)
+
+    def stats(self):
+        with self._cond:
+            return dict(self._stats, en_cola=self._pendientes)
+
+    # === INTERNOS ===
+
+    def _primera_sin_escribir(self):
+        """Secuencia más baja aún sin escribir (infinito si no hay; llamar con ``_cond``)"""
+        while self._en_curso and self._en_curso[0] in self._terminadas:
+            self._terminadas.discard(heapq.heappop(self._en_curso))
+        return self._en_curso[0] if self._en_curso else float('inf')
+
+    def _sacar_todos(self):
+        registros = []
+        while True:
+            try:
+                registro = self._cola.get_nowait()
+            except queue.Empty:
+                break
+            if registro is not _FIN:
+                registros.append(registro)
+        return registros
+
+    def _ejecutar(self):
+        while not self._detener.is_set():
+            try:
+                primero = self._cola.get(timeout=self.intervalo)
+            except queue.Empty:
+                continue
+            if primero is _FIN:
+                break
+
+            # Acumular hasta llenar el lote o agotar el intervalo
+            lote = [primero]
+            limite = time.monotonic() + self.intervalo
+            while len(lote) < self.max_lote and not self._detener.is_set():
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    break
+                try:
+                    registro = self._cola.get(timeout=restante)
+                except queue.Empty:
+                    break
+                if registro is _FIN:
+                    break
+                lote.append(registro)
+
+            with self._lock:
+                self._escribir_lote(lote)
+
+    def _escribir_lote(self, numerados):
+        """Escribir un lote de ``(secuencia, registro)`` con reintentos (llamar con ``_lock``)"""
+        if not numerados:
+            return
+        registros = [registro for _, registro in numerados]
+
+        for intento in range(1, self.reintentos + 1):
+            try:
+                self._escribir(registros)
+                with self._cond:
+                    self._stats['escritos'] += len(registros)
+                    self._stats['lotes'] += 1
+                break
+            except Exception as e:
+                logger.error("❌ %s: error escribiendo %s registros (intento %s): %s", self.nombre, len(registros), intento, e)
+                with self._cond:
+                    self._stats['errores'] += 1
+                if intento < self.reintentos:
+                    time.sleep(min(0.1 * 2 ** intento, 2.0))
+        else:
+            with self._cond:
+                self._stats['descartados'] += len(registros)
+
+        with self._cond:
+            self._pendientes -= len(registros)
+            self._terminadas.update(secuencia for secuencia, _ in numerados)
+            self._primera_sin_escribir()  # podar el heap
+            self._cond.notify_all()
@@ -2,8 +2,10 @@ module.exports = {
   apps: [
     {
       name: "flask-universidad",
-      script: "app.py",
-      interpreter: "python",
+      // gunicorn hace el prefork de los workers; PM2 sólo vigila al maestro
+      script: "gunicorn",
+      args: "-c gunicorn.conf.py wsgi:app",
+      interpreter: "none",
       watch: false
     }
   ]
@@ -0,0 +1,96 @@
+"""Configuración de gunicorn: gunicorn -c gunicorn.conf.py wsgi:app
+
+Todo se puede ajustar por variables de entorno sin tocar el archivo:
+PORT, WEB_CONCURRENCY, GUNICORN_MAX_WORKERS, GUNICORN_THREADS, GUNICORN_TIMEOUT,
+GUNICORN_PRELOAD, GUNICORN_MAX_REQUESTS, EXPORTS_PRELOAD.
+"""
+import os
+import math
+import tempfile
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+
+
+def _nucleos():
+    """Núcleos disponibles para este proceso (no los del host, como cuenta cpu_count())
+
+    Respeta el cpuset (sched_getaffinity) y la cuota de CPU del contenedor (cgroup v2).
+    """
+    try:
+        nucleos = len(os.sched_getaffinity(0))
+    except AttributeError:
+        nucleos = os.cpu_count() or 1
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as archivo:
+            cuota, periodo = archivo.read().split()
+        if cuota != 'max':
+            nucleos = min(nucleos, max(1, math.ceil(int(cuota) / int(periodo))))
+    except (OSError, ValueError):
+        pass
+    return nucleos
+
+
+# Procesos: (2 x núcleos) + 1, la recomendación de gunicorn para cargas con E/S,
+# con tope GUNICORN_MAX_WORKERS (WEB_CONCURRENCY fija el número sin tope)
+workers = int(os.getenv('WEB_CONCURRENCY') or min(_nucleos() * 2 + 1, int(os.getenv('GUNICORN_MAX_WORKERS', 8))))
+
+# Hilos por worker: las peticiones pasan casi todo el tiempo esperando a Neon.
+# Mantener DB_POOL_MAX >= threads para que ningún hilo espere conexión.
+# Conexiones a Neon por instancia: workers x (DB_POOL_MAX + 1), el +1 es la conexión
+# directa de LISTEN (CACHE_NOTIFY); con los valores por defecto, 8 x (10 + 1) = 88.
+# Las directas cuentan contra max_connections del compute: ajustar WEB_CONCURRENCY
+# o DB_POOL_MAX para que (instancias x ese total) quede por debajo del límite.
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+
+# Importar la app en el maestro antes del fork (memoria compartida por copy-on-write);
+# openpyxl/reportlab se cargan al primer reporte salvo con EXPORTS_PRELOAD=1
+preload_app = os.getenv('GUNICORN_PRELOAD', '1') != '0'
+
+# /descargar/*?esperar=1 puede esperar un reporte hasta REPORT_WAIT segundos
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 120))
+graceful_timeout = 30
+keepalive = 5
+
+# Reciclar workers de vez en cuando (con preload el fork es barato)
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = max_requests // 10
+
+# Métricas de Prometheus de todos los workers en un directorio compartido (config/metrics.py).
+# Si se define a mano, el directorio debe estar vacío al arrancar.
+if not os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+    os.environ['PROMETHEUS_MULTIPROC_DIR'] = tempfile.mkdtemp(prefix='chatbot-metrics-')
+
+# El log de acceso lo escribe la app (JSON con request id y duración, config/logs.py)
+accesslog = os.getenv('GUNICORN_ACCESSLOG')
+errorlog = '-'
+
+
+def when_ready(server):
+    """EXPORTS_PRELOAD=1: importar openpyxl/reportlab en el maestro para compartirlos entre workers
+
+    Por defecto se importan en cada worker al generar su primer reporte:
+    arranque más rápido y menos memoria en workers que no exportan.
+    """
+    if os.getenv('EXPORTS_PRELOAD', '0') == '1':
+        from config.exports import precargar
+        precargar()
+
+
+def post_worker_init(worker):
+    """Ya en el worker (después del fork): pool de conexiones e hilo de LISTEN propios"""
+    from app import db, logger
+    db.iniciar_worker()
+    logger.info("🚀 Worker %s listo (%s hilos)", worker.pid, threads)
+
+
+def worker_exit(server, worker):
+    """Escribir los mensajes de chat pendientes antes de que el worker termine"""
+    from app import db
+    db.mensajes.cerrar()
+
+
+def child_exit(server, worker):
+    """Quitar los gauges del worker muerto de la suma de /metrics"""
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
@@ -1,29 +1,33 @@
 module.exports = {
   apps: [{
     name: 'chatbot-universitario',
-    script: 'app.py',
-    interpreter: 'python3',
-    instances: 'max', // Usar todos los cores disponibles
-    exec_mode: 'cluster', // Modo cluster para mejor rendimiento
+    // gunicorn reparte la carga entre núcleos (WEB_CONCURRENCY workers con preload);
+    // el modo cluster de PM2 sólo funciona con Node, así que aquí va una sola instancia
+    script: 'gunicorn',
+    args: '-c gunicorn.conf.py wsgi:app',
+    interpreter: 'none',
+    instances: 1,
+    exec_mode: 'fork',
     autorestart: true,
     watch: false,
     max_memory_restart: '500M',
     env: {
       NODE_ENV: 'development',
       FLASK_ENV: 'development',
-      PORT: 5000
+      PORT: 5000,
+      PYTHONUNBUFFERED: '1'
     },
     env_production: {
       NODE_ENV: 'production',
       FLASK_ENV: 'production',
-      PORT: 5000
+      PORT: 5000,
+      PYTHONUNBUFFERED: '1'
     },
     error_file: './logs/err.log',
     out_file: './logs/out.log',
     log_file: './logs/combined.log',
     time: true,
     // Configuración específica para Python/Flask
-    interpreter_args: '-u',
     merge_logs: true,
     log_date_format: 'YYYY-MM-DD HH:mm Z',
     // Health check configuration
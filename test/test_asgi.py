@@ -0,0 +1,95 @@
+import sys
+import os
+import asyncio
+
+# Agregar el directorio raíz al path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+
+pytest.importorskip('starlette')
+pytest.importorskip('asyncpg')
+pytest.importorskip('httpx')
+
+from starlette.testclient import TestClient
+
+import asgi
+
+ESTUDIANTES = [
+    {'matricula': f'A{i}', 'nombre': 'Ana', 'apellido': 'Pérez', 'carrera': 'Sistemas',
+     'semestre': 1, 'inscripcion_pagada': False}
+    for i in range(3)
+]
+
+
+@pytest.fixture
+def cliente(monkeypatch):
+    consultas = []
+
+    async def fetch(query, *args):
+        consultas.append((query, args))
+        if 'resumen_carreras' in query:
+            return [{'carrera': 'Sistemas', 'cantidad': 3, 'pagados': 1, 'pendientes': 2}]
+        return ESTUDIANTES
+
+    monkeypatch.setattr(asgi.adb, 'fetch', fetch)
+    asgi.db.cache.invalidate()
+    asgi.db.respuestas.invalidate()
+    # Sin lifespan: no se abre el pool de asyncpg ni el hilo de LISTEN
+    cliente = TestClient(asgi.application)
+    cliente.consultas = consultas
+    return cliente
+
+
+def test_chat_asincrono_usa_los_mismos_textos(cliente):
+    datos = cliente.post('/chat', json={'message': 'estadísticas'}).json()
+    assert datos['success'] is True
+    assert datos['estadisticas']['total_estudiantes'] == 3
+    assert 'Total de estudiantes:** 3' in datos['bot_response']
+
+
+def test_paginacion_asincrona(cliente):
+    datos = cliente.get('/api/universidad/estudiantes/todos?limit=2&pagado=no').json()
+    assert datos['total'] == 2 and datos['hay_mas'] is True
+    assert cliente.consultas[-1][1] == (False, 3)
+
+    assert cliente.get('/api/universidad/estudiantes/todos?cursor=zz').status_code == 400
+    assert cliente.get('/api/universidad/estudiantes/todos?pagado=quizas').status_code == 400
+
+
+def test_rutas_no_asincronas_las_atiende_flask(cliente):
+    assert cliente.get('/api/cache/stats').json()['success'] is True
+
+
+def test_chat_asincrono_cuantos_estudiantes(cliente):
+    datos = cliente.post('/chat', json={'message': 'cuántos estudiantes hay'}).json()
+    assert datos['intent'] == 'estudiantes_total'
+    assert datos['estadisticas']['total_estudiantes'] == 3
+
+
+def test_operaciones_bloqueantes_fuera_del_bucle(cliente, monkeypatch):
+    """Con una caché de red y WRITE_BEHIND=0 nada bloquea el hilo del bucle de eventos"""
+    en_bucle = {}
+
+    def dentro_del_bucle():
+        try:
+            asyncio.get_running_loop()
+            return True
+        except RuntimeError:
+            return False
+
+    class CacheRed(type(asgi.db.historial)):
+        bloqueante = True
+
+        def get(self, session_id, limit):
+            en_bucle['historial'] = dentro_del_bucle()
+            return []
+
+    monkeypatch.setattr(asgi.db, 'historial', CacheRed())
+    monkeypatch.setattr(asgi.db, 'save_conversation',
+                        lambda **kwargs: en_bucle.setdefault('guardar', dentro_del_bucle()))
+
+    cliente.post('/chat', json={'message': 'hola', 'session_id': 's1'})
+    cliente.get('/history?session_id=s1')
+
+    assert en_bucle == {'guardar': False, 'historial': False}
@@ -0,0 +1,56 @@
+import sys
+import os
+import threading
+
+# Agregar el directorio raíz al path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from werkzeug.serving import make_server
+
+import app as app_module
+from bench import datos, run
+from bench.fake_db import FakeNeonDatabase
+
+
+def test_datos_sinteticos_en_orden_de_paginacion():
+    """El índice de cada estudiante respeta ORDER BY carrera, nombre, apellido, matricula"""
+    estudiantes = datos.Estudiantes(500)
+    claves = [estudiantes.clave(i) for i in range(len(estudiantes))]
+
+    assert claves == sorted(claves)
+    assert datos.escala('100k') == 100_000
+    assert sum(fila['cantidad'] for fila in datos.resumen_carreras(estudiantes)) == 500
+
+
+def test_fake_db_pagina_todos_los_estudiantes():
+    db = FakeNeonDatabase(450, latencia=0)
+    vistos, cursor = [], None
+    while True:
+        pagina = db.get_estudiantes_pagina(cursor=cursor, limite=100)
+        vistos += [e['matricula'] for e in pagina['estudiantes']]
+        cursor = pagina['siguiente']
+        if not cursor:
+            break
+
+    assert len(vistos) == len(set(vistos)) == 450
+    assert list(db.iterar_estudiantes_pendientes()) == db.get_estudiantes_pendientes_inscripcion()
+
+
+def test_benchmark_reporta_percentiles(monkeypatch):
+    monkeypatch.setattr(app_module, 'db', FakeNeonDatabase(200, latencia=0))
+    servidor = make_server('127.0.0.1', 0, app_module.app, threaded=True)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    try:
+        url = f'http://127.0.0.1:{servidor.server_port}'
+        resultados = [run.correr_escenario(url, nombre, 12, 3, datos.sesiones(200))
+                      for nombre in ('chat', 'history', 'todos', 'por_carrera')]
+    finally:
+        servidor.shutdown()
+
+    for resultado in resultados:
+        assert resultado['peticiones'] == 12
+        assert resultado['errores'] == 0
+        assert resultado['p50_ms'] <= resultado['p95_ms'] <= resultado['p99_ms'] <= resultado['max_ms']
+
+    base = {'resultados': [dict(resultados[0], p95_ms=resultados[0]['p95_ms'] / 10)]}
+    assert run.comparar(resultados, base, 0.2)
@@ -0,0 +1,128 @@
+import sys
+import os
+from contextlib import contextmanager
+
+# Agregar el directorio raíz al path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import psycopg2
+import pytest
+
+import app as app_module
+from config import busqueda
+
+
+def estudiante(i):
+    return {'matricula': f'A{i:03d}', 'nombre': 'Juan', 'apellido': 'Pérez', 'carrera': 'Sistemas',
+            'semestre': 3, 'inscripcion_pagada': True, 'puntaje': 0.9}
+
+
+def usar_consultas(monkeypatch, responder):
+    """Conexiones falsas: ``responder(sql, params)`` devuelve las filas o lanza"""
+    consultas = []
+
+    class CursorFalso:
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *args):
+            pass
+
+        def execute(self, sql, params=None):
+            consultas.append((sql, params))
+            self.filas = responder(sql, params)
+
+        def fetchall(self):
+            return self.filas
+
+    class ConexionFalsa:
+        def cursor(self):
+            return CursorFalso()
+
+    @contextmanager
+    def connection():
+        yield ConexionFalsa()
+
+    monkeypatch.setattr(app_module.db, 'connection', connection)
+    monkeypatch.setattr(app_module.db, '_busqueda_sin_indice_hasta', 0.0)
+    return consultas
+
+
+def test_termino_y_prefijo():
+    assert busqueda.termino('  Pérez López? ') == 'perez lopez'
+    assert busqueda.termino('a') is None
+    assert busqueda.rango_prefijo('jua') == ('jua', 'jub')
+    assert busqueda.patron_like('100%_x', prefijo=True) == '100\\%\\_x%'
+    assert busqueda.es_matricula('a0001234') and not busqueda.es_matricula('juan')
+
+
+def test_extraer_termino_chat():
+    assert busqueda.extraer_termino_chat('busca a juan perez') == 'juan perez'
+    assert busqueda.extraer_termino_chat('buscame al alumno jose nunez') == 'jose nunez'
+    assert busqueda.extraer_termino_chat('busca') is None
+
+
+def test_buscar_pagina_por_similitud(monkeypatch):
+    consultas = usar_consultas(monkeypatch, lambda sql, params: [estudiante(i) for i in range(3)])
+    client = app_module.app.test_client()
+
+    data = client.get('/api/universidad/estudiantes/buscar?q=Juan%20P%C3%A9rez&limit=2&offset=4').get_json()
+
+    assert data['success'] and data['hay_mas'] and data['siguiente'] == 6
+    assert len(data['estudiantes']) == 2
+    sql, params = consultas[0]
+    assert '<<->' in sql
+    assert params == ('juan perez', 'juan perez', 'juan perez', 3, 4)
+
+    assert client.get('/api/universidad/estudiantes/buscar?q=j').status_code == 400
+
+
+def test_busqueda_sin_migraciones_usa_ilike(monkeypatch):
+    def responder(sql, params):
+        if 'chatbot_normalizar' in sql:
+            raise psycopg2.errors.UndefinedFunction()
+        return [estudiante(1)]
+
+    consultas = usar_consultas(monkeypatch, responder)
+
+    assert app_module.db.autocompletar_estudiantes('Pér', 5) == [estudiante(1)]
+    assert consultas[-1][1] == ('per%', 'per%', 5)
+
+    # Mientras dura la espera se va directo a ILIKE; después se vuelve a probar el índice
+    hechas = len(consultas)
+    app_module.db.autocompletar_estudiantes('Pér', 5)
+    assert len(consultas) == hechas + 1
+    monkeypatch.setattr(app_module.db, '_busqueda_sin_indice_hasta', 0.0)
+    app_module.db.autocompletar_estudiantes('Pér', 5)
+    assert 'chatbot_normalizar' in consultas[hechas + 1][0]
+
+
+def test_chat_busca_estudiante(monkeypatch):
+    buscados = []
+
+    def buscar_estudiantes(texto, limite=20, desplazamiento=0):
+        buscados.append(texto)
+        return {'estudiantes': [estudiante(7)], 'siguiente': None}
+
+    monkeypatch.setattr(app_module.db, 'buscar_estudiantes', buscar_estudiantes)
+    monkeypatch.setattr(app_module.db, 'cache_respuestas', False)
+    monkeypatch.setattr(app_module.db, 'save_conversation', lambda **kwargs: True)
+
+    client = app_module.app.test_client()
+    data = client.post('/chat', json={'message': 'Busca a Juan Pérez'}).get_json()
+
+    assert buscados == ['juan perez']
+    assert data['intent'] == 'busqueda_estudiante'
+    assert data['estudiantes'][0]['matricula'] == 'A007'
+
+
+def test_donde_se_encuentra_no_es_busqueda(monkeypatch):
+    """'encuentra' sin nombre ni estudiante queda para common_intents"""
+    db = app_module.db
+    monkeypatch.setattr(db, 'buscar_estudiantes', lambda *args, **kwargs: pytest.fail("no es una búsqueda"))
+    monkeypatch.setattr(db.indice_intenciones, 'buscar',
+                        lambda texto: ('location', 'Estamos en Juárez') if 'donde se encuentra' in texto else None)
+    monkeypatch.setattr(db, 'cache_respuestas', False)
+
+    assert db.clasificador.classify('¿Dónde se encuentra la universidad?').intent is None
+    assert db.procesar_mensaje('¿Dónde se encuentra la universidad?')[:2] == ('Estamos en Juárez', 'location')
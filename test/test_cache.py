@@ -0,0 +1,171 @@
+import sys
+import os
+import time
+
+# Agregar el directorio raíz al path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+
+from config.cache import TTLCache, HistoryCache, RedisCache, RedisHistoryCache, crear_cache
+
+
+def test_get_or_set_llama_al_loader_una_vez():
+    """El segundo acceso sale de la caché"""
+    cache = TTLCache(default_ttl=60)
+    llamadas = []
+
+    def loader():
+        llamadas.append(1)
+        return {'total_estudiantes': 10}
+
+    assert cache.get_or_set('estadisticas', loader) == {'total_estudiantes': 10}
+    assert cache.get_or_set('estadisticas', loader) == {'total_estudiantes': 10}
+    assert len(llamadas) == 1
+    assert cache.stats()['hits'] == 1
+
+
+def test_expiracion_e_invalidacion():
+    """Las entradas expiran con el TTL y se pueden invalidar explícitamente"""
+    cache = TTLCache(default_ttl=60)
+    cache.set('a', 1, ttl=0.01)
+    cache.set('b', 2)
+    time.sleep(0.02)
+    assert cache.get('a') is None
+    cache.invalidate('b')
+    assert cache.get('b') is None
+
+
+def test_no_cachea_resultados_vacios():
+    """Un error de BD ({}) no queda fijado durante el TTL"""
+    cache = TTLCache()
+    cache.get_or_set('estadisticas', dict)
+    assert cache.stats()['entradas'] == 0
+
+
+def test_lru_respeta_tamano_maximo():
+    """Al superar maxsize se descarta la entrada menos usada"""
+    cache = TTLCache(maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+
+
+def test_historial_anillo_y_lru():
+    historial = HistoryCache(maxsesiones=2, maxlen=3)
+    assert historial.get('a', 3) is None
+
+    historial.set('a', [1, 2])
+    historial.append('a', 3)
+    historial.append('a', 4)
+    assert historial.get('a', 3) == [2, 3, 4]
+    assert historial.get('a', 2) == [3, 4]
+    # Más de lo que cabe en el anillo: hay que ir a la BD
+    assert historial.get('a', 10) is None
+
+    # Sesiones no cacheadas no se crean al agregar
+    historial.append('b', 1)
+    assert historial.get('b', 1) is None
+
+    historial.set('b', [])
+    historial.get('a', 1)
+    historial.set('c', [])
+    assert historial.get('b', 1) is None
+    assert historial.get('a', 1) == [4]
+
+
+def test_invalidar_por_etiqueta():
+    cache = TTLCache()
+    cache.set('a', 1, tags=('estudiantes',))
+    cache.set('b', 2, tags=('carreras', 'estudiantes'))
+    cache.set('c', 3, tags=('carreras',))
+
+    assert cache.invalidate_tag('estudiantes') == 2
+    assert cache.get('a') is None and cache.get('b') is None
+    assert cache.get('c') == 3
+
+
+def test_backend_por_defecto_en_memoria(monkeypatch):
+    monkeypatch.delenv('CACHE_BACKEND', raising=False)
+    assert isinstance(crear_cache('prueba'), TTLCache)
+
+
+def test_redis_compartido_entre_instancias():
+    """Dos workers (dos instancias) ven los mismos valores e invalidaciones"""
+    fakeredis = pytest.importorskip('fakeredis')
+    import config.cache as cache_module
+
+    cache_module._clientes['redis://prueba'] = fakeredis.FakeRedis()
+    worker_a = RedisCache('redis://prueba', 'chatbot:prueba')
+    worker_b = RedisCache('redis://prueba', 'chatbot:prueba')
+
+    assert worker_a.get_or_set(('hola', 'greeting'), lambda: 'respuesta', tags=('common_intents',)) == 'respuesta'
+    assert worker_b.get_or_set(('hola', 'greeting'), lambda: 'otra') == 'respuesta'
+
+    assert worker_b.invalidate_tag('common_intents') == 1
+    assert worker_a.get(('hola', 'greeting')) is None
+
+
+def test_redis_caido_es_un_miss():
+    pytest.importorskip('redis')
+    cache = RedisCache('redis://localhost:1/0', 'chatbot:caido')
+    assert cache.get_or_set('k', lambda: 5) == 5
+    assert cache.stats()['errores'] == 1
+
+
+def test_historial_redis_compartido_entre_instancias():
+    """Un mensaje guardado por un worker se ve en el otro, aunque llegue durante su lectura de la BD"""
+    fakeredis = pytest.importorskip('fakeredis')
+    import config.cache as cache_module
+
+    cache_module._clientes['redis://historial'] = fakeredis.FakeRedis()
+    worker_a = RedisHistoryCache('redis://historial', 'chatbot:historial')
+    worker_b = RedisHistoryCache('redis://historial', 'chatbot:historial')
+
+    worker_a.set('s1', [1])
+    worker_b.append('s1', 2)
+    assert worker_a.get('s1', 10) == [1, 2]
+
+    # B lee la BD (sin el mensaje 3) mientras A lo guarda: no se cachea la lectura vieja
+    marca = worker_b.marca('s2')
+    worker_a.append('s2', 3)
+    worker_b.set('s2', [], marca)
+    assert worker_a.get('s2', 10) is None
+
+
+def test_redis_respeta_tamano_maximo():
+    """Con maxsize el backend Redis recorta las claves menos usadas, igual que TTLCache"""
+    fakeredis = pytest.importorskip('fakeredis')
+    import config.cache as cache_module
+
+    cache_module._clientes['redis://lru'] = fakeredis.FakeRedis()
+    worker_a = RedisCache('redis://lru', 'chatbot:lru', maxsize=2)
+    worker_b = RedisCache('redis://lru', 'chatbot:lru', maxsize=2)
+
+    worker_a.set('a', 1)
+    worker_b.set('b', 2)
+    worker_a.get('a')
+    worker_b.set('c', 3)
+    assert worker_a.get('b') is None
+    assert worker_b.get('a') == 1
+    assert cache_module._clientes['redis://lru'].zcard('chatbot:lru:##lru') == 2
+
+
+def test_redis_etiqueta_no_vence_antes_que_sus_claves():
+    """Una clave de TTL corto no acorta la vida del conjunto de la etiqueta que comparte con otra larga"""
+    fakeredis = pytest.importorskip('fakeredis')
+    import config.cache as cache_module
+
+    servidor = cache_module._clientes['redis://etiquetas'] = fakeredis.FakeRedis()
+    cache = RedisCache('redis://etiquetas', 'chatbot:etiquetas', maxsize=10)
+
+    cache.set('larga', 1, ttl=600, tags=('estudiantes',))
+    cache.set('corta', 2, ttl=5, tags=('estudiantes',))
+    assert servidor.ttl('chatbot:etiquetas:#estudiantes') > 600
+    assert servidor.ttl('chatbot:etiquetas:##lru') > 600
+
+    assert cache.invalidate_tag('estudiantes') == 2
+    assert cache.get('larga') is None
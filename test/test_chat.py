@@ -0,0 +1,105 @@
+import sys
+import os
+
+# Agregar el directorio raíz al path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import app as app_module
+
+
+def test_chat_consulta_una_sola_vez(monkeypatch):
+    """/chat usa los datos del manejador de la intención sin repetir consultas"""
+    estadisticas = {'total_estudiantes': 3, 'inscritos_pagados': 2,
+                    'pendientes_inscripcion': 1, 'por_carrera': []}
+    consultas = []
+
+    def procesar_mensaje(mensaje):
+        consultas.append(mensaje)
+        return "📊 Estadísticas", "estadisticas_universidad", 0.9, {'estadisticas': estadisticas}
+
+    def no_consultar(*args, **kwargs):
+        raise AssertionError("/chat no debe volver a consultar la BD")
+
+    monkeypatch.setattr(app_module.db, 'procesar_mensaje', procesar_mensaje)
+    monkeypatch.setattr(app_module.db, 'get_estadisticas_estudiantes', no_consultar)
+    monkeypatch.setattr(app_module.db, 'save_conversation', lambda **kwargs: True)
+
+    client = app_module.app.test_client()
+    data = client.post('/chat', json={'message': 'cuantos estudiantes en total', 'session_id': 's1'}).get_json()
+
+    assert data['success']
+    assert data['intent'] == 'estadisticas_universidad'
+    assert data['estadisticas'] == estadisticas
+    assert consultas == ['cuantos estudiantes en total']
+
+
+def test_respuestas_cacheadas_hasta_invalidar(monkeypatch):
+    """La misma pregunta se responde desde la caché hasta que cambia su tabla"""
+    db = app_module.db
+    llamadas = []
+
+    def get_carreras():
+        llamadas.append(1)
+        return [{'codigo': 'ISC', 'nombre': 'Ingeniería en Sistemas',
+                 'duracion_semestres': 9, 'costo_inscripcion': 1500}]
+
+    monkeypatch.setattr(db, 'get_carreras', get_carreras)
+    db.respuestas.invalidate()
+
+    primera = db.procesar_mensaje('¿Qué carreras hay?')
+    assert db.procesar_mensaje('¿qué  CARRERAS hay?') == primera
+    assert len(llamadas) == 1
+
+    db.invalidar_datos('estudiantes')
+    db.procesar_mensaje('¿Qué carreras hay?')
+    assert len(llamadas) == 1
+
+    db.invalidar_datos('carreras')
+    db.procesar_mensaje('¿Qué carreras hay?')
+    assert len(llamadas) == 2
+
+
+def test_no_cachea_datos_vacios(monkeypatch):
+    db = app_module.db
+    monkeypatch.setattr(db, 'get_carreras', lambda: [])
+    db.respuestas.invalidate()
+
+    db.procesar_mensaje('carreras')
+    assert db.respuestas.stats()['entradas'] == 0
+
+
+def test_health_distingue_bd_caida(monkeypatch):
+    """/health siempre responde 200; el estado refleja si la BD contesta"""
+    client = app_module.app.test_client()
+
+    monkeypatch.setattr(app_module.db, 'ping', lambda: True)
+    assert client.get('/health').get_json()['status'] == 'healthy'
+
+    monkeypatch.setattr(app_module.db, 'ping', lambda: False)
+    datos = client.get('/health').get_json()
+    assert datos['status'] == 'degraded'
+    assert datos['pid'] == os.getpid()
+
+
+def test_chat_preguntas_de_estudiantes(monkeypatch):
+    """'estudiantes' gana la prioridad, pero cuántos/pendientes devuelven sus datos"""
+    db = app_module.db
+    estadisticas = {'total_estudiantes': 3, 'inscritos_pagados': 2,
+                    'pendientes_inscripcion': 1, 'por_carrera': []}
+    pendiente = {'matricula': 'A001', 'nombre': 'Ana', 'apellido': 'Pérez', 'carrera': 'Sistemas',
+                 'semestre': 1, 'fecha_inscripcion': '2025-08-01'}
+
+    monkeypatch.setattr(db, 'get_estadisticas_estudiantes', lambda: estadisticas)
+    monkeypatch.setattr(db, 'get_carreras', lambda: [])
+    monkeypatch.setattr(db, 'get_estudiantes_pagina', lambda *args, **kwargs: {'estudiantes': [pendiente], 'siguiente': None})
+    monkeypatch.setattr(db, 'cache_respuestas', False)
+    monkeypatch.setattr(db, 'save_conversation', lambda **kwargs: True)
+    client = app_module.app.test_client()
+
+    for mensaje in ('cuántos estudiantes hay', 'cuantos alumnos hay'):
+        data = client.post('/chat', json={'message': mensaje}).get_json()
+        assert data['intent'] == 'estudiantes_total' and data['estadisticas'] == estadisticas
+
+    for mensaje in ('estudiantes pendientes', 'alumnos que deben inscripción'):
+        data = client.post('/chat', json={'message': mensaje}).get_json()
+        assert data['intent'] == 'inscripciones_pendientes' and data['estudiantes'] == [pendiente]
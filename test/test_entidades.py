@@ -0,0 +1,67 @@
+import sys
+import os
+
+# Agregar el directorio raíz al path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import app as app_module
+from config.entidades import extraer_entidades, describir
+from config.intents import normalizar
+from config.queries import CONSULTAS, a_posicionales, nombre_pagina
+
+CARRERAS = [
+    {'codigo': 'CON', 'nombre': 'Contaduría Pública'},
+    {'codigo': 'ISC', 'nombre': 'Ingeniería en Sistemas Computacionales'},
+    {'codigo': 'IND', 'nombre': 'Ingeniería Industrial'},
+    {'codigo': 'MED', 'nombre': 'Medicina'},
+]
+
+
+def extraer(texto):
+    return extraer_entidades(normalizar(texto), CARRERAS)
+
+
+def test_extrae_carrera_semestre_y_matricula():
+    entidades = extraer('Pendientes de Sistemas semestre 3')
+    assert (entidades.carrera, entidades.semestre, entidades.matricula) == \
+        ('Ingeniería en Sistemas Computacionales', 3, None)
+    assert describir(entidades) == ' de Ingeniería en Sistemas Computacionales, semestre 3, con pago pendiente'
+
+    assert extraer('alumnos del tercer semestre de MED').carrera == 'Medicina'
+    assert extraer('alumnos del 5to semestre').semestre == 5
+    assert extraer('alumno A0001234').matricula == 'A0001234'
+    assert extraer('alumnos que no han pagado').pagado is False
+    assert extraer('alumnos pagados de medicina').pagado is True
+
+
+def test_sin_entidades_ambiguas():
+    # "ingenieria" es de dos carreras, "con" no es el código de Contaduría, 2024 no es matrícula
+    entidades = extraer('estudiantes de ingeniería con pago pendiente en 2024, semestre 20')
+    assert entidades == (None, None, None, False)
+
+
+def test_variantes_con_semestre_registradas():
+    sql, parametros = a_posicionales(CONSULTAS[nombre_pagina(True, True, True, True)])
+    assert 'semestre = $3' in sql and parametros == 8
+
+
+def test_chat_pendientes_filtra_en_sql(monkeypatch):
+    paginas = []
+
+    def get_estudiantes_pagina(carrera=None, pagado=None, cursor=None, limite=200, semestre=None):
+        paginas.append((carrera, pagado, semestre, limite))
+        estudiante = {'matricula': 'A0000001', 'nombre': 'Ana', 'apellido': 'Pérez', 'carrera': carrera,
+                      'semestre': semestre, 'fecha_inscripcion': '2025-08-01'}
+        return {'estudiantes': [estudiante] * limite, 'siguiente': 'token'}
+
+    monkeypatch.setattr(app_module.db, 'get_carreras', lambda: CARRERAS)
+    monkeypatch.setattr(app_module.db, 'get_estudiantes_pagina', get_estudiantes_pagina)
+    monkeypatch.setattr(app_module.db, 'cache_respuestas', False)
+
+    # El segundo mensaje se clasifica como 'estudiantes' pero conserva el filtro de pago
+    for mensaje in ('pendientes de sistemas semestre 3', 'alumnos pendientes de sistemas semestre 3'):
+        respuesta, intent, _, datos = app_module.db.procesar_mensaje(mensaje)
+
+        assert paginas.pop() == ('Ingeniería en Sistemas Computacionales', False, 3, 10)
+        assert intent == 'inscripciones_pendientes' and len(datos['estudiantes']) == 10
+        assert 'semestre 3' in respuesta and '10+' in respuesta
@@ -0,0 +1,43 @@
+import sys
+import os
+
+# Agregar el directorio raíz al path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import psycopg2
+
+import app as app_module
+
+FILAS = [
+    {'carrera': 'Contaduría', 'cantidad': 2, 'pagados': 1, 'pendientes': 1},
+    {'carrera': 'Sistemas', 'cantidad': 5, 'pagados': 4, 'pendientes': 1},
+]
+
+
+def no_agregar():
+    raise AssertionError('no debe agregar sobre estudiantes')
+
+
+def test_estadisticas_desde_resumen(monkeypatch):
+    db = app_module.db
+    monkeypatch.setattr(db, '_leer_resumen_carreras', lambda: FILAS)
+    monkeypatch.setattr(db, '_agregar_por_carrera', no_agregar)
+
+    estadisticas = db._consultar_estadisticas()
+
+    assert estadisticas['total_estudiantes'] == 7
+    assert estadisticas['inscritos_pagados'] == 5
+    assert estadisticas['pendientes_inscripcion'] == 2
+    assert [c['carrera'] for c in estadisticas['por_carrera']] == ['Sistemas', 'Contaduría']
+
+
+def test_sin_resumen_agrega_sobre_estudiantes(monkeypatch):
+    db = app_module.db
+
+    def sin_tabla():
+        raise psycopg2.errors.UndefinedTable('relation "resumen_carreras" does not exist')
+
+    monkeypatch.setattr(db, '_leer_resumen_carreras', sin_tabla)
+    monkeypatch.setattr(db, '_agregar_por_carrera', lambda: FILAS)
+
+    assert db._consultar_estadisticas()['total_estudiantes'] == 7
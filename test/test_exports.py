@@ -0,0 +1,80 @@
+import sys
+import os
+import json
+import tempfile
+from datetime import date
+
+# Agregar el directorio raíz al path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from openpyxl import load_workbook
+from config.exports import escribir_excel, iterar_archivo, iterar_ndjson, COLUMNAS_ESTUDIANTES
+
+
+def generar_estudiantes(n):
+    for i in range(n):
+        yield {
+            'matricula': f'A{i:05d}', 'nombre': 'Ana', 'apellido': 'Pérez',
+            'carrera': 'Ingeniería en Sistemas', 'semestre': 3,
+            'fecha_inscripcion': date(2024, 1, 15), 'inscripcion_pagada': i % 2 == 0,
+            'email': 'ana@ejemplo.com', 'telefono': 'No especificado'
+        }
+
+
+def test_escribir_excel_por_streaming():
+    """Todas las filas llegan al XLSX aunque excedan la muestra para anchos"""
+    archivo = tempfile.TemporaryFile()
+    total = escribir_excel(generar_estudiantes(25), COLUMNAS_ESTUDIANTES, 'Estudiantes', archivo, muestra=10)
+    assert total == 25
+
+    contenido = b''.join(iterar_archivo(archivo))
+    assert archivo.closed
+
+    with tempfile.TemporaryFile() as copia:
+        copia.write(contenido)
+        ws = load_workbook(copia)['Estudiantes']
+        assert ws.max_row == 26
+        assert ws['A1'].value == 'Matrícula'
+        assert ws['F2'].value == '✅ PAGADO'
+        assert ws.column_dimensions['C'].width == len('Ingeniería en Sistemas') + 2
+
+
+def test_escribir_excel_sin_filas():
+    archivo = tempfile.TemporaryFile()
+    assert escribir_excel(iter([]), COLUMNAS_ESTUDIANTES, 'Estudiantes', archivo) == 0
+    archivo.close()
+
+
+def test_escribir_pdf_por_bloques():
+    """El PDF incluye a todos los estudiantes aunque ocupen varias tablas"""
+    from config.exports import escribir_pdf
+
+    archivo = tempfile.TemporaryFile()
+    estadisticas = {'total_estudiantes': 95, 'inscritos_pagados': 48, 'pendientes_inscripcion': 47}
+    total = escribir_pdf(generar_estudiantes(95), estadisticas, archivo, filas_por_tabla=40)
+    assert total == 95
+
+    contenido = b''.join(iterar_archivo(archivo))
+    assert contenido.startswith(b'%PDF')
+    assert contenido.count(b'/Type /Page\n') >= 2
+
+
+def test_ndjson_por_bloques():
+    """Cada bloque trae a lo sumo ``lote`` filas y las fechas salen en ISO"""
+    bloques = list(iterar_ndjson(generar_estudiantes(1203), lote=500))
+    assert len(bloques) == 3
+    lineas = b''.join(bloques).decode('utf-8').splitlines()
+    assert len(lineas) == 1203
+    primera = json.loads(lineas[0])
+    assert primera['matricula'] == 'A00000'
+    assert primera['fecha_inscripcion'] == '2024-01-15'
+
+
+def test_importar_app_no_carga_librerias_de_exportacion():
+    """openpyxl y reportlab se importan al primer reporte, no al arrancar el worker"""
+    import subprocess
+    raiz = os.path.join(os.path.dirname(__file__), '..')
+    codigo = "import sys, app; print('openpyxl' in sys.modules, 'reportlab' in sys.modules)"
+    salida = subprocess.run([sys.executable, '-c', codigo], cwd=raiz, capture_output=True,
+                            text=True, env=dict(os.environ, CACHE_NOTIFY='0'), check=True)
+    assert salida.stdout.strip().splitlines()[-1] == 'False False'
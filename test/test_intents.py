@@ -0,0 +1,78 @@
+import sys
+import os
+
+# Agregar el directorio raíz al path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config.intents import IntentClassifier, IntentIndex, normalizar
+
+
+def test_normalizar_quita_acentos():
+    assert normalizar('  ¿Cuántas   INSCRIPCIÓN? ') == '¿cuantas inscripcion?'
+
+
+def test_prioridad_determinista():
+    """Con varias coincidencias gana la regla de mayor prioridad"""
+    clasificador = IntentClassifier()
+    resultado = clasificador.classify('¿Cuántos alumnos deben la inscripción?')
+    assert resultado.intent == 'estudiantes'
+    assert {'estudiantes', 'estadisticas', 'inscripciones'} <= resultado.intenciones
+
+
+def test_insensible_a_acentos():
+    clasificador = IntentClassifier()
+    assert clasificador.classify('estadisticas').intent == 'estadisticas'
+    assert clasificador.classify('ESTADÍSTICAS').intent == 'estadisticas'
+    assert clasificador.classify('Ingenieria').intent == 'carreras'
+
+
+def test_coincidencias_superpuestas():
+    """Las palabras clave se detectan aunque se solapen dentro del texto"""
+    clasificador = IntentClassifier([('a', ['reportes']), ('b', ['porte'])])
+    assert clasificador.classify('reportes').intenciones == {'a', 'b'}
+
+
+def test_sin_coincidencias_y_estadisticas():
+    clasificador = IntentClassifier()
+    assert clasificador.classify('qué tal').intent is None
+    stats = clasificador.stats()
+    assert stats['clasificaciones'] == 1
+    assert stats['por_intencion'] == {'None': 1}
+
+
+def crear_indice():
+    cargas = []
+
+    def loader():
+        cargas.append(1)
+        return [
+            {'intent_name': 'hours', 'response_template': 'De 9 a 18',
+             'example_questions': ['horario', '¿A qué hora abren?']},
+            {'intent_name': 'contact', 'response_template': 'info@ejemplo.com',
+             'example_questions': ['hora de contacto']},
+        ]
+
+    return IntentIndex(loader), cargas
+
+
+def test_indice_resuelve_sin_consultar_de_nuevo():
+    """El índice se carga una vez y resuelve frases contenidas en el mensaje"""
+    indice, cargas = crear_indice()
+    assert indice.buscar('Oye, ¿a que hora abren mañana?') == ('hours', 'De 9 a 18')
+    assert indice.buscar('mi horario') == ('hours', 'De 9 a 18')
+    assert indice.buscar('nada que ver') is None
+    assert indice.respuesta('contact') == 'info@ejemplo.com'
+    assert len(cargas) == 1
+
+
+def test_indice_prefiere_la_frase_mas_larga():
+    indice, _ = crear_indice()
+    assert indice.buscar('la hora de contacto') == ('contact', 'info@ejemplo.com')
+
+
+def test_indice_invalidar_recarga():
+    indice, cargas = crear_indice()
+    indice.respuesta('hours')
+    indice.invalidar()
+    indice.respuesta('hours')
+    assert len(cargas) == 2
@@ -0,0 +1,77 @@
+import sys
+import os
+import io
+import json
+import time
+import logging
+
+# Agregar el directorio raíz al path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+
+from config import logs
+
+
+@pytest.fixture
+def salida():
+    stream = io.StringIO()
+    yield stream
+    # Volver a la configuración normal para el resto de las pruebas
+    logs.configurar_logging()
+
+
+def lineas(stream):
+    logs.detener_logging()
+    return [json.loads(linea) for linea in stream.getvalue().splitlines()]
+
+
+def test_registro_json_con_request_id_y_extras(salida):
+    logs.configurar_logging(nivel='INFO', formato='json', muestreo=0, stream=salida)
+    logs.iniciar_peticion('req-1')
+    logging.getLogger('prueba').info("POST %s", '/chat', extra={'duracion_ms': 1.5})
+
+    registro = lineas(salida)[-1]
+    assert registro['mensaje'] == 'POST /chat'
+    assert registro['request_id'] == 'req-1'
+    assert registro['duracion_ms'] == 1.5
+    assert registro['nivel'] == 'INFO'
+
+
+def test_debug_muestreado_por_peticion(salida):
+    logger = logging.getLogger('prueba')
+
+    logs.configurar_logging(nivel='INFO', muestreo=0, stream=salida)
+    logs.iniciar_peticion('sin-traza')
+    logger.debug("no debe salir")
+    logger.warning("siempre sale")
+
+    logs.configurar_logging(nivel='INFO', muestreo=1, stream=salida)
+    logs.iniciar_peticion('con-traza')
+    logger.debug("traza completa")
+
+    mensajes = [registro['mensaje'] for registro in lineas(salida)]
+    assert 'no debe salir' not in mensajes
+    assert 'siempre sale' in mensajes
+    assert 'traza completa' in mensajes
+
+
+def test_cola_llena_descarta_sin_bloquear():
+    class Lento(logging.Handler):
+        def emit(self, record):
+            time.sleep(0.5)
+
+    manejador = logs.ManejadorEnCola(Lento(), maxsize=1)
+    logger = logging.getLogger('prueba.cola')
+    logger.propagate = False
+    logger.addHandler(manejador)
+    try:
+        inicio = time.perf_counter()
+        for i in range(20):
+            logger.warning("mensaje %s", i)
+        assert time.perf_counter() - inicio < 0.3
+        assert manejador.descartados > 0
+    finally:
+        logger.removeHandler(manejador)
+        logger.propagate = True
+        manejador.detener()
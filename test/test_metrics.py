@@ -0,0 +1,58 @@
+import sys
+import os
+
+# Agregar el directorio raíz al path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+from prometheus_client import REGISTRY
+
+import app as app_module
+from config.metrics import medir_consulta
+
+
+def muestra(nombre, **etiquetas):
+    return REGISTRY.get_sample_value(nombre, etiquetas) or 0.0
+
+
+def test_medir_consulta_cuenta_ok_y_error():
+    @medir_consulta('prueba_funcion')
+    def consulta(fallar):
+        if fallar:
+            raise RuntimeError('BD caída')
+        return [1]
+
+    consulta(False)
+    with pytest.raises(RuntimeError):
+        consulta(True)
+
+    assert muestra('chatbot_db_queries_total', metodo='prueba_funcion', resultado='ok') == 1
+    assert muestra('chatbot_db_queries_total', metodo='prueba_funcion', resultado='error') == 1
+    assert muestra('chatbot_db_query_duration_seconds_count', metodo='prueba_funcion') == 2
+
+
+def test_medir_consulta_en_generador_mide_la_iteracion():
+    @medir_consulta('prueba_generador')
+    def filas():
+        yield from range(3)
+
+    generador = filas()
+    assert muestra('chatbot_db_queries_total', metodo='prueba_generador', resultado='ok') == 0
+    assert list(generador) == [0, 1, 2]
+    assert muestra('chatbot_db_queries_total', metodo='prueba_generador', resultado='ok') == 1
+
+
+def test_endpoint_metrics_expone_rutas_e_intenciones(monkeypatch):
+    monkeypatch.setattr(app_module.db, 'procesar_mensaje', lambda mensaje: ("Hola", "greeting", 0.9, {}))
+    client = app_module.app.test_client()
+    antes = muestra('chatbot_intents_total', intencion='greeting')
+
+    client.post('/chat', json={'message': 'hola'})
+    respuesta = client.get('/metrics')
+
+    assert respuesta.status_code == 200
+    assert respuesta.content_type.startswith('text/plain')
+    texto = respuesta.get_data(as_text=True)
+    assert 'chatbot_http_request_duration_seconds_bucket{le="0.005",metodo="POST",ruta="/chat"}' in texto
+    assert 'chatbot_db_pool_connections{estado="max"}' in texto
+    assert muestra('chatbot_intents_total', intencion='greeting') == antes + 1
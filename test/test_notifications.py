@@ -0,0 +1,73 @@
+import sys
+import os
+
+# Agregar el directorio raíz al path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import app as app_module
+from config.cache import HistoryCache
+from config.intents import CACHE_RESPUESTAS
+from config.notifications import ChangeListener
+
+
+def test_despacha_solo_tablas_conocidas():
+    recibidas = []
+    listener = ChangeListener('postgresql://no-usado', recibidas.append)
+    listener._despachar({'estudiantes', 'otra_tabla'})
+    assert recibidas == ['estudiantes']
+    assert listener.stats()['notificaciones'] == 1
+
+
+def test_invalidacion_precisa_por_tabla():
+    """Un cambio en estudiantes descarta estadísticas, no carreras"""
+    db = app_module.db
+    db.cache.set('estadisticas', {'total_estudiantes': 1}, tags=('estudiantes',))
+    db.cache.set('carreras', [{'codigo': 'ISC'}], tags=('carreras',))
+
+    db.invalidar_datos('estudiantes')
+
+    assert db.cache.get('estadisticas') is None
+    assert db.cache.get('carreras') == [{'codigo': 'ISC'}]
+
+
+def test_url_directa_sin_pooler(monkeypatch):
+    monkeypatch.delenv('DATABASE_LISTEN_URL', raising=False)
+    assert '-pooler' not in app_module.db.url_directa()
+
+
+def test_historial_entre_workers(monkeypatch):
+    """Dos workers con la misma sesión en memoria: el aviso del INSERT de A deja al B sin historial viejo"""
+    db = app_module.db
+    worker_a, worker_b = HistoryCache(), HistoryCache()
+    monkeypatch.setattr(db, 'historial', worker_b)
+    listener = ChangeListener('postgresql://no-usado', db.invalidar_datos, on_historial=db.invalidar_historial)
+    for historial in (worker_a, worker_b):
+        historial.set('s1', [{'user_message': 'hola'}])
+
+    # A guarda un mensaje: lo agrega a su caché y, al confirmar el INSERT, avisa a los demás
+    worker_a.append('s1', {'user_message': 'adiós'})
+    listener._despachar_historial({'otro-host-1:s1'})
+    assert worker_b.get('s1', 10) is None
+    assert len(worker_a.get('s1', 10)) == 2
+
+    # Avisos propios no descartan nada
+    worker_b.set('s1', [{'user_message': 'hola'}])
+    listener._despachar_historial({f'{db.origen()}:s1'})
+    assert worker_b.get('s1', 10) is not None
+
+    # El aviso llega entre la lectura de la BD y el set: la lectura vieja no se cachea
+    marca = worker_b.marca('s2')
+    listener._despachar_historial({'otro-host-1:s2'})
+    worker_b.set('s2', [], marca)
+    assert worker_b.get('s2', 10) is None
+
+
+def test_cambio_de_carreras_invalida_respuestas_con_entidades():
+    """Renombrar una carrera descarta las respuestas que la reconocieron como entidad"""
+    db = app_module.db
+    ttl, tablas = CACHE_RESPUESTAS['estudiantes']
+    db.respuestas.set(('estudiantes de sistemas', 'estudiantes'), {'response': '...'}, ttl, tags=tablas)
+
+    db.invalidar_datos('carreras')
+
+    assert db.respuestas.get(('estudiantes de sistemas', 'estudiantes')) is None
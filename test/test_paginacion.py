@@ -0,0 +1,102 @@
+import sys
+import os
+from contextlib import contextmanager
+
+# Agregar el directorio raíz al path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import pytest
+
+import app as app_module
+from config.database import codificar_cursor, decodificar_cursor
+from config.queries import CLAVE_ORDEN
+
+
+class CursorFalso:
+    def __init__(self, filas, consultas):
+        self.filas = filas
+        self.consultas = consultas
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def execute(self, sql, params=None):
+        self.consultas.append((sql, params))
+
+    def fetchall(self):
+        return self.filas
+
+
+def usar_filas(monkeypatch, filas):
+    consultas = []
+
+    class ConexionFalsa:
+        def cursor(self):
+            return CursorFalso(filas, consultas)
+
+    @contextmanager
+    def connection():
+        yield ConexionFalsa()
+
+    monkeypatch.setattr(app_module.db, 'connection', connection)
+    return consultas
+
+
+def estudiante(i):
+    return {'matricula': f'A{i:03d}', 'nombre': 'Ana', 'apellido': 'Pérez', 'carrera': 'Sistemas',
+            'semestre': 1, 'fecha_inscripcion': None, 'inscripcion_pagada': True,
+            'email': 'No especificado', 'telefono': 'No especificado'}
+
+
+def test_cursor_ida_y_vuelta():
+    clave = ['Ingeniería', 'José', 'Núñez', 'A001']
+    assert decodificar_cursor(codificar_cursor(clave)) == clave
+    with pytest.raises(ValueError):
+        decodificar_cursor('no-es-un-cursor')
+
+
+def test_pagina_con_siguiente(monkeypatch):
+    # La consulta pide limit + 1 filas; la extra sólo indica que hay más
+    consultas = usar_filas(monkeypatch, [estudiante(i) for i in range(3)])
+    client = app_module.app.test_client()
+
+    data = client.get('/api/universidad/estudiantes/todos?limit=2&carrera=Sistemas&pagado=true').get_json()
+
+    assert data['success'] and data['hay_mas']
+    assert [e['matricula'] for e in data['estudiantes']] == ['A000', 'A001']
+    assert decodificar_cursor(data['siguiente']) == ['Sistemas', 'Ana', 'Pérez', 'A001']
+    sql, params = consultas[0]
+    assert f'ORDER BY {CLAVE_ORDEN}' in sql
+    assert params == ['Sistemas', True, 3]
+
+    client.get(f"/api/universidad/estudiantes/todos?limit=2&cursor={data['siguiente']}")
+    sql, params = consultas[1]
+    assert f'({CLAVE_ORDEN}) > (%s, %s, %s, %s)' in sql
+    assert params == ['Sistemas', 'Ana', 'Pérez', 'A001', 3]
+
+
+def test_ultima_pagina_y_errores(monkeypatch):
+    usar_filas(monkeypatch, [estudiante(1)])
+    client = app_module.app.test_client()
+
+    data = client.get('/api/universidad/estudiantes/todos?limit=5').get_json()
+    assert data['siguiente'] is None and not data['hay_mas']
+
+    assert client.get('/api/universidad/estudiantes/todos?cursor=xyz').status_code == 400
+    # Lista de 4 elementos con tipos que no son de la clave de orden
+    assert client.get(f"/api/universidad/estudiantes/todos?cursor={codificar_cursor([1, 2, 3, 4])}").status_code == 400
+    assert client.get('/api/universidad/estudiantes/todos?pagado=quizas').status_code == 400
+
+
+def test_cursor_de_fila_con_nulos(monkeypatch):
+    """Una página que termina en una fila sin carrera continúa con la clave sin NULL del ORDER BY"""
+    filas = [estudiante(i) for i in range(3)]
+    filas[1]['carrera'] = None
+    usar_filas(monkeypatch, filas)
+    client = app_module.app.test_client()
+
+    data = client.get('/api/universidad/estudiantes/todos?limit=2').get_json()
+    assert decodificar_cursor(data['siguiente']) == ['Sin carrera', 'Ana', 'Pérez', 'A001']
@@ -0,0 +1,84 @@
+import pytest
+import sys
+import os
+
+# Agregar el directorio raíz al path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from psycopg2 import extensions
+from config.pool import ConnectionPool, PoolAgotadoError
+
+
+class ConexionFalsa:
+    """Conexión mínima para probar el pool sin base de datos"""
+
+    def __init__(self):
+        self.closed = 0
+        self.rollbacks = 0
+        self.info = self
+        self.transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.transaction_status = extensions.TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
+
+
+def crear_pool(**kwargs):
+    creadas = []
+
+    def connect():
+        conn = ConexionFalsa()
+        creadas.append(conn)
+        return conn
+
+    return ConnectionPool(connect, **kwargs), creadas
+
+
+def test_reutiliza_conexiones():
+    """Una conexión devuelta se reutiliza en lugar de abrir otra"""
+    pool, creadas = crear_pool(minconn=1, maxconn=2)
+    conn = pool.getconn()
+    pool.putconn(conn)
+    assert pool.getconn() is conn
+    assert len(creadas) == 1
+
+
+def test_respeta_maximo():
+    """Con el pool lleno, getconn espera y falla al agotarse el timeout"""
+    pool, _ = crear_pool(minconn=0, maxconn=1, timeout=0.05)
+    pool.getconn()
+    with pytest.raises(PoolAgotadoError):
+        pool.getconn()
+
+
+def test_descarta_conexiones_rotas():
+    """Las conexiones cerradas no vuelven al pool y liberan su cupo"""
+    pool, creadas = crear_pool(minconn=0, maxconn=1)
+    conn = pool.getconn()
+    conn.close()
+    pool.putconn(conn)
+    assert pool.stats()['total'] == 0
+    assert pool.getconn() is not conn
+    assert len(creadas) == 2
+
+
+def test_rollback_al_devolver():
+    """Una transacción abierta se deshace antes de volver al pool"""
+    pool, _ = crear_pool()
+    conn = pool.getconn()
+    conn.transaction_status = extensions.TRANSACTION_STATUS_INTRANS
+    pool.putconn(conn)
+    assert conn.rollbacks == 1
+    assert pool.stats()['ociosas'] == 1
+
+
+def test_recicla_conexiones_viejas():
+    """Las conexiones que superan max_lifetime se reemplazan"""
+    pool, creadas = crear_pool(max_lifetime=0)
+    conn = pool.getconn()
+    pool.putconn(conn)
+    assert conn.closed
+    assert pool.getconn() is not conn
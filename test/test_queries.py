@@ -0,0 +1,75 @@
+import sys
+import os
+
+# Agregar el directorio raíz al path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from psycopg2 import errors, extensions
+
+from config.queries import CONSULTAS, RegistroConsultas, a_posicionales, nombre_pagina, usar_preparadas
+
+
+class ConexionFalsa:
+    def __init__(self):
+        self.preparadas = set()
+        self.info = type('Info', (), {'transaction_status': extensions.TRANSACTION_STATUS_IDLE})()
+        self.rollbacks = 0
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+class CursorFalso:
+    def __init__(self, conexion, fallar=None):
+        self.connection = conexion
+        self.sentencias = []
+        self.fallar = fallar
+
+    def execute(self, sql, params=None):
+        if self.fallar and sql.startswith('EXECUTE'):
+            error, self.fallar = self.fallar, None
+            raise error
+        self.sentencias.append((sql, params))
+
+
+def test_a_posicionales():
+    assert a_posicionales("SELECT %s, '100%%' WHERE a = %s") == ("SELECT $1, '100%' WHERE a = $2", 2)
+    assert a_posicionales(CONSULTAS[nombre_pagina(True, True, True)])[1] == 7
+
+
+def test_preparadas_desactivadas_detras_del_pooler():
+    assert not usar_preparadas('postgresql://u@ep-x-pooler.us-east-1.aws.neon.tech/db', 'auto')
+    assert usar_preparadas('postgresql://u@localhost/db', 'auto')
+    assert not usar_preparadas('postgresql://u@localhost/db', '0')
+
+
+def test_prepara_una_vez_por_conexion():
+    registro = RegistroConsultas(preparar=True)
+    conexion = ConexionFalsa()
+
+    for session_id in ('s1', 's2'):
+        cur = CursorFalso(conexion)
+        registro.ejecutar(cur, 'historial', (session_id, 20))
+
+    assert cur.sentencias == [('EXECUTE q_historial (%s, %s)', ('s2', 20))]
+    assert conexion.preparadas == {'q_historial'}
+
+
+def test_reintenta_si_la_sesion_perdio_la_sentencia():
+    registro = RegistroConsultas(preparar=True)
+    conexion = ConexionFalsa()
+    conexion.preparadas.add('q_carreras')
+
+    cur = CursorFalso(conexion, fallar=errors.InvalidSqlStatementName())
+    registro.ejecutar(cur, 'carreras')
+
+    assert conexion.rollbacks == 1 and registro.reintentos == 1
+    assert [sql.split()[0] for sql, _ in cur.sentencias] == ['PREPARE', 'EXECUTE']
+
+
+def test_sin_preparar_envia_el_texto():
+    registro = RegistroConsultas(preparar=False)
+    cur = CursorFalso(ConexionFalsa())
+    registro.ejecutar(cur, 'buscar_matricula', ('A001',))
+
+    assert cur.sentencias == [(CONSULTAS['buscar_matricula'], ('A001',))]
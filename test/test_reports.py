@@ -0,0 +1,146 @@
+import sys
+import os
+
+# Agregar el directorio raíz al path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import threading
+from contextlib import contextmanager
+
+import psycopg2
+
+import app as app_module
+from config.reports import ReportManager, ReportJob
+from test_exports import generar_estudiantes
+
+
+class BaseFalsa:
+    """Lo mínimo de NeonDatabase que usa ReportManager"""
+
+    def __init__(self):
+        self.version = '1-0-0'
+        self.lecturas = 0
+        self.registrados = []
+
+    def version_datos(self):
+        return self.version
+
+    def iterar_estudiantes(self, limit=None):
+        self.lecturas += 1
+        return generar_estudiantes(10)
+
+    def get_estadisticas_estudiantes(self):
+        return {'total_estudiantes': 10, 'inscritos_pagados': 5, 'pendientes_inscripcion': 5}
+
+    def registrar_reporte(self, tipo_reporte, parametros):
+        self.registrados.append(tipo_reporte)
+        return True
+
+
+def test_reporte_se_genera_una_vez_por_version(tmp_path):
+    db = BaseFalsa()
+    reportes = ReportManager(db, directorio=str(tmp_path))
+
+    job = reportes.enviar('excel')
+    assert job.esperar(timeout=10)
+    assert job.estado == 'listo'
+    assert job.total == 10
+    assert os.path.exists(job.ruta)
+
+    # Mismos datos: se reutiliza el archivo sin volver a leer ni registrar
+    assert reportes.enviar('excel').ruta == job.ruta
+    assert db.lecturas == 1
+    assert db.registrados == ['reporte_completo_estudiantes']
+
+    # Datos nuevos: se genera otra versión y se borra la anterior
+    db.version = '2-0-0'
+    nuevo = reportes.enviar('excel')
+    assert nuevo.esperar(timeout=10)
+    assert nuevo.id == 'excel-2-0-0'
+    assert not os.path.exists(job.ruta)
+    assert db.lecturas == 2
+
+
+def test_obtener_desde_disco(tmp_path):
+    """Otro worker (otra instancia) resuelve el id con el archivo en disco"""
+    db = BaseFalsa()
+    job = ReportManager(db, directorio=str(tmp_path)).enviar('pdf')
+    assert job.esperar(timeout=10)
+
+    otro = ReportManager(db, directorio=str(tmp_path))
+    encontrado = otro.obtener(job.id)
+    assert encontrado.estado == 'listo'
+    assert encontrado.ruta == job.ruta
+    assert otro.obtener('pdf-../../etc') is None
+    assert otro.obtener('desconocido-1') is None
+
+
+def test_version_vieja_no_borra_la_nueva(tmp_path):
+    """Un trabajo de datos anteriores que termina tarde no borra el archivo más nuevo"""
+    db = BaseFalsa()
+    db.version = 'v2'
+    reportes = ReportManager(db, directorio=str(tmp_path))
+    nuevo = reportes.enviar('excel')
+    assert nuevo.esperar(timeout=10)
+
+    reportes._generar(ReportJob('excel', 'v1', reportes._ruta('excel', 'v1')))
+    assert os.path.exists(nuevo.ruta)
+
+    # Si el archivo desaparece igual, se encola otro en lugar de servir una ruta inexistente
+    os.remove(nuevo.ruta)
+    otro = reportes.obtener(nuevo.id)
+    assert otro is not nuevo
+    assert otro.esperar(timeout=10)
+    assert os.path.exists(otro.ruta)
+
+
+def test_descarga_no_espera_la_generacion(monkeypatch, tmp_path):
+    """Sin ?esperar, un reporte que aún se genera responde 202 al instante"""
+    liberar = threading.Event()
+
+    class BaseLenta(BaseFalsa):
+        def iterar_estudiantes(self, limit=None):
+            liberar.wait(10)
+            return super().iterar_estudiantes(limit)
+
+    reportes = ReportManager(BaseLenta(), directorio=str(tmp_path))
+    monkeypatch.setattr(app_module.db, 'reportes', reportes)
+    client = app_module.app.test_client()
+
+    respuesta = client.get('/descargar/excel')
+    assert respuesta.status_code == 202
+    assert respuesta.headers['Location'] == respuesta.get_json()['reporte']['url_estado']
+
+    liberar.set()
+    respuesta = client.get('/descargar/excel?esperar=1')
+    assert respuesta.status_code == 200
+
+
+def test_version_datos_desde_el_contador(monkeypatch):
+    """La versión sale de datos_version; sin la migración, de pg_stat con el arranque del servidor"""
+    filas = {'version_datos': {'version': 7},
+             'version_datos_estadisticas': {'n_tup_ins': 1, 'n_tup_upd': 2, 'n_tup_del': 3,
+                                            'arranque': 100, 'reinicio': 0}}
+    faltante = set()
+
+    class Cursor:
+        def fetchone(self):
+            return self.fila
+
+    def ejecutar(cur, nombre, params=()):
+        if nombre in faltante:
+            raise psycopg2.errors.UndefinedTable()
+        cur.fila = filas[nombre]
+        return cur
+
+    class Conexion:
+        def cursor(self):
+            return contextmanager(lambda: (yield Cursor()))()
+
+    db = app_module.db
+    monkeypatch.setattr(db, 'connection', contextmanager(lambda: (yield Conexion())))
+    monkeypatch.setattr(db.sql, 'ejecutar', ejecutar)
+
+    assert db.version_datos() == 'v7'
+    faltante.add('version_datos')
+    assert db.version_datos() == 'e100-0-1-2-3'
@@ -0,0 +1,93 @@
+import sys
+import os
+import time
+
+# Agregar el directorio raíz al path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from config.writebehind import WriteBehindBuffer
+
+
+class Destino:
+    def __init__(self, fallos=0, lento=0.0):
+        self.lotes = []
+        self.fallos = fallos
+        self.lento = lento
+
+    def escribir(self, registros):
+        time.sleep(self.lento)
+        if self.fallos:
+            self.fallos -= 1
+            raise RuntimeError('BD caída')
+        self.lotes.append(list(registros))
+
+
+def test_agrupa_por_tamano_y_vacia():
+    destino = Destino()
+    buffer = WriteBehindBuffer(destino.escribir, max_lote=10, intervalo=5.0)
+    for i in range(25):
+        buffer.encolar(i)
+
+    assert buffer.vaciar(timeout=5)
+    escritos = [r for lote in destino.lotes for r in lote]
+    assert sorted(escritos) == list(range(25))
+    assert all(len(lote) <= 25 for lote in destino.lotes)
+    assert len(destino.lotes) < 25
+    assert buffer.stats()['en_cola'] == 0
+    buffer.cerrar()
+
+
+def test_escribe_por_tiempo():
+    destino = Destino()
+    buffer = WriteBehindBuffer(destino.escribir, max_lote=100, intervalo=0.05)
+    buffer.encolar('a')
+    time.sleep(0.5)
+    assert destino.lotes == [['a']]
+    buffer.cerrar()
+
+
+def test_contrapresion_escribe_sincrono():
+    """Con la cola llena el registro se escribe en el hilo que llama, no se pierde"""
+    destino = Destino(lento=0.2)
+    buffer = WriteBehindBuffer(destino.escribir, max_lote=1, intervalo=0.01, maxsize=1, espera=0.01)
+    resultados = [buffer.encolar(i) for i in range(4)]
+
+    assert False in resultados
+    assert buffer.vaciar(timeout=5)
+    assert sorted(r for lote in destino.lotes for r in lote) == [0, 1, 2, 3]
+    assert buffer.stats()['sincronos'] >= 1
+    buffer.cerrar()
+
+
+def test_reintenta_lote_fallido():
+    destino = Destino(fallos=1)
+    buffer = WriteBehindBuffer(destino.escribir, max_lote=5, intervalo=0.01)
+    buffer.encolar('x')
+    assert buffer.vaciar(timeout=5)
+    assert destino.lotes == [['x']]
+    assert buffer.stats()['errores'] == 1
+    buffer.cerrar()
+
+
+def test_vaciar_no_espera_a_los_nuevos():
+    """Con tráfico constante vaciar vuelve al escribir lo que había, sin esperar a que la cola quede en cero"""
+    destino = Destino(lento=0.01)
+    siguiente = iter(range(1000, 2000))
+
+    def escribir(registros):
+        destino.escribir(registros)
+        # Mientras se escribe siguen llegando mensajes de otras sesiones
+        nuevo = next(siguiente, None)
+        if nuevo is not None:
+            buffer.encolar(nuevo)
+
+    buffer = WriteBehindBuffer(escribir, max_lote=5, intervalo=0.01)
+    for i in range(10):
+        buffer.encolar(i)
+
+    inicio = time.monotonic()
+    assert buffer.vaciar(timeout=3)
+    assert time.monotonic() - inicio < 1
+    escritos = {r for lote in destino.lotes for r in lote}
+    assert set(range(10)) <= escritos
+    buffer.cerrar()
@@ -0,0 +1,11 @@
+"""Punto de entrada WSGI de producción
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Con ``preload_app`` el maestro importa la app (Flask, clasificador) una sola
+vez y los workers la comparten por copy-on-write. openpyxl y reportlab se
+importan al generar el primer reporte (o en el maestro con EXPORTS_PRELOAD=1).
+"""
+from app import app, db
+
+application = app